@@ -0,0 +1,173 @@
+import asyncio, json, os, time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, UTC
+from WorkflowExecutor import WorkflowExecutor
+from src.client.transport import TransportError
+
+class AsyncWorkflowExecutor(WorkflowExecutor):
+    """
+    Executor asyncio: satu cursor search/state bersama, dengan beberapa pipeline scrape -> analyze
+    yang berjalan bersamaan (dibatasi `concurrency`). Berhenti (dan membatalkan pekerjaan yang masih
+    berjalan) begitu numberOfLeads tercapai.
+    """
+    def __init__(self, concurrency=None, transport=None):
+        super().__init__(transport=transport)
+        self.concurrency = concurrency or int(os.getenv("EXECUTOR_CONCURRENCY", "5"))
+        self._cursor_lock = None
+        self._exhausted = False
+        self._done = None
+        self._leads_reserved = 0
+        self._scrape_template = None
+
+    async def _post(self, task_key, payload):
+        """Memanggil task lewat transport di thread terpisah; mengembalikan body respons atau None bila gagal."""
+        started_at = time.perf_counter()
+        try:
+            data = await asyncio.to_thread(self.transport.call, task_key, payload)
+        except TransportError as e:
+            print(f"FATAL: Error calling '{task_key}': {e}")
+            self.call_log.record(self.storage["$id"], task_key, started_at, payload, e.body, error=e, status_code=e.status_code)
+            return None
+        self.call_log.record(self.storage["$id"], task_key, started_at, payload, data)
+        self.storage["$metadata"]["executionTotal"] += 1
+        return data
+
+    def _merge_concurrent(self, new_state, sent_payload):
+        """
+        Merge state dari respons yang dikerjakan paralel. Counter (leadCount, skippedCount, callsSaved,
+        skippedReasons) dihitung server dari snapshot payload, jadi yang diterapkan adalah selisihnya
+        terhadap payload yang dikirim agar update dari pipeline lain tidak tertimpa.
+        """
+        if not new_state:
+            return
+        state = self.storage["$state"]
+        for key, value in new_state.items():
+            sent = sent_payload.get(key)
+            if isinstance(value, (int, float)) and not isinstance(value, bool) and isinstance(sent, (int, float)):
+                state[key] = (state.get(key) or 0) + (value - sent)
+            elif isinstance(value, dict) and isinstance(sent, dict):
+                merged = dict(state.get(key) or {})
+                for sub_key, sub_value in value.items():
+                    merged[sub_key] = merged.get(sub_key, 0) + sub_value - sent.get(sub_key, 0)
+                state[key] = merged
+            else:
+                state[key] = value
+
+    async def _next_place_id(self):
+        """Cursor bersama: ambil placeId dari antrean, jalankan search berikutnya bila antrean kosong."""
+        async with self._cursor_lock:
+            while not self._done.is_set() and not self._exhausted:
+                state = self.storage["$state"]
+                if state.get("remainingPlaceIds"):
+                    return state["remainingPlaceIds"].pop(0)
+                payload = self._resolve_jsonpath(self._search_payload)
+                data = await self._post("search", payload)
+                # skippedCount/skippedReasons dihitung dari snapshot payload, sementara pipeline lain bisa
+                # menambah counter yang sama selama search berjalan: terapkan sebagai selisih
+                if data is None or data.get("done") or not data.get("next"):
+                    self._merge_concurrent(data.get("state") if data else None, payload)
+                    self._exhausted = True
+                    return None
+                self._merge_concurrent(data.get("state"), payload)
+                next_task = data["next"]
+                self._search_payload = next_task["payload"] if next_task["key"] == "search" else self._search_payload
+                if next_task["key"] == "scrape":
+                    self._scrape_template = next_task["payload"]
+                    state["remainingPlaceIds"] = [next_task["payload"]["placeId"]] + list(state.get("remainingPlaceIds") or [])
+            return None
+
+    def _stop_if_done(self, data):
+        """
+        Respons done dari scrape/analyze (mis. "Run budget exhausted") mengakhiri seluruh run:
+        cursor berhenti membagikan placeId dan pipeline lain dibatalkan.
+        """
+        if not data.get("done"):
+            return False
+        if data.get("error"):
+            print(f"Workflow stopped: {data['error']}")
+        self._done.set()
+        return True
+
+    async def _pipeline(self, place_id):
+        """scrape -> analyze untuk satu placeId."""
+        payload = self._resolve_jsonpath({**self._scrape_template, "placeId": place_id})
+        data = await self._post("scrape", payload)
+        if data is None:
+            return
+        self._merge_concurrent(data.get("state"), payload)
+        if self._stop_if_done(data):
+            return
+        next_task = data.get("next") or {}
+        if next_task.get("key") != "analyze":
+            return
+
+        # Reservasi slot lead agar pipeline paralel tidak melebihi numberOfLeads
+        if self._leads_reserved >= self.storage["$state"]["numberOfLeads"]:
+            return
+        self._leads_reserved += 1
+        payload = self._resolve_jsonpath(next_task["payload"])
+        data = await self._post("analyze", payload)
+        if data is None:
+            self._leads_reserved -= 1
+            return
+        self._merge_concurrent(data.get("state"), payload)
+        if self._stop_if_done(data):
+            self._leads_reserved -= 1
+            return
+        self._append_result(data.get("result"))
+        if self.storage["$state"]["leadCount"] >= self.storage["$state"]["numberOfLeads"]:
+            self._done.set()
+
+    async def _worker(self):
+        while not self._done.is_set():
+            place_id = await self._next_place_id()
+            if place_id is None:
+                return
+            await self._pipeline(place_id)
+
+    async def run(self, parameters):
+        """Menjalankan workflow penuh dari parameter /task/input."""
+        self._cursor_lock = asyncio.Lock()
+        self._done = asyncio.Event()
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=self.concurrency + 2))
+
+        data = await self._post("input", parameters)
+        if data is None or data.get("error"):
+            print(f"Input failed: {data.get('error') if data else 'request error'}")
+            return self.storage
+        self._update_state(data.get("state"))
+        # Pipeline paralel bekerja per placeId; batching dinonaktifkan untuk cursor ini
+        self.storage["$state"]["batchSize"] = 1
+        self._search_payload = data["next"]["payload"]
+
+        workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+        all_workers = asyncio.gather(*workers, return_exceptions=True)
+        done_waiter = asyncio.create_task(self._done.wait())
+        await asyncio.wait([done_waiter, all_workers], return_when=asyncio.FIRST_COMPLETED)
+        # numberOfLeads tercapai (atau kandidat habis): hentikan pekerjaan yang masih berjalan
+        for task in workers + [done_waiter]:
+            task.cancel()
+        await all_workers
+        await asyncio.gather(done_waiter, return_exceptions=True)
+        print("\nWorkflow completed!")
+        return self.storage
+
+    def start_workflow(self, prompt):
+        """Memulai alur kerja dari sebuah prompt."""
+        self.storage["$metadata"]["startedAt"] = datetime.now(UTC).isoformat() + "Z"
+        print("Parsing prompt...")
+        parameters = self.prompt_parser.parse(prompt)
+        if "error" in parameters:
+            print(f"Error parsing prompt: {parameters['error']}")
+            return
+        if not parameters.get("numberOfLeads"):
+            parameters["numberOfLeads"] = 5
+        print(f"Parsed parameters: {json.dumps(parameters, indent=2)}")
+        asyncio.run(self.run(parameters))
+
+if __name__ == "__main__":
+    executor = AsyncWorkflowExecutor()
+    executor.start_workflow("Cari 10 restoran di surabaya yang cocok buat nugas")
+    with open("central_storage_output.json", "w") as f:
+        json.dump(executor.get_storage(), f, indent=2)
+    print("Central Storage has been saved to central_storage_output.json")
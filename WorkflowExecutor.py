@@ -1,30 +1,27 @@
-import uuid, requests, json, os, logging
+import uuid, json, os, sys, time
 from datetime import datetime, UTC
 from dotenv import load_dotenv
 from src.core.prompt_parser import PromptParser
+from src.client.transport import create_transport, TransportError
+from src.client.call_log import CallLogger
 
 load_dotenv()
 
 class WorkflowExecutor:
-    def __init__(self):
+    def __init__(self, transport=None):
         self.storage = {"$id": str(uuid.uuid4()),"$state": {},"$results": [],"$metadata": {"createdAt": datetime.now(UTC).isoformat() + "Z","startedAt": None,"executionTotal": 0}}
         self.api_base_url = os.getenv("API_BASE_URL", "http://localhost:5000/task")
+        # Transport: HttpTransport (default, keep-alive) atau InProcessTransport (EXECUTOR_TRANSPORT=inprocess)
+        self.transport = transport or create_transport()
+        # Mode sesi: state disimpan di server, payload tiap langkah hanya berisi sessionId
+        self.use_session = os.getenv("EXECUTOR_USE_SESSION", "false").lower() == "true"
         self.prompt_parser = PromptParser()
+        self.checkpoint_dir = os.getenv("CHECKPOINT_DIR", "checkpoints")
+        self.checkpoint_interval = int(os.getenv("CHECKPOINT_INTERVAL", "5"))
 
-        # --- PENAMBAHAN LOGGING ---
-        # Mengatur logger untuk menyimpan semua panggilan API ke file.
-        self.logger = logging.getLogger("WorkflowAPI")
-        self.logger.setLevel(logging.INFO)
-        # 'w' untuk write mode, log akan di-overwrite setiap kali script dijalankan.
-        # Ganti ke 'a' (append) jika Anda ingin menyimpan riwayat dari beberapa eksekusi.
-        file_handler = logging.FileHandler("workflow_api_calls.log", mode='a', encoding='utf-8')
-        file_handler.setLevel(logging.INFO)
-        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-        file_handler.setFormatter(formatter)
-        # Menghindari duplikasi handler jika __init__ dipanggil lebih dari sekali
-        if not self.logger.handlers:
-            self.logger.addHandler(file_handler)
-        # --- AKHIR PENAMBAHAN LOGGING ---
+        # Log panggilan API (JSONL ringkas, ditulis di background, dirotasi berdasarkan ukuran).
+        # Diatur lewat EXECUTOR_LOG_FILE, EXECUTOR_LOG_CAPTURE (none/truncated/full), EXECUTOR_LOG_SAMPLE, dst.
+        self.call_log = CallLogger()
 
     def _update_state(self, new_state):
         """Menggabungkan (merge) state parsial dari respons API ke dalam state utama."""
@@ -32,8 +29,10 @@ class WorkflowExecutor:
             self.storage["$state"].update(new_state)
 
     def _append_result(self, result):
-        """Menambahkan hasil dari task 'analyze' ke dalam daftar results."""
-        if result:
+        """Menambahkan hasil dari task 'analyze' (atau daftar hasil dari 'analyze_batch') ke dalam daftar results."""
+        if isinstance(result, list):
+            self.storage["$results"].extend(result)
+        elif result:
             self.storage["$results"].append(result)
 
     def _get_nested_val(self, data_dict, key_path):
@@ -68,8 +67,8 @@ class WorkflowExecutor:
                 resolved_payload[key] = value
         return resolved_payload
 
-    def execute_task(self, task_key, payload):
-        """Mengeksekusi satu task API, menangani respons, dan mencatatnya ke log."""
+    def _call_task(self, task_key, payload):
+        """Mengeksekusi satu task lewat transport dan mencatatnya ke log. Mengembalikan body respons atau None bila gagal."""
         resolved_payload = self._resolve_jsonpath(payload)
 
         if isinstance(resolved_payload, dict) and 'state' in resolved_payload and len(resolved_payload) == 1:
@@ -77,52 +76,126 @@ class WorkflowExecutor:
         else:
             final_payload = resolved_payload
         
-        url = f"{self.api_base_url}/{task_key}"
-        
         print(f"\n---> Executing task: {task_key} <---")
-        # Mencatat request ke file log
-        self.logger.info(f"REQUEST to [{task_key}]\nPAYLOAD:\n{json.dumps(final_payload, indent=2)}")
-
+        started_at = time.perf_counter()
         try:
-            response = requests.post(url, json=final_payload, timeout=60)
-            response.raise_for_status()
-        except requests.RequestException as e:
-            error_msg = f"API call to [{task_key}] FAILED: {e}"
+            data = self.transport.call(task_key, final_payload)
+        except TransportError as e:
             print(f"FATAL: Error calling '{task_key}'.")
-            if e.response is not None:
-                print(f"Status Code: {e.response.status_code}")
-                try:
-                    server_error = e.response.json()
-                    print(f"Server Response: {json.dumps(server_error, indent=2)}")
-                    error_msg += f"\nSERVER RESPONSE:\n{json.dumps(server_error, indent=2)}"
-                except json.JSONDecodeError:
-                    print(f"Server Response (raw): {e.response.text}")
-                    error_msg += f"\nSERVER RESPONSE (RAW):\n{e.response.text}"
+            if e.status_code is not None:
+                print(f"Status Code: {e.status_code}")
+                if isinstance(e.body, (dict, list)):
+                    print(f"Server Response: {json.dumps(e.body, indent=2)}")
+                else:
+                    print(f"Server Response (raw): {e.body}")
             else:
                 print(f"Error: {e}")
-            # Mencatat error ke file log
-            self.logger.error(error_msg)
-            return False
+            # Mencatat error ke file log (body respons error selalu ikut dicatat)
+            self.call_log.record(self.storage["$id"], task_key, started_at, final_payload, e.body, error=e, status_code=e.status_code)
+            return None
 
-        data = response.json()
-        # Mencatat response ke file log
-        self.logger.info(f"RESPONSE from [{task_key}]\nBODY:\n{json.dumps(data, indent=2)}")
-        
-        self._update_state(data.get("state"))
-        self._append_result(data.get("result"))
-        self.storage["$metadata"]["executionTotal"] += 1
-        
-        if data.get("done"):
-            print("\nWorkflow completed!")
-            return False
-            
-        next_task = data.get("next")
-        if next_task and next_task.get("key"):
-            return self.execute_task(next_task["key"], next_task["payload"])
+        # Mencatat request & response ke file log
+        self.call_log.record(self.storage["$id"], task_key, started_at, final_payload, data)
+        return data
+
+    def execute_task(self, task_key, payload):
+        """
+        Loop state-machine iteratif (tanpa rekursi): eksekusi task, merge state, lanjut ke 'next'.
+        Hasil analyze ditambahkan ke log results; state dan task berikutnya di-checkpoint secara berkala
+        dan setiap selesai 'analyze'.
+        """
+        next_task = {"key": task_key, "payload": payload}
+        tasks_since_checkpoint = 0
+        while next_task:
+            data = self._call_task(next_task["key"], next_task["payload"])
+            if data is None:
+                self._checkpoint(next_task)
+                return False
+
+            self._update_state(data.get("state"))
+            self._append_result(data.get("result"))
+            self._log_results(data.get("result"))
+            self.storage["$metadata"]["executionTotal"] += 1
+            finished_key = next_task["key"]
+            next_task = data.get("next") if not data.get("done") else None
+            if next_task and not next_task.get("key"):
+                next_task = None
+
+            tasks_since_checkpoint += 1
+            if finished_key.startswith("analyze") or tasks_since_checkpoint >= self.checkpoint_interval or not next_task:
+                self._checkpoint(next_task)
+                tasks_since_checkpoint = 0
+
+            if data.get("done"):
+                print("\nWorkflow completed!")
+                return False
             
         print("\nWorkflow ended without a 'next' task or 'done' flag.")
         return False
 
+    def _checkpoint_path(self, run_id=None):
+        return os.path.join(self.checkpoint_dir, f"{run_id or self.storage['$id']}.json")
+
+    def _results_path(self, run_id=None):
+        return os.path.join(self.checkpoint_dir, f"{run_id or self.storage['$id']}.results.jsonl")
+
+    def _log_results(self, result):
+        """Menambahkan hasil analyze ke log results (satu baris JSON per lead), sehingga checkpoint tidak menulis ulang $results."""
+        results = result if isinstance(result, list) else [result] if result else []
+        if not results:
+            return
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        with open(self._results_path(), "a", encoding="utf-8") as f:
+            f.writelines(json.dumps(item) + "\n" for item in results)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _checkpoint(self, next_task):
+        """
+        Menyimpan $state, $metadata, dan task berikutnya secara atomik (tulis file sementara lalu rename).
+        $results tidak ikut ditulis; resultsCount menandai berapa baris log results yang sudah tercakup checkpoint ini.
+        """
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        path = self._checkpoint_path()
+        tmp_path = f"{path}.tmp"
+        storage = {key: value for key, value in self.storage.items() if key != "$results"}
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"storage": storage, "resultsCount": len(self.storage["$results"]), "next": next_task}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def _load_results(self, run_id, count):
+        """Membaca `count` hasil pertama dari log results; baris setelahnya berasal dari task yang akan diulang."""
+        results = []
+        if count and os.path.exists(self._results_path(run_id)):
+            with open(self._results_path(run_id), encoding="utf-8") as f:
+                for line in f:
+                    if len(results) >= count:
+                        break
+                    results.append(json.loads(line))
+        return results
+
+    @classmethod
+    def resume(cls, run_id):
+        """Melanjutkan run dari checkpoint terakhir tanpa mengulang lead yang sudah selesai dianalisis."""
+        executor = cls()
+        with open(executor._checkpoint_path(run_id), encoding="utf-8") as f:
+            checkpoint = json.load(f)
+        executor.storage = checkpoint["storage"]
+        if "$results" not in executor.storage:
+            executor.storage["$results"] = executor._load_results(run_id, checkpoint.get("resultsCount", 0))
+            # Log results dipotong ke isi checkpoint agar hasil dari task yang diulang tidak tercatat dua kali
+            with open(executor._results_path(run_id), "w", encoding="utf-8") as f:
+                f.writelines(json.dumps(item) + "\n" for item in executor.storage["$results"])
+        next_task = checkpoint.get("next")
+        if not next_task:
+            print(f"Run {run_id} already finished.")
+            return executor
+        print(f"Resuming run {run_id} at task '{next_task['key']}' with {len(executor.storage['$results'])} results.")
+        executor.execute_task(next_task["key"], next_task["payload"])
+        return executor
+
     def start_workflow(self, prompt):
         """Memulai alur kerja dari sebuah prompt."""
         self.storage["$metadata"]["startedAt"] = datetime.now(UTC).isoformat() + "Z"
@@ -135,6 +208,8 @@ class WorkflowExecutor:
             
         if not parameters.get("numberOfLeads"):
             parameters["numberOfLeads"] = 5
+        if self.use_session:
+            parameters["useSession"] = True
         print(f"Parsed parameters: {json.dumps(parameters, indent=2)}")
         
         self.execute_task("input", parameters)
@@ -142,13 +217,16 @@ class WorkflowExecutor:
     def get_storage(self):
         return self.storage
 
-def run_simulation():
-    """Menjalankan simulasi alur kerja dari awal hingga akhir."""
-    executor = WorkflowExecutor()
-    prompt = "Cari 1 restoran di surabaya yang jualan obat batuk"
-    
-    print("Starting workflow...")
-    executor.start_workflow(prompt)
+def run_simulation(resume_run_id=None):
+    """Menjalankan simulasi alur kerja dari awal hingga akhir (atau melanjutkan run dari checkpoint)."""
+    if resume_run_id:
+        executor = WorkflowExecutor.resume(resume_run_id)
+    else:
+        executor = WorkflowExecutor()
+        prompt = "Cari 1 restoran di surabaya yang jualan obat batuk"
+        
+        print("Starting workflow...")
+        executor.start_workflow(prompt)
     
     print("\n--- Final Central Storage ---")
     storage = executor.get_storage()
@@ -162,7 +240,8 @@ def run_simulation():
         json.dump(storage, f, indent=2)
         
     print(f"Central Storage has been saved to {output_filename}")
-    print("API call logs have been saved to workflow_api_calls.log")
+    print(f"API call logs have been saved to {executor.call_log.path}")
 
 if __name__ == "__main__":
-    run_simulation()
\ No newline at end of file
+    # python WorkflowExecutor.py [--resume <run_id>]
+    run_simulation(sys.argv[2] if len(sys.argv) > 2 and sys.argv[1] == "--resume" else None)
\ No newline at end of file
@@ -1,13 +1,15 @@
 from flask import Flask
-from flasgger import Swagger
 from src.api.routes import api_bp
+from src.api.metrics import metrics_bp
+from src.api.swagger import CachedSwagger
 from config import Config
 
 def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
     app.register_blueprint(api_bp, url_prefix='/task')
-    Swagger(app)
+    app.register_blueprint(metrics_bp)
+    CachedSwagger(app)
     return app
 
 if __name__ == "__main__":
@@ -0,0 +1,281 @@
+"""
+Load test end-to-end: banyak klien bergaya WorkflowExecutor (protokol $state/next lewat HTTP) dijalankan
+terhadap app Flask dengan backend stub, dengan laju kedatangan (Poisson) yang bisa diatur.
+
+    python -m benchmarks.load_test --rate 2 --duration 60 --leads 3
+    python -m benchmarks.load_test --url http://127.0.0.1:8000/task --server-pid 1234   # server yang sudah berjalan
+
+Melaporkan throughput, p50/p95/p99 latensi per endpoint /task/*, error rate, serta CPU dan RSS server
+(dibaca dari /proc, termasuk proses anak seperti worker gunicorn).
+"""
+import argparse
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, UTC
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import requests
+from src.core.runner import resolve_refs, unwrap_state_payload
+from benchmarks.stub_server import add_stub_arguments
+from benchmarks.run_benchmarks import summarize
+
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+class Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = {}
+        self.errors = {}
+        self.workflows = {"completed": 0, "failed": 0, "leads": 0}
+        self.workflow_durations = []
+
+    def request(self, endpoint, seconds, ok):
+        with self._lock:
+            self.latencies.setdefault(endpoint, []).append(seconds)
+            if not ok:
+                self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+    def workflow(self, seconds, ok, leads):
+        with self._lock:
+            self.workflows["completed" if ok else "failed"] += 1
+            self.workflows["leads"] += leads
+            self.workflow_durations.append(seconds)
+
+def run_client(base_url, params, recorder, session, max_steps):
+    """Satu klien: input -> ... -> done, sama seperti WorkflowExecutor.execute_task."""
+    started = time.perf_counter()
+    state, leads = {}, 0
+    next_task = {"key": "input", "payload": params}
+    for _ in range(max_steps):
+        key = next_task["key"]
+        payload = unwrap_state_payload(resolve_refs(next_task["payload"], state))
+        request_start = time.perf_counter()
+        try:
+            response = session.post(f"{base_url}/{key}", json=payload, timeout=300)
+            ok = response.status_code < 400
+            data = response.json() if ok else None
+        except (requests.RequestException, ValueError):
+            ok, data = False, None
+        recorder.request(key, time.perf_counter() - request_start, ok)
+        if not ok:
+            recorder.workflow(time.perf_counter() - started, False, leads)
+            return
+        if data.get("state"):
+            state.update(data["state"])
+        result = data.get("result")
+        leads += len(result) if isinstance(result, list) else 1 if result else 0
+        next_task = data.get("next")
+        if data.get("done") or not next_task or not next_task.get("key"):
+            break
+    recorder.workflow(time.perf_counter() - started, True, leads)
+
+def process_tree(pid):
+    """pid beserta semua turunannya (dari /proc/*/stat)."""
+    children = {}
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            try:
+                with open(f"/proc/{entry}/stat") as f:
+                    ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+                children.setdefault(ppid, []).append(int(entry))
+            except (OSError, IndexError, ValueError):
+                continue
+    tree, stack = [], [pid]
+    while stack:
+        current = stack.pop()
+        tree.append(current)
+        stack.extend(children.get(current, []))
+    return tree
+
+def sample_process(pid):
+    """(detik CPU user+system, RSS bytes) untuk pid dan turunannya."""
+    cpu, rss = 0.0, 0
+    for child in process_tree(pid):
+        try:
+            with open(f"/proc/{child}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+            cpu += (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+            with open(f"/proc/{child}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        rss += int(line.split()[1]) * 1024
+        except (OSError, IndexError, ValueError):
+            continue
+    return cpu, rss
+
+class ProcessMonitor(threading.Thread):
+    def __init__(self, pid, interval=0.5):
+        super().__init__(daemon=True)
+        self.pid, self.interval = pid, interval
+        self.samples = []
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            self.samples.append((time.perf_counter(),) + sample_process(self.pid))
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        self.samples.append((time.perf_counter(),) + sample_process(self.pid))
+
+    def report(self):
+        if len(self.samples) < 2:
+            return None
+        (t0, cpu0, _), (t1, cpu1, _) = self.samples[0], self.samples[-1]
+        return {
+            "cpu_percent_avg": (cpu1 - cpu0) / (t1 - t0) * 100 if t1 > t0 else None,
+            "rss_mb_max": max(s[2] for s in self.samples) / 1024 / 1024,
+            "rss_mb_end": self.samples[-1][2] / 1024 / 1024,
+        }
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def stub_server_command(args, port):
+    return [sys.executable, "-m", "benchmarks.stub_server", "--port", str(port)] + stub_arguments(args)
+
+def stub_arguments(args):
+    """Opsi stub (lihat stub_server.add_stub_arguments) sebagai argumen CLI."""
+    arguments = ["--places", str(args.places), "--seed", str(args.seed), "--latency", args.latency,
+                 "--latency-scale", str(args.latency_scale), "--error-rate", str(args.error_rate),
+                 "--timeout-rate", str(args.timeout_rate)]
+    return arguments + (["--cold-caches"] if args.cold_caches else [])
+
+def start_server(command, port, env=None, startup_timeout=60):
+    """
+    Menjalankan server di subprocess dan menunggu sampai menjawab HTTP.
+    Mengembalikan (process, base_url, detik sampai siap).
+    """
+    started = time.perf_counter()
+    process = subprocess.Popen(command, cwd=ROOT, env={**os.environ, **(env or {})},
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + startup_timeout
+    while time.time() < deadline:
+        try:
+            requests.get(f"http://127.0.0.1:{port}/metrics", timeout=1)
+            return process, f"http://127.0.0.1:{port}/task", time.perf_counter() - started
+        except requests.RequestException:
+            if process.poll() is not None:
+                raise RuntimeError(f"Server exited with code {process.returncode}")
+            time.sleep(0.05)
+    process.terminate()
+    raise RuntimeError(f"Server did not start within {startup_timeout}s")
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+def run_load(base_url, params, rate, duration, max_clients=200, max_steps=500, server_pid=None):
+    """Workflow datang dengan proses Poisson (rate per detik) selama duration detik; mengembalikan laporan."""
+    recorder = Recorder()
+    monitor = ProcessMonitor(server_pid) if server_pid else None
+    session = requests.Session()
+    session.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=max_clients))
+    rng = random.Random(0)
+    if monitor:
+        monitor.start()
+    started = time.perf_counter()
+    launched = 0
+    with ThreadPoolExecutor(max_workers=max_clients) as pool:
+        next_arrival = started
+        while next_arrival - started < duration:
+            time.sleep(max(0.0, next_arrival - time.perf_counter()))
+            pool.submit(run_client, base_url, params, recorder, session, max_steps)
+            launched += 1
+            next_arrival += rng.expovariate(rate)
+    elapsed = time.perf_counter() - started
+    server = None
+    if monitor:
+        monitor.stop()
+        server = monitor.report()
+    session.close()
+
+    total_requests = sum(len(v) for v in recorder.latencies.values())
+    return {
+        "elapsed_s": elapsed, "workflows_launched": launched, "workflows": recorder.workflows,
+        "workflows_per_s": recorder.workflows["completed"] / elapsed, "requests_per_s": total_requests / elapsed,
+        "workflow_latency": summarize(recorder.workflow_durations) if recorder.workflow_durations else None,
+        "endpoints": {
+            endpoint: {**summarize(samples), "errors": recorder.errors.get(endpoint, 0),
+                       "error_rate": recorder.errors.get(endpoint, 0) / len(samples)}
+            for endpoint, samples in sorted(recorder.latencies.items())
+        },
+        "server": server,
+    }
+
+def print_report(report):
+    workflows = report["workflows"]
+    print(f"{report['workflows_launched']} workflows in {report['elapsed_s']:.1f}s: {workflows['completed']} completed, "
+          f"{workflows['failed']} failed, {report['workflows_per_s']:.2f} workflows/s, {report['requests_per_s']:.1f} req/s")
+    print(f"{'endpoint':14} {'count':>7} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'errors':>7}")
+    for endpoint, stats in report["endpoints"].items():
+        print(f"{endpoint:14} {stats['iterations']:7d} {stats['p50_ms']:10.1f} {stats['p95_ms']:10.1f} {stats['p99_ms']:10.1f} {stats['errors']:7d}")
+    server = report["server"]
+    if server:
+        print(f"server: CPU {server['cpu_percent_avg']:.0f}% avg, RSS max {server['rss_mb_max']:.0f} MB")
+
+def workflow_params(args):
+    return {"business_type": "restoran", "location": "Surabaya", "numberOfLeads": args.leads, "keywords": "nyaman",
+            "batchSize": args.batch_size, "analysisMode": args.analysis_mode, "useSession": args.use_session}
+
+def add_load_arguments(parser):
+    parser.add_argument("--rate", type=float, default=1.0, help="New workflows per second (Poisson arrivals)")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to keep starting new workflows")
+    parser.add_argument("--max-clients", type=int, default=200, help="Upper bound of concurrently running workflows")
+    parser.add_argument("--leads", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=1)
+    parser.add_argument("--analysis-mode", default="standard")
+    parser.add_argument("--use-session", action="store_true")
+    parser.add_argument("--max-steps", type=int, default=500)
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end load test of the /task API.")
+    add_load_arguments(parser)
+    parser.add_argument("--url", help="Existing server base URL (e.g. http://127.0.0.1:5000/task); skips starting one")
+    parser.add_argument("--server-pid", type=int, help="PID to monitor when --url is used")
+    parser.add_argument("--server-cmd", help="Custom server command, '{port}' is substituted")
+    parser.add_argument("--output", default=os.path.join(ROOT, "benchmarks", "results", "load_test.json"))
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    process = None
+    if args.url:
+        base_url, server_pid = args.url.rstrip("/"), args.server_pid
+    else:
+        port = free_port()
+        command = args.server_cmd.replace("{port}", str(port)).split() if args.server_cmd else stub_server_command(args, port)
+        process, base_url, _ = start_server(command, port)
+        server_pid = process.pid
+    try:
+        report = run_load(base_url, workflow_params(args), args.rate, args.duration, args.max_clients, args.max_steps, server_pid)
+    finally:
+        if process is not None:
+            stop_server(process)
+
+    report = {"createdAt": datetime.now(UTC).isoformat(),
+              "settings": {key: value for key, value in vars(args).items() if key != "output"}, **report}
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print_report(report)
+    print(f"Saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
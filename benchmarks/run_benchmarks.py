@@ -0,0 +1,157 @@
+"""
+Benchmark komponen (Formatter, Analyzer._calculate_match, Finder) dan run Workflow penuh terhadap backend stub.
+
+    python -m benchmarks.run_benchmarks --output benchmarks/results/latest.json
+    python -m benchmarks.run_benchmarks --latency realistic --latency-scale 0.05 --baseline benchmarks/results/baseline.json
+
+Secara default cache (place details, review store, LLM, blob details) diarahkan ke direktori sementara dan
+dimatikan agar setiap iterasi mengukur jalur cold; gunakan --warm-caches untuk mengukur jalur cache.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, UTC
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_FLAGS = ("PLACE_DETAILS_CACHE_ENABLED", "REVIEW_STORE_ENABLED", "LLM_CACHE_ENABLED", "DETAILS_REF_ENABLED")
+
+def configure_env(warm_caches):
+    """Harus dipanggil sebelum config/src diimpor karena Config membaca env saat import."""
+    os.environ.setdefault("CACHE_DIR", tempfile.mkdtemp(prefix="bench-cache-"))
+    for flag in CACHE_FLAGS:
+        os.environ.setdefault(flag, "true" if warm_caches else "false")
+    # Benchmark komponen mengukur kode kita, bukan antrean rate limit provider
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+
+def summarize(samples):
+    ordered = sorted(samples)
+    def pct(p):
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+    total = sum(samples)
+    return {
+        "iterations": len(samples), "mean_ms": statistics.fmean(samples) * 1000, "p50_ms": pct(50) * 1000,
+        "p95_ms": pct(95) * 1000, "p99_ms": pct(99) * 1000, "min_ms": ordered[0] * 1000, "max_ms": ordered[-1] * 1000,
+        "ops_per_s": len(samples) / total if total else None,
+    }
+
+def timeit(fn, iterations, warmup=1):
+    for _ in range(warmup):
+        fn(0)
+    samples = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        fn(i)
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+def run_suite(args):
+    from benchmarks.stubs import StubBackend, FaultModel
+    faults = {}
+    if args.error_rate or args.timeout_rate:
+        faults = {service: FaultModel(args.error_rate, args.timeout_rate) for service in ("gmaps", "searchapi", "openai")}
+    backend = StubBackend(places=args.places, seed=args.seed, latency=args.latency, latency_scale=args.latency_scale, faults=faults).install()
+
+    from app import create_app
+    from src.core.workflow import Workflow
+    from src.core.runner import WorkflowRunner
+    from src.utils.formatter import Formatter
+
+    app = create_app()
+    constraints = {"min_rating": 4.0, "min_reviews": 20, "max_reviews": None, "price_range": "$$",
+                   "keywords": "nyaman", "business_hours": "anytime", "location": "Surabaya"}
+    results = {}
+    with app.app_context():
+        workflow = Workflow()
+        formatter = Formatter()
+        place = backend.places[0]
+        raw_details = {key: value for key, value in place.items() if not key.startswith("_")}
+        place_result = {"reviews": place["user_ratings_total"], "reviews_histogram": place["_histogram"]}
+        formatted = formatter.format_place_details(raw_details, place["_reviews"], 3, place_result)
+        selected = set(args.only or ["formatter", "match", "finder", "workflow"])
+
+        if "formatter" in selected:
+            results["formatter.format_place_details"] = timeit(
+                lambda i: formatter.format_place_details(raw_details, place["_reviews"], 3, place_result), args.iterations * 20)
+        if "match" in selected:
+            results["analyzer._calculate_match"] = timeit(
+                lambda i: workflow.analyzer._calculate_match(formatted, constraints), args.iterations * 50)
+        if "finder" in selected:
+            place_ids = [p["place_id"] for p in backend.places]
+            results["finder.get_business_details"] = timeit(
+                lambda i: workflow.finder.get_business_details(place_ids[i % len(place_ids)], constraints), args.iterations)
+        if "workflow" in selected:
+            params = {"business_type": "restoran", "location": "Surabaya", "numberOfLeads": args.leads,
+                      "keywords": "nyaman", "min_rating": 3.5, "analysisMode": args.analysis_mode, "batchSize": args.batch_size}
+            leads = []
+            def full_run(i):
+                events = list(WorkflowRunner(workflow).run(params))
+                leads.append(sum(1 for e in events if e["type"] == "lead"))
+            results["workflow.full_run"] = timeit(full_run, max(1, args.iterations // 5), warmup=0)
+            results["workflow.full_run"]["leads_per_run"] = statistics.fmean(leads)
+
+    backend.uninstall()
+    return results, dict(backend.calls)
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def compare(results, baseline):
+    """Mencetak perubahan p50 terhadap baseline (positif = lebih lambat)."""
+    print(f"\n{'benchmark':40} {'p50 ms':>12} {'baseline':>12} {'delta':>9}")
+    for name, current in results.items():
+        base = baseline.get("results", {}).get(name)
+        if not base:
+            print(f"{name:40} {current['p50_ms']:12.3f} {'-':>12} {'-':>9}")
+            continue
+        delta = (current["p50_ms"] - base["p50_ms"]) / base["p50_ms"] * 100 if base["p50_ms"] else 0.0
+        print(f"{name:40} {current['p50_ms']:12.3f} {base['p50_ms']:12.3f} {delta:+8.1f}%")
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline component benchmarks against stub backends.")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--places", type=int, default=60)
+    parser.add_argument("--leads", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", default="zero", help="Latency profile: zero or realistic")
+    parser.add_argument("--latency-scale", type=float, default=1.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--timeout-rate", type=float, default=0.0)
+    parser.add_argument("--analysis-mode", default="standard")
+    parser.add_argument("--batch-size", type=int, default=1)
+    parser.add_argument("--warm-caches", action="store_true")
+    parser.add_argument("--only", nargs="*", choices=["formatter", "match", "finder", "workflow"])
+    parser.add_argument("--output", default=os.path.join(ROOT, "benchmarks", "results", "latest.json"))
+    parser.add_argument("--baseline")
+    args = parser.parse_args()
+
+    configure_env(args.warm_caches)
+    results, calls = run_suite(args)
+    report = {
+        "createdAt": datetime.now(UTC).isoformat(), "commit": git_commit(), "python": platform.python_version(),
+        "settings": {key: value for key, value in vars(args).items() if key not in ("output", "baseline")},
+        "results": results, "stubCalls": calls,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    for name, stats in results.items():
+        print(f"{name:40} p50 {stats['p50_ms']:10.3f} ms  p95 {stats['p95_ms']:10.3f} ms  ({stats['iterations']} it)")
+    print(f"Saved to {args.output}")
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            compare(results, json.load(f))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Membandingkan mode server: server development Flask (werkzeug, satu proses) dan gunicorn multi-worker
+(gunicorn.conf.py, dengan warmup per worker), keduanya terhadap backend stub.
+
+    python -m benchmarks.server_benchmark --rate 5 --duration 30 --workers 4
+
+Untuk setiap mode diukur waktu startup (spawn sampai server menjawab HTTP), latensi /task/input pertama
+(biaya membangun Workflow bila belum di-warmup), lalu throughput dan latensi per endpoint dari load_test.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, UTC
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import requests
+from benchmarks.load_test import (add_load_arguments, free_port, print_report, run_load, start_server,
+                                  stop_server, stub_arguments, stub_server_command, workflow_params)
+from benchmarks.stub_server import add_stub_arguments
+
+def server_command(mode, args, port):
+    if mode == "dev":
+        return stub_server_command(args, port), {}
+    command = [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "--bind", f"127.0.0.1:{port}",
+               "--workers", str(args.workers), "--threads", str(args.threads), "benchmarks.stub_server:stub_app()"]
+    return command, {"STUB_SERVER_ARGS": " ".join(stub_arguments(args))}
+
+def first_request(base_url, params):
+    start = time.perf_counter()
+    response = requests.post(f"{base_url}/input", json=params, timeout=60)
+    response.raise_for_status()
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup and throughput of the dev server vs gunicorn.")
+    add_load_arguments(parser)
+    parser.add_argument("--modes", nargs="*", default=["dev", "gunicorn"], choices=["dev", "gunicorn"])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--output", default=os.path.join(ROOT, "benchmarks", "results", "server_benchmark.json"))
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    params = workflow_params(args)
+    results = {}
+    for mode in args.modes:
+        port = free_port()
+        command, env = server_command(mode, args, port)
+        process, base_url, startup = start_server(command, port, env)
+        try:
+            first = first_request(base_url, params)
+            report = run_load(base_url, params, args.rate, args.duration, args.max_clients, args.max_steps, process.pid)
+        finally:
+            stop_server(process)
+        results[mode] = {"startup_s": startup, "first_input_ms": first * 1000, **report}
+        print(f"\n== {mode}: startup {startup:.2f}s, first /task/input {first * 1000:.1f} ms")
+        print_report(report)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"createdAt": datetime.now(UTC).isoformat(),
+                   "settings": {key: value for key, value in vars(args).items() if key != "output"},
+                   "results": results}, f, indent=2)
+    print(f"Saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
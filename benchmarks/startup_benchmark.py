@@ -0,0 +1,108 @@
+"""
+Mengukur cold start app di proses Python baru (seperti container autoscale yang baru hidup):
+import app, create_app(), warmup, request /task/input pertama (membangun Workflow bila belum di-warmup),
+dan /apispec_1.json pertama. Backend stub dipasang setelah create_app() agar tidak ikut mengimpor modul lebih dulu.
+
+    python -m benchmarks.startup_benchmark --runs 5 --budget-ms 800 --importtime 15
+
+Keluar dengan kode 1 bila median import + create_app melebihi --budget-ms.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, UTC
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r"""
+import json, sys, time
+timings = {}
+start = time.perf_counter()
+import app
+timings["import_ms"] = (time.perf_counter() - start) * 1000
+start = time.perf_counter()
+flask_app = app.create_app()
+timings["create_app_ms"] = (time.perf_counter() - start) * 1000
+from benchmarks.stubs import StubBackend
+StubBackend(latency="zero").install()
+if WARM_UP:
+    from src.api.routes import warm_up
+    start = time.perf_counter()
+    warm_up()
+    flask_app.swag.precompute()
+    timings["warm_up_ms"] = (time.perf_counter() - start) * 1000
+client = flask_app.test_client()
+start = time.perf_counter()
+response = client.post("/task/input", json={"business_type": "restoran", "location": "Surabaya", "numberOfLeads": 1})
+timings["first_input_ms"] = (time.perf_counter() - start) * 1000
+start = time.perf_counter()
+client.post("/task/input", json={"business_type": "restoran", "location": "Surabaya", "numberOfLeads": 1})
+timings["second_input_ms"] = (time.perf_counter() - start) * 1000
+start = time.perf_counter()
+client.get("/apispec_1.json")
+timings["first_apispec_ms"] = (time.perf_counter() - start) * 1000
+timings["status"] = response.status_code
+timings["openai_imported"] = "openai" in sys.modules
+print(json.dumps(timings))
+"""
+
+def run_child(warm_up):
+    env = {**os.environ, "CACHE_DIR": tempfile.mkdtemp(prefix="startup-cache-")}
+    result = subprocess.run([sys.executable, "-c", f"WARM_UP = {warm_up}\n{CHILD}"], cwd=ROOT, env=env,
+                            capture_output=True, text=True, timeout=120)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def import_profile(top):
+    """Modul dengan waktu import kumulatif terbesar untuk 'import app' (python -X importtime)."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app"], cwd=ROOT,
+                            env={**os.environ, "CACHE_DIR": tempfile.mkdtemp(prefix="startup-cache-")},
+                            capture_output=True, text=True, timeout=120)
+    rows = []
+    for line in result.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            rows.append((int(parts[1]), parts[2].strip()))
+    return [{"module": name, "cumulative_ms": us / 1000} for us, name in sorted(rows, reverse=True)[:top]]
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold start benchmark of the Flask app.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=800.0, help="Budget for median import + create_app")
+    parser.add_argument("--importtime", type=int, default=0, metavar="N", help="Also list the N slowest imports")
+    parser.add_argument("--output", default=os.path.join(ROOT, "benchmarks", "results", "startup.json"))
+    args = parser.parse_args()
+
+    results = {}
+    for mode, warm_up in (("cold", False), ("warmed", True)):
+        runs = [run_child(warm_up) for _ in range(args.runs)]
+        keys = [key for key, value in runs[0].items() if key.endswith("_ms")]
+        results[mode] = {key: statistics.median(run[key] for run in runs) for key in keys}
+        results[mode]["openai_imported_at_startup"] = runs[0]["openai_imported"]
+        print(f"{mode:7} " + "  ".join(f"{key[:-3]} {value:.1f} ms" for key, value in results[mode].items() if key.endswith("_ms")))
+
+    startup_ms = results["cold"]["import_ms"] + results["cold"]["create_app_ms"]
+    report = {"createdAt": datetime.now(UTC).isoformat(), "runs": args.runs, "budget_ms": args.budget_ms,
+              "startup_ms": startup_ms, "results": results}
+    if args.importtime:
+        report["slowest_imports"] = import_profile(args.importtime)
+        print("\nslowest imports (cumulative):")
+        for row in report["slowest_imports"]:
+            print(f"  {row['cumulative_ms']:8.1f} ms  {row['module']}")
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    within = startup_ms <= args.budget_ms
+    print(f"\nimport + create_app: {startup_ms:.1f} ms (budget {args.budget_ms:.0f} ms) {'OK' if within else 'OVER BUDGET'}")
+    print(f"Saved to {args.output}")
+    if not within:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Menjalankan app Flask (app.create_app) dengan backend stub (lihat benchmarks/stubs.py), untuk load test.
+
+    python -m benchmarks.stub_server --port 5055 --latency realistic --latency-scale 0.1
+    STUB_SERVER_ARGS="--latency-scale 0.1" gunicorn -c gunicorn.conf.py "benchmarks.stub_server:stub_app()"
+"""
+import argparse
+import os
+import shlex
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def build_app(args):
+    os.environ.setdefault("CACHE_DIR", tempfile.mkdtemp(prefix="stub-server-cache-"))
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    from benchmarks.run_benchmarks import CACHE_FLAGS
+    if args.cold_caches:
+        for flag in CACHE_FLAGS:
+            os.environ[flag] = "false"
+    from benchmarks.stubs import StubBackend, FaultModel
+    faults = {}
+    if args.error_rate or args.timeout_rate:
+        faults = {service: FaultModel(args.error_rate, args.timeout_rate) for service in ("gmaps", "searchapi", "openai")}
+    StubBackend(places=args.places, seed=args.seed, latency=args.latency, latency_scale=args.latency_scale, faults=faults).install()
+    from app import create_app
+    return create_app()
+
+def add_stub_arguments(parser):
+    parser.add_argument("--places", type=int, default=60)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", default="realistic", help="Latency profile: zero or realistic")
+    parser.add_argument("--latency-scale", type=float, default=0.1)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--timeout-rate", type=float, default=0.0)
+    parser.add_argument("--cold-caches", action="store_true", help="Disable place details, review, LLM and details-ref caches")
+
+def stub_app():
+    """Factory untuk gunicorn; opsi stub dibaca dari env STUB_SERVER_ARGS."""
+    parser = argparse.ArgumentParser()
+    add_stub_arguments(parser)
+    return build_app(parser.parse_args(shlex.split(os.getenv("STUB_SERVER_ARGS", ""))))
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the API against stub backends.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5055)
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    from werkzeug.serving import make_server
+    server = make_server(args.host, args.port, build_app(args), threaded=True)
+    print(f"Stub server listening on http://{args.host}:{args.port}", flush=True)
+    server.serve_forever()
+
+if __name__ == "__main__":
+    main()
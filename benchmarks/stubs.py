@@ -0,0 +1,321 @@
+"""
+Backend stub offline untuk Google Places (text search/details), searchapi.io (google_maps_reviews) dan
+OpenAI chat completions. Dipakai benchmark dan load test tanpa API key.
+
+HTTP di-stub lewat requests adapter yang di-mount ke Session HttpClient bersama, sehingga kode service
+(parsing, cache, review store, metrik) tetap berjalan apa adanya. OpenAI diganti klien palsu dengan
+bentuk respons yang sama (choices[0].message.content dan usage).
+"""
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from types import SimpleNamespace
+from urllib.parse import urlsplit, parse_qs
+import requests
+from requests.adapters import BaseAdapter
+
+FIXTURE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "central_storage_output.json")
+
+GMAPS_HOST = "https://maps.googleapis.com"
+SEARCHAPI_HOST = "https://www.searchapi.io"
+
+POSITIVE_TEXTS = ["Tempatnya nyaman dan bersih, cocok buat nugas.", "Makanannya enak, pelayanan cepat.", "Harga terjangkau untuk porsi yang besar.", "Wifi kencang dan banyak colokan."]
+NEGATIVE_TEXTS = ["Antrian panjang saat jam makan siang.", "Parkir sempit dan susah.", "Pelayanan lambat ketika ramai.", "AC kurang dingin."]
+
+class LatencyModel:
+    """Latensi log-normal dari median dan p95 (detik); median 0 berarti tanpa jeda."""
+    def __init__(self, median=0.0, p95=None):
+        self.median = median
+        self.p95 = p95 if p95 is not None else median
+        self.sigma = math.log(self.p95 / self.median) / 1.645 if self.median > 0 and self.p95 > self.median else 0.0
+
+    def sample(self, rng, scale=1.0):
+        if self.median <= 0:
+            return 0.0
+        return scale * self.median * math.exp(self.sigma * rng.gauss(0, 1))
+
+# Profil latensi per operasi (median, p95) dalam detik
+LATENCY_PROFILES = {
+    "zero": {},
+    "realistic": {
+        "gmaps.text_search": (0.35, 0.9), "gmaps.place_details": (0.15, 0.45),
+        "searchapi.reviews_page": (1.2, 6.0), "searchapi.keyword_search": (1.5, 8.0),
+        "openai.chat_completion": (1.8, 5.0),
+    },
+}
+
+class FaultModel:
+    """Distribusi error: error_rate menghasilkan status `error_status`, timeout_rate menghasilkan timeout."""
+    def __init__(self, error_rate=0.0, timeout_rate=0.0, error_status=500):
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.error_status = error_status
+
+    def sample(self, rng):
+        roll = rng.random()
+        if roll < self.timeout_rate:
+            return "timeout"
+        if roll < self.timeout_rate + self.error_rate:
+            return "error"
+        return None
+
+class RateLimitError(Exception):
+    """Dinamai seperti openai.RateLimitError agar klasifikasi error (metrik) sama."""
+
+class APITimeoutError(Exception):
+    """Dinamai seperti openai.APITimeoutError."""
+
+class StubBackend:
+    """
+    Data tempat sintetis (di-seed dari central_storage_output.json) dan handler untuk ketiga API.
+    latency: dict operasi -> (median, p95) atau nama profil di LATENCY_PROFILES; faults: dict service -> FaultModel.
+    """
+    PAGE_SIZE = 20
+    REVIEWS_PER_PAGE = 10
+    # Detik sampai next_page_token Text Search valid (seperti Google); dikali latency_scale bila page_token_delay tidak diberikan
+    PAGE_TOKEN_DELAY = 2.0
+
+    def __init__(self, places=60, reviews_per_place=40, seed=0, latency="zero", latency_scale=1.0, faults=None,
+                 fixture=FIXTURE_PATH, page_token_delay=None):
+        self.rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        profile = LATENCY_PROFILES[latency] if isinstance(latency, str) else latency
+        self.latency = {op: LatencyModel(*values) for op, values in profile.items()}
+        self.latency_scale = latency_scale
+        self.faults = faults or {}
+        self.calls = {}
+        self.places = self._build_places(places, reviews_per_place, fixture)
+        self.places_by_id = {place["place_id"]: place for place in self.places}
+        self.page_token_delay = self.PAGE_TOKEN_DELAY * latency_scale if page_token_delay is None else page_token_delay
+        self._page_tokens = {}
+        self._saved = None
+
+    # --- Data ---
+
+    def _build_places(self, count, reviews_per_place, fixture):
+        templates = []
+        if fixture and os.path.exists(fixture):
+            with open(fixture, encoding="utf-8") as f:
+                templates = json.load(f).get("$results", [])
+        if not templates:
+            templates = [{"placeName": "Stub Place", "address": "Surabaya", "rating": 4.5, "totalRatings": 500,
+                          "priceRange": "$$", "businessHours": [], "businessType": ["restaurant"], "contact": {}}]
+        places = []
+        for i in range(count):
+            template = templates[i % len(templates)]
+            rating = round(min(5.0, max(2.5, (template.get("rating") or 4.3) + self.rng.uniform(-1.2, 0.3))), 1)
+            total = max(1, int((template.get("totalRatings") or 300) * self.rng.uniform(0.02, 1.5)))
+            seed_key = f"{template.get('placeId')}-{i}"
+            place_id = "stub_" + hashlib.sha1(seed_key.encode()).hexdigest()[:20]
+            now = int(time.time())
+            reviews = []
+            for j in range(reviews_per_place):
+                star = self.rng.choices([5, 4, 3, 2, 1], weights=[45, 25, 10, 8, 12])[0]
+                texts = POSITIVE_TEXTS if star >= 4 else NEGATIVE_TEXTS
+                reviews.append({
+                    "review_id": f"{place_id}_r{j}", "rating": star, "text": self.rng.choice(texts),
+                    "unix_timestamp": now - j * 86400 - self.rng.randint(0, 3600), "user": {"name": f"user{j}"}
+                })
+            histogram = {str(star): sum(1 for r in reviews if r["rating"] == star) * max(1, total // max(1, reviews_per_place)) for star in range(1, 6)}
+            contact = template.get("contact") or {}
+            places.append({
+                "place_id": place_id, "name": f"{template.get('placeName', 'Stub Place')} #{i}",
+                "formatted_address": template.get("address", "Surabaya"), "rating": rating, "user_ratings_total": total,
+                "price_level": len(template.get("priceRange") or "") or self.rng.choice([1, 2, 3]),
+                "formatted_phone_number": contact.get("phone"), "website": contact.get("website"),
+                "opening_hours": {"weekday_text": template.get("businessHours") or []},
+                "types": template.get("businessType") or ["restaurant"],
+                "_reviews": reviews, "_histogram": histogram,
+            })
+        return places
+
+    # --- Latensi & fault ---
+
+    def _delay_and_fault(self, operation):
+        """Menunggu sesuai profil latensi lalu mengembalikan fault yang terjadi (None, 'error', 'timeout')."""
+        service = operation.split(".")[0]
+        with self._rng_lock:
+            self.calls[operation] = self.calls.get(operation, 0) + 1
+            model = self.latency.get(operation)
+            delay = model.sample(self.rng, self.latency_scale) if model else 0.0
+            fault_model = self.faults.get(service)
+            fault = fault_model.sample(self.rng) if fault_model else None
+        if delay:
+            time.sleep(delay)
+        return fault, (fault_model.error_status if fault_model else 500)
+
+    # --- HTTP (Google Places & searchapi.io) ---
+
+    def handle_http(self, url, params):
+        """Mengembalikan (status, body dict) untuk satu request GET."""
+        path = urlsplit(url).path
+        if path.endswith("/place/textsearch/json"):
+            return self._text_search(params)
+        if path.endswith("/place/details/json"):
+            return self._place_details(params)
+        if path.endswith("/api/v1/search"):
+            return self._searchapi(params)
+        return 404, {"error": f"Stub has no route for {path}"}
+
+    def _text_search(self, params):
+        token = params.get("pagetoken")
+        if token:
+            with self._rng_lock:
+                issued_at = self._page_tokens.get(token)
+            if issued_at is not None and time.monotonic() - issued_at < self.page_token_delay:
+                return 200, {"status": "INVALID_REQUEST", "results": []}
+        page = int(token.split("-")[1]) if token else 0
+        start = page * self.PAGE_SIZE
+        results = [{key: place[key] for key in ("place_id", "name", "formatted_address", "rating", "user_ratings_total", "price_level")}
+                   for place in self.places[start:start + self.PAGE_SIZE]]
+        body = {"status": "OK" if results else "ZERO_RESULTS", "results": results}
+        # Google membatasi 3 halaman (60 hasil)
+        if start + self.PAGE_SIZE < len(self.places) and page < 2:
+            with self._rng_lock:
+                # Token unik per penerbitan agar workflow paralel tidak saling memperpanjang jeda token lain
+                token = f"stubpage-{page + 1}-{len(self._page_tokens)}"
+                self._page_tokens[token] = time.monotonic()
+            body["next_page_token"] = token
+        return 200, body
+
+    def _place_details(self, params):
+        place = self.places_by_id.get(params.get("place_id"))
+        if place is None:
+            return 200, {"status": "NOT_FOUND"}
+        return 200, {"status": "OK", "result": {key: value for key, value in place.items() if not key.startswith("_")}}
+
+    def _searchapi(self, params):
+        place = self.places_by_id.get(params.get("place_id"))
+        if place is None:
+            return 400, {"error": "Unknown place_id"}
+        place_result = {"reviews": place["user_ratings_total"], "reviews_histogram": place["_histogram"], "rating": place["rating"]}
+        query = params.get("search_query")
+        if query:
+            # Jumlah kecocokan keyword deterministik per (tempat, keyword); sebagian tempat tanpa kecocokan
+            digest = int(hashlib.sha1(f"{place['place_id']}|{query}".encode()).hexdigest(), 16)
+            matches = 0 if digest % 4 == 0 else 1 + digest % int(params.get("num") or 10)
+            return 200, {"reviews": place["_reviews"][:matches], "place_result": place_result}
+        token = params.get("next_page_token")
+        page = int(token.rsplit("-", 1)[1]) if token else 0
+        start = page * self.REVIEWS_PER_PAGE
+        reviews = place["_reviews"][start:start + self.REVIEWS_PER_PAGE]
+        body = {"reviews": reviews, "place_result": place_result, "pagination": {}}
+        if start + self.REVIEWS_PER_PAGE < len(place["_reviews"]):
+            body["pagination"]["next_page_token"] = f"stubreviews-{page + 1}"
+        return 200, body
+
+    # --- OpenAI ---
+
+    def chat_completion(self, **chat_params):
+        fault, _ = self._delay_and_fault("openai.chat_completion")
+        if fault == "timeout":
+            raise APITimeoutError("Stub OpenAI timeout")
+        if fault == "error":
+            raise RateLimitError("Stub OpenAI rate limit")
+        messages = chat_params.get("messages", [])
+        prompt = messages[-1]["content"] if messages else ""
+        if chat_params.get("response_format"):
+            content = json.dumps(self._json_completion(messages, prompt))
+        else:
+            content = "Pengunjung menyukai suasana dan harga, dengan beberapa keluhan soal antrian."
+        prompt_tokens = sum(len(m.get("content") or "") for m in messages) // 4 + 1
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+            usage=SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=len(content) // 4 + 1, total_tokens=prompt_tokens + len(content) // 4 + 1)
+        )
+
+    @staticmethod
+    def _json_completion(messages, prompt):
+        analysis = {"positiveSummary": "Suasana nyaman dan harga terjangkau.", "negativeSummary": "Antrian panjang saat ramai.",
+                    "strengths": ["Nyaman", "Terjangkau"], "weaknesses": ["Antrian", "Parkir"]}
+        if messages and messages[0].get("role") == "system":
+            # PromptParser: ekstraksi parameter pencarian
+            count = re.search(r"\b(\d+)\b", prompt)
+            return {"business_type": "restoran", "location": "Surabaya", "numberOfLeads": int(count.group(1)) if count else 5, "keywords": "nyaman"}
+        if '"results"' in prompt:
+            return {"results": {place_id: analysis for place_id in re.findall(r'"placeId": "([^"]+)"', prompt)}}
+        if "positiveSummary" in prompt:
+            return analysis
+        return {"strengths": analysis["strengths"], "weaknesses": analysis["weaknesses"]}
+
+    def openai_client(self):
+        return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=self.chat_completion)))
+
+    # --- Pemasangan ---
+
+    def install(self):
+        """
+        Mount adapter stub ke HttpClient bersama dan ganti klien OpenAI bersama. Harus dipanggil sebelum
+        Workflow/PromptParser dibuat. Mengisi API key kosong agar konstruktor service tidak menolak.
+        """
+        from config import Config
+        from src.services import openai_client, http_client
+        from src.core import prompt_parser
+
+        session = http_client.get_http_client().session
+        self._saved = {
+            "adapters": dict(session.adapters),
+            "get_openai_client": openai_client.get_openai_client,
+            "get_client": prompt_parser.get_client,
+            "keys": (Config.GOOGLE_MAPS_API_KEY, Config.SEARCHAPI_API_KEY, Config.OPENAI_API_KEY),
+        }
+        adapter = StubAdapter(self)
+        session.mount(GMAPS_HOST, adapter)
+        session.mount(SEARCHAPI_HOST, adapter)
+        openai_client.get_openai_client = self.openai_client
+        prompt_parser.get_client = lambda: (self.openai_client(), {}, "openai")
+        Config.GOOGLE_MAPS_API_KEY = Config.GOOGLE_MAPS_API_KEY or "stub"
+        Config.SEARCHAPI_API_KEY = Config.SEARCHAPI_API_KEY or "stub"
+        Config.OPENAI_API_KEY = Config.OPENAI_API_KEY or "stub"
+        return self
+
+    def uninstall(self):
+        if self._saved is None:
+            return
+        from config import Config
+        from src.services import openai_client, http_client
+        from src.core import prompt_parser
+        session = http_client.get_http_client().session
+        session.adapters.clear()
+        session.adapters.update(self._saved["adapters"])
+        openai_client.get_openai_client = self._saved["get_openai_client"]
+        prompt_parser.get_client = self._saved["get_client"]
+        Config.GOOGLE_MAPS_API_KEY, Config.SEARCHAPI_API_KEY, Config.OPENAI_API_KEY = self._saved["keys"]
+        self._saved = None
+
+class StubAdapter(BaseAdapter):
+    """requests adapter yang menjawab dari StubBackend (retry urllib3 tidak berlaku di sini)."""
+    def __init__(self, backend):
+        super().__init__()
+        self.backend = backend
+
+    def _operation(self, parts, params):
+        if parts.netloc.endswith("googleapis.com"):
+            return "gmaps.text_search" if "textsearch" in parts.path else "gmaps.place_details"
+        return "searchapi.keyword_search" if params.get("search_query") else "searchapi.reviews_page"
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        parts = urlsplit(request.url)
+        params = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        fault, error_status = self.backend._delay_and_fault(self._operation(parts, params))
+        if fault == "timeout":
+            raise requests.exceptions.ReadTimeout(f"Stub timeout for {parts.path}", request=request)
+        status, body = (error_status, {"error": "Stub injected error"}) if fault == "error" else self.backend.handle_http(request.url, params)
+
+        response = requests.Response()
+        response.status_code = status
+        response._content = json.dumps(body).encode("utf-8")
+        response.headers["Content-Type"] = "application/json"
+        response.encoding = "utf-8"
+        response.url = request.url
+        response.request = request
+        response.reason = "OK" if status < 400 else "Error"
+        return response
+
+    def close(self):
+        pass
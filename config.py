@@ -8,7 +8,101 @@ class Config:
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
     SEARCHAPI_API_KEY = os.getenv("SEARCHAPI_API_KEY", "DhyaGcMobTCxHcd2GaUJ6Z5o")
     SEARCHAPI_NUM_REVIEWS = 10
+    SEARCHAPI_READ_TIMEOUT = float(os.getenv("SEARCHAPI_READ_TIMEOUT", "45"))
+    # Transport HTTP bersama untuk Google Maps & SearchApi
+    HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+    HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "30"))
+    HTTP_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "10"))
+    HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "20"))
+    HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+    HTTP_BACKOFF_FACTOR = float(os.getenv("HTTP_BACKOFF_FACTOR", "0.5"))
+    # next_page_token Text Search baru valid ~2 detik setelah diterbitkan (sebelumnya INVALID_REQUEST)
+    GMAPS_PAGE_TOKEN_ATTEMPTS = int(os.getenv("GMAPS_PAGE_TOKEN_ATTEMPTS", "3"))
+    GMAPS_PAGE_TOKEN_RETRY_DELAY = float(os.getenv("GMAPS_PAGE_TOKEN_RETRY_DELAY", "2"))
+    # Cache lokal (SQLite) yang dipakai bersama oleh semua worker
+    CACHE_DIR = os.getenv("CACHE_DIR", ".cache")
+    PLACE_DETAILS_CACHE_ENABLED = os.getenv("PLACE_DETAILS_CACHE_ENABLED", "true").lower() == "true"
+    PLACE_DETAILS_CACHE_TTL = int(os.getenv("PLACE_DETAILS_CACHE_TTL", str(24 * 3600)))
+    PLACE_DETAILS_CACHE_STALE_TTL = int(os.getenv("PLACE_DETAILS_CACHE_STALE_TTL", str(6 * 24 * 3600)))
+    PLACE_DETAILS_CACHE_MAX_ENTRIES = int(os.getenv("PLACE_DETAILS_CACHE_MAX_ENTRIES", "50000"))
+    REVIEW_STORE_ENABLED = os.getenv("REVIEW_STORE_ENABLED", "true").lower() == "true"
+    REVIEW_STORE_REFRESH_INTERVAL = int(os.getenv("REVIEW_STORE_REFRESH_INTERVAL", str(6 * 3600)))
+    # Urutan review yang diambil: "relevance" (default SearchApi) atau "newest". Dengan "newest" refresh
+    # review store hanya mengambil halaman baru, tetapi review yang disampel untuk Formatter/LLM ikut berubah
+    REVIEW_SORT_BY = os.getenv("REVIEW_SORT_BY", "relevance")
+    # Mode sesi server-side: state workflow disimpan di server, klien hanya mengirim sessionId
+    SESSION_DEFAULT = os.getenv("SESSION_DEFAULT", "false").lower() == "true"
+    SESSION_TTL = int(os.getenv("SESSION_TTL", str(6 * 3600)))
+    # Jumlah sesi di LRU memori (0 = selalu decode dari SQLite); entri memori selalu dicek ulang ke updated_at di SQLite
+    SESSION_MEMORY_ENTRIES = int(os.getenv("SESSION_MEMORY_ENTRIES", "1000"))
+    # Hasil scrape disimpan di server (content-addressed); /analyze menerima detailsRef, bukan placeDetails penuh
+    DETAILS_REF_ENABLED = os.getenv("DETAILS_REF_ENABLED", "true").lower() == "true"
+    DETAILS_REF_TTL = int(os.getenv("DETAILS_REF_TTL", str(3600)))
+    DETAILS_REF_MAX_ENTRIES = int(os.getenv("DETAILS_REF_MAX_ENTRIES", "20000"))
+    # Rekam/replay semua panggilan Google Places, searchapi.io, dan OpenAI: 'off', 'record', atau 'replay'
+    CASSETTE_MODE = os.getenv("CASSETTE_MODE", "off").lower()
+    CASSETTE_PATH = os.getenv("CASSETTE_PATH", "cassettes/run.jsonl.gz")
+    # Pengali latensi rekaman saat replay (1 = latensi asli, 0 = tanpa jeda)
+    CASSETTE_LATENCY_SCALE = float(os.getenv("CASSETTE_LATENCY_SCALE", "1.0"))
+    # Server produksi (gunicorn.conf.py): worker prefork, thread per worker, keep-alive dan graceful shutdown
+    SERVER_BIND = os.getenv("SERVER_BIND", f"0.0.0.0:{os.getenv('PORT', '5000')}")
+    SERVER_WORKERS = int(os.getenv("WEB_CONCURRENCY", str(min(2 * (os.cpu_count() or 1) + 1, 8))))
+    SERVER_THREADS = int(os.getenv("SERVER_THREADS", "8"))
+    # Lebih lama dari idle timeout load balancer agar koneksi tidak ditutup sepihak oleh worker
+    SERVER_KEEPALIVE = int(os.getenv("SERVER_KEEPALIVE", "75"))
+    SERVER_TIMEOUT = int(os.getenv("SERVER_TIMEOUT", "300"))
+    SERVER_GRACEFUL_TIMEOUT = int(os.getenv("SERVER_GRACEFUL_TIMEOUT", "60"))
+    SERVER_MAX_REQUESTS = int(os.getenv("SERVER_MAX_REQUESTS", "0"))
+    # Buka koneksi ke Google/searchapi.io saat warmup worker, sebelum request pertama
+    WARMUP_PRECONNECT = os.getenv("WARMUP_PRECONNECT", "false").lower() == "true"
+    # Rate limit token bucket per provider, dibagi semua worker lewat SQLite di CACHE_DIR: (request per detik, burst).
+    # Rate 0 mematikan batas provider itu. openai_tokens dihitung dalam token per detik (TPM / 60).
+    RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    RATE_LIMITS = {
+        "gmaps": (float(os.getenv("GMAPS_RATE_LIMIT", "50")), float(os.getenv("GMAPS_RATE_BURST", "50"))),
+        "searchapi": (float(os.getenv("SEARCHAPI_RATE_LIMIT", "10")), float(os.getenv("SEARCHAPI_RATE_BURST", "20"))),
+        "openai": (float(os.getenv("OPENAI_RATE_LIMIT", "8")), float(os.getenv("OPENAI_RATE_BURST", "16"))),
+        "openai_tokens": (float(os.getenv("OPENAI_TOKENS_PER_MINUTE", "200000")) / 60, float(os.getenv("OPENAI_TOKENS_PER_MINUTE", "200000"))),
+    }
+    # Pemanggil menunggu giliran; bila antrean lebih panjang dari ini (detik) request gagal
+    RATE_LIMIT_MAX_WAIT = float(os.getenv("RATE_LIMIT_MAX_WAIT", "120"))
+    # Budget per run, dikalikan numberOfLeads (0 = tanpa batas); bisa ditimpa lewat 'budget' di /task/input
+    RUN_BUDGET_OPENAI_TOKENS_PER_LEAD = int(os.getenv("RUN_BUDGET_OPENAI_TOKENS_PER_LEAD", "0"))
+    RUN_BUDGET_SEARCHAPI_CALLS_PER_LEAD = int(os.getenv("RUN_BUDGET_SEARCHAPI_CALLS_PER_LEAD", "0"))
+    RUN_BUDGET_GMAPS_CALLS_PER_LEAD = int(os.getenv("RUN_BUDGET_GMAPS_CALLS_PER_LEAD", "0"))
+    RUN_BUDGET_TTL = int(os.getenv("RUN_BUDGET_TTL", str(24 * 3600)))
+    # Concurrency adaptif (AIMD) per upstream di setiap worker: (limit awal, minimum, maksimum).
+    # Ukuran pool thread (SCRAPE_*_WORKERS, ANALYZE_BATCH_WORKERS) menjadi batas atas.
+    ADAPTIVE_CONCURRENCY_ENABLED = os.getenv("ADAPTIVE_CONCURRENCY_ENABLED", "true").lower() == "true"
+    ADAPTIVE_LIMITS = {
+        "gmaps": (int(os.getenv("GMAPS_CONCURRENCY_INITIAL", "8")), 1, int(os.getenv("GMAPS_CONCURRENCY_MAX", "64"))),
+        "searchapi": (int(os.getenv("SEARCHAPI_CONCURRENCY_INITIAL", "4")), 1, int(os.getenv("SEARCHAPI_CONCURRENCY_MAX", "64"))),
+        "openai": (int(os.getenv("OPENAI_CONCURRENCY_INITIAL", "4")), 1, int(os.getenv("OPENAI_CONCURRENCY_MAX", "32"))),
+    }
+    # Limit dikali ADAPTIVE_BACKOFF saat 429/timeout, atau saat latensi > ADAPTIVE_LATENCY_TOLERANCE x baseline
+    ADAPTIVE_BACKOFF = float(os.getenv("ADAPTIVE_BACKOFF", "0.7"))
+    ADAPTIVE_LATENCY_TOLERANCE = float(os.getenv("ADAPTIVE_LATENCY_TOLERANCE", "2.5"))
+    # Fan-out paralel details/reviews/keyword per tempat di Finder
+    SCRAPE_CONCURRENT = os.getenv("SCRAPE_CONCURRENT", "true").lower() == "true"
+    SCRAPE_FANOUT_WORKERS = int(os.getenv("SCRAPE_FANOUT_WORKERS", "24"))
+    SCRAPE_DEADLINE = float(os.getenv("SCRAPE_DEADLINE", "90"))
+    # Lewati kandidat hasil Text Search yang jelas melanggar constraint sebelum di-scrape
+    PREFILTER_ENABLED = os.getenv("PREFILTER_ENABLED", "true").lower() == "true"
+    # Jalankan keyword search lebih dulu dan hentikan scrape bila keyword tidak ditemukan
+    STAGED_SCRAPE = os.getenv("STAGED_SCRAPE", "true").lower() == "true"
+    # Batch scrape: jumlah placeId per langkah scrape_batch (1 = satu per satu) dan ukuran pool
+    SCRAPE_BATCH_SIZE = int(os.getenv("SCRAPE_BATCH_SIZE", "1"))
+    SCRAPE_BATCH_WORKERS = int(os.getenv("SCRAPE_BATCH_WORKERS", "8"))
+    ANALYZE_BATCH_WORKERS = int(os.getenv("ANALYZE_BATCH_WORKERS", "4"))
     DEFAULT_OPENAI_MODEL = os.getenv("DEFAULT_OPENAI_MODEL", "gpt-4o-mini")
+    # 'standard' (3 completion per lead), 'single' (1 completion JSON per lead),
+    # atau 'batch' (beberapa lead per completion pada analyze_batch)
+    ANALYSIS_MODE = os.getenv("ANALYSIS_MODE", "standard")
+    LLM_BATCH_TOKEN_BUDGET = int(os.getenv("LLM_BATCH_TOKEN_BUDGET", "6000"))
+    LLM_BATCH_MAX_PLACES = int(os.getenv("LLM_BATCH_MAX_PLACES", "8"))
+    LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+    LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "20000"))
     DEFAULT_MAX_REVIEWS = 2
     DEFAULT_SEARCH_PARAMS = {
         'business_type': "", 'location': "", 'min_rating': 0.0,
@@ -0,0 +1,34 @@
+"""
+Konfigurasi gunicorn untuk mode produksi (SERVER_MODE=production):
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Setiap worker membangun Workflow, service, dan pool HTTP-nya sendiri setelah fork lalu melakukan warmup
+sebelum menerima traffic; saat shutdown pool thread dan koneksi ditutup dengan rapi.
+"""
+from config import Config
+
+bind = Config.SERVER_BIND
+workers = Config.SERVER_WORKERS
+# gthread: request /task/* sebagian besar menunggu I/O API eksternal, dan /task/run melakukan streaming
+worker_class = "gthread"
+threads = Config.SERVER_THREADS
+keepalive = Config.SERVER_KEEPALIVE
+timeout = Config.SERVER_TIMEOUT
+graceful_timeout = Config.SERVER_GRACEFUL_TIMEOUT
+max_requests = Config.SERVER_MAX_REQUESTS
+max_requests_jitter = max_requests // 10
+# App dimuat di tiap worker (bukan di master) agar tidak ada koneksi/thread yang terbawa fork
+preload_app = False
+accesslog = "-"
+
+def post_worker_init(worker):
+    """Dipanggil setelah app dimuat di worker, sebelum worker menerima koneksi."""
+    from src.api.routes import warm_up
+    warm_up()
+    worker.wsgi.swag.precompute()
+    worker.log.info(f"Worker {worker.pid} warmed up")
+
+def worker_exit(server, worker):
+    from src.api.routes import shutdown
+    shutdown()
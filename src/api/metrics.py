@@ -0,0 +1,38 @@
+from flask import Blueprint, Response
+from flasgger import swag_from
+from ..services.cache import all_stores
+from ..services.http_client import get_http_client
+from ..services.rate_limiter import get_rate_limiter
+from ..utils.metrics import metrics
+from ..docs import metrics as metrics_docs
+
+metrics_bp = Blueprint('metrics', __name__)
+
+def _store_samples():
+    """Counter cache/review store/session store (hit, miss, eviction, ...) dan jumlah entrinya."""
+    for store in all_stores():
+        stats = store.stats()
+        for key, value in stats.items():
+            if key in store.counters:
+                yield "store_events_total", "counter", {"store": store.name, "event": key}, value
+            else:
+                yield "store_entries", "gauge", {"store": store.name, "kind": key}, value
+
+def _http_pool_samples():
+    """Pemakaian ulang koneksi keep-alive per host (miss = koneksi baru)."""
+    for host, entry in get_http_client().stats()["hosts"].items():
+        yield "http_pool_connections_total", "counter", {"host": host, "result": "hit"}, entry["hits"]
+        yield "http_pool_connections_total", "counter", {"host": host, "result": "miss"}, entry["misses"]
+
+def _rate_limit_samples():
+    for provider, tokens in get_rate_limiter().bucket_levels().items():
+        yield "rate_limit_tokens", "gauge", {"provider": provider}, tokens
+
+metrics.add_collector(_store_samples)
+metrics.add_collector(_http_pool_samples)
+metrics.add_collector(_rate_limit_samples)
+
+@metrics_bp.route('/metrics', methods=['GET'])
+@swag_from(metrics_docs.metrics_param)
+def handle_metrics():
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
@@ -1,13 +1,63 @@
+import os
+import threading
 import traceback
 from flask import Blueprint, request, current_app
 from flasgger import swag_from
 from ..core.workflow import Workflow
-from ..utils.response import api_response, error_response
+from ..core.runner import WorkflowRunner
+from ..core.session import WorkflowSessions
+from ..core.prompt_parser import PromptParser
+from ..services.http_client import get_http_client
+from ..services.openai_client import get_llm_cache
+from ..services.session_store import get_session_store
+from ..utils.response import api_response, error_response, stream_response
+from ..utils.validators import validate_payload
 from .schemas import input_schema, search_schema, scrape_schema, analyze_schema, control_schema
-from ..docs import control, input, scrape, search, analyze
+from ..docs import control, input, scrape, search, analyze, scrape_batch, analyze_batch, run
+from config import Config
 
 api_bp = Blueprint('api', __name__)
-workflow = Workflow()
+# Workflow dan dispatcher sesi dibuat saat pertama dipakai, sekali per proses (setelah fork di worker gunicorn)
+_sessions = None
+_sessions_pid = None
+_sessions_lock = threading.Lock()
+
+def get_sessions():
+    """Dispatch task (mode sesi server-side atau payload state penuh) milik proses ini."""
+    global _sessions, _sessions_pid
+    if _sessions is None or _sessions_pid != os.getpid():
+        with _sessions_lock:
+            if _sessions is None or _sessions_pid != os.getpid():
+                _sessions = WorkflowSessions(Workflow())
+                _sessions_pid = os.getpid()
+    return _sessions
+
+def get_workflow():
+    return get_sessions().workflow
+
+def warm_up():
+    """
+    Membangun Workflow (Finder/Analyzer, service, klien OpenAI, pool HTTP) dan membuka store SQLite sebelum
+    worker menerima traffic. Dengan WARMUP_PRECONNECT, koneksi keep-alive ke Google/searchapi.io dibuka lebih dulu.
+    """
+    sessions = get_sessions()
+    sessions.workflow.analyzer.openai.client  # klien OpenAI dibuat lazy (import paket openai cukup lama)
+    if Config.SESSION_DEFAULT:
+        get_session_store()
+    get_llm_cache()
+    if Config.WARMUP_PRECONNECT:
+        finder = sessions.workflow.finder
+        get_http_client().preconnect([finder.gmaps.gmaps_search_url, finder.searchapi.base_url])
+    return sessions
+
+def shutdown():
+    """Graceful shutdown worker: menghentikan pool thread Workflow dan menutup pool HTTP."""
+    global _sessions
+    with _sessions_lock:
+        sessions, _sessions = _sessions, None
+    if sessions is not None and _sessions_pid == os.getpid():
+        sessions.workflow.close()
+        get_http_client().close()
 
 @api_bp.route('/input', methods=['POST'])
 # @swag_from(input_schema)
@@ -15,7 +65,7 @@ workflow = Workflow()
 def handle_input():
     data = request.get_json()
     if not data: return error_response("Invalid JSON payload")
-    try: return api_response(workflow.start(data))
+    try: return api_response(get_sessions().handle("input", data))
     except Exception as e: current_app.logger.error(traceback.format_exc()); return error_response(f"Input failed: {e}", 500)
 
 @api_bp.route('/search', methods=['POST'])
@@ -23,7 +73,7 @@ def handle_input():
 @swag_from(search.search_param)
 def handle_search():
     data = request.get_json()
-    try: return api_response(workflow.search(data))
+    try: return api_response(get_sessions().handle("search", data))
     except Exception as e: current_app.logger.error(traceback.format_exc()); return error_response(f"Search failed: {e}", 500)
 
 @api_bp.route('/scrape', methods=['POST'])
@@ -31,21 +81,53 @@ def handle_search():
 @swag_from(scrape.scrape_param)
 def handle_scrape():
     data = request.get_json()
-    try: return api_response(workflow.scrape(data))
+    try: return api_response(get_sessions().handle("scrape", data))
     except Exception as e: current_app.logger.error(traceback.format_exc()); return error_response(f"Scrape failed: {e}", 500)
 
+@api_bp.route('/scrape_batch', methods=['POST'])
+@swag_from(scrape_batch.scrape_batch_param)
+def handle_scrape_batch():
+    data = request.get_json()
+    try: return api_response(get_sessions().handle("scrape_batch", data))
+    except Exception as e: current_app.logger.error(traceback.format_exc()); return error_response(f"Batch scrape failed: {e}", 500)
+
 @api_bp.route('/analyze', methods=['POST'])
 # @swag_from(analyze_schema)
 @swag_from(analyze.analyze_param)
 def handle_analyze():
     data = request.get_json()
-    try: return api_response(workflow.analyze(data))
+    try: return api_response(get_sessions().handle("analyze", data))
     except Exception as e: current_app.logger.error(traceback.format_exc()); return error_response(f"Analysis failed: {e}", 500)
 
+@api_bp.route('/analyze_batch', methods=['POST'])
+@swag_from(analyze_batch.analyze_batch_param)
+def handle_analyze_batch():
+    data = request.get_json()
+    try: return api_response(get_sessions().handle("analyze_batch", data))
+    except Exception as e: current_app.logger.error(traceback.format_exc()); return error_response(f"Batch analysis failed: {e}", 500)
+
 @api_bp.route('/control', methods=['POST'])
 # @swag_from(control_schema)
 @swag_from(control.control_param)
 def handle_control():
     data = request.get_json()
-    try: return api_response(workflow.control(data))
-    except Exception as e: current_app.logger.error(traceback.format_exc()); return error_response(f"Control flow failed: {e}", 500)
\ No newline at end of file
+    try: return api_response(get_sessions().handle("control", data))
+    except Exception as e: current_app.logger.error(traceback.format_exc()); return error_response(f"Control flow failed: {e}", 500)
+
+@api_bp.route('/run', methods=['POST'])
+@swag_from(run.run_param)
+def handle_run():
+    data = request.get_json()
+    if not data: return error_response("Invalid JSON payload")
+    params = data
+    if data.get("prompt"):
+        params = PromptParser().parse(data["prompt"])
+        if "error" in params: return error_response(params["error"])
+        # Field lain di body (mis. analysisMode, batchSize) menimpa hasil parsing prompt
+        params.update({key: value for key, value in data.items() if key != "prompt"})
+        if not params.get("numberOfLeads"):
+            params["numberOfLeads"] = 5
+    validation_error = validate_payload(params, ["business_type", "location", "numberOfLeads"])
+    if validation_error: return error_response(validation_error)
+    fmt = "sse" if request.args.get("format") == "sse" or "text/event-stream" in request.headers.get("Accept", "") else "ndjson"
+    return stream_response(WorkflowRunner(get_workflow()).run(params), fmt)
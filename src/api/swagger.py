@@ -0,0 +1,17 @@
+from flasgger import Swagger
+
+class CachedSwagger(Swagger):
+    """
+    Swagger dengan spec OpenAPI yang dibangun sekali per proses, juga dalam mode debug (flasgger
+    membangun ulang spec di setiap request /apispec_1.json saat debug). precompute() membangunnya
+    lebih dulu, mis. saat warmup worker, sehingga request dokumentasi pertama tidak membayar biayanya.
+    """
+    def get_apispecs(self, endpoint='apispec_1'):
+        if endpoint not in self.apispecs:
+            self.apispecs[endpoint] = super().get_apispecs(endpoint)
+        return self.apispecs[endpoint]
+
+    def precompute(self):
+        with self.app.app_context():
+            for spec in self.config['specs']:
+                self.get_apispecs(spec['endpoint'])
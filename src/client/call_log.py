@@ -0,0 +1,107 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import time
+from datetime import datetime, UTC
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+CAPTURE_LEVELS = ("none", "truncated", "full")
+
+def _body(value):
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str)
+
+def _snapshot(value):
+    """Salinan container (dict/list) payload; state executor yang diubah setelah pencatatan tidak ikut terserialisasi."""
+    if isinstance(value, dict):
+        return {key: _snapshot(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_snapshot(item) for item in value]
+    return value
+
+class _JsonLineFormatter(logging.Formatter):
+    """
+    Satu record = satu baris JSON. Serialisasi body, ukuran, dan pemotongan dikerjakan di sini (thread listener),
+    bukan di thread executor. Body capture 'full' ditempel apa adanya sebagai teks JSON.
+    """
+    def format(self, record):
+        call = record.msg
+        request_text = _body(call["request"])
+        response_text = _body(call["response"]) if call["response"] is not None else None
+        entry = {
+            "ts": call["ts"], "run": call["run"], "task": call["task"], "ms": call["ms"],
+            "reqBytes": len(request_text), "respBytes": len(response_text) if response_text is not None else 0,
+            "ok": call["error"] is None
+        }
+        if call["error"] is not None:
+            entry["error"] = call["error"]
+            entry["status"] = call["status"]
+        capture, truncate = call["capture"], call["truncate"]
+        if call["error"] is not None and capture == "none":
+            capture = "truncated"  # Body respons error selalu ikut dicatat
+        if capture == "truncated":
+            entry["request"] = request_text[:truncate]
+            if response_text is not None:
+                entry["response"] = response_text[:truncate]
+        line = json.dumps(entry, separators=(",", ":"), ensure_ascii=False)
+        if capture == "full":
+            line = f"{line[:-1]},\"request\":{request_text}}}"
+            if response_text is not None:
+                line = f"{line[:-1]},\"response\":{response_text}}}"
+        return line
+
+class _PassThroughQueueHandler(QueueHandler):
+    """Record (dict yang tidak diubah lagi) dikirim apa adanya; serialisasi JSON dikerjakan thread listener."""
+    def prepare(self, record):
+        return record
+
+class CallLogger:
+    """
+    Log panggilan task WorkflowExecutor dalam format JSONL ringkas (run id, task, latensi, ukuran).
+    Penulisan file dilakukan thread QueueListener, jadi executor hanya memasukkan record ke antrean.
+    capture: 'none' (metadata saja), 'truncated' (body dipotong `truncate` karakter), atau 'full'.
+    sample_rate: fraksi panggilan sukses yang dicatat; panggilan gagal selalu dicatat.
+    """
+    _listeners = {}
+
+    def __init__(self, path=None, capture=None, sample_rate=None, truncate=None, max_bytes=None, backup_count=None):
+        self.path = path or os.getenv("EXECUTOR_LOG_FILE", "workflow_api_calls.jsonl")
+        self.capture = (capture or os.getenv("EXECUTOR_LOG_CAPTURE", "truncated")).lower()
+        if self.capture not in CAPTURE_LEVELS:
+            raise ValueError(f"Unknown log capture level: {self.capture}")
+        self.sample_rate = float(os.getenv("EXECUTOR_LOG_SAMPLE", "1.0")) if sample_rate is None else sample_rate
+        self.truncate = int(os.getenv("EXECUTOR_LOG_TRUNCATE", "2048")) if truncate is None else truncate
+        max_bytes = int(os.getenv("EXECUTOR_LOG_MAX_BYTES", str(10 * 1024 * 1024))) if max_bytes is None else max_bytes
+        backup_count = int(os.getenv("EXECUTOR_LOG_BACKUPS", "5")) if backup_count is None else backup_count
+
+        # Satu logger + listener per file log, dipakai bersama oleh semua executor di proses ini
+        self.logger = logging.getLogger(f"WorkflowAPI.{os.path.abspath(self.path)}")
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+        if self.path not in CallLogger._listeners:
+            file_handler = RotatingFileHandler(self.path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+            file_handler.setFormatter(_JsonLineFormatter())
+            log_queue = queue.SimpleQueue()
+            listener = QueueListener(log_queue, file_handler)
+            listener.start()
+            atexit.register(listener.stop)
+            CallLogger._listeners[self.path] = listener
+            self.logger.addHandler(_PassThroughQueueHandler(log_queue))
+
+    def record(self, run_id, task, started_at, request=None, response=None, error=None, status_code=None):
+        """
+        Mencatat satu panggilan; started_at dari time.perf_counter() sebelum panggilan.
+        Thread pemanggil hanya menyalin container payload (snapshot) lalu memasukkannya ke antrean; response
+        dianggap tidak diubah lagi setelah dicatat.
+        """
+        latency_ms = round((time.perf_counter() - started_at) * 1000, 1)
+        if error is None and self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return
+        self.logger.info({
+            "ts": datetime.now(UTC).isoformat(), "run": run_id, "task": task, "ms": latency_ms,
+            "request": _snapshot(request), "response": response,
+            "error": str(error) if error is not None else None, "status": status_code,
+            "capture": self.capture, "truncate": self.truncate
+        })
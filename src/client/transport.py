@@ -0,0 +1,84 @@
+import os
+import requests
+from requests.adapters import HTTPAdapter
+
+class TransportError(Exception):
+    """Kegagalan memanggil task; status_code/body terisi bila server memberi respons error."""
+    def __init__(self, message, status_code=None, body=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.body = body
+
+class HttpTransport:
+    """Transport HTTP ke API Flask (API_BASE_URL) dengan Session keep-alive."""
+    def __init__(self, base_url=None, timeout=60, pool_maxsize=10):
+        self.base_url = base_url or os.getenv("API_BASE_URL", "http://localhost:5000/task")
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def call(self, task_key, payload):
+        try:
+            response = self.session.post(f"{self.base_url}/{task_key}", json=payload, timeout=self.timeout)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            status_code, body = None, None
+            if e.response is not None:
+                status_code = e.response.status_code
+                try:
+                    body = e.response.json()
+                except ValueError:
+                    body = e.response.text
+            raise TransportError(f"API call to [{task_key}] FAILED: {e}", status_code, body) from e
+        return response.json()
+
+    def close(self):
+        self.session.close()
+
+class InProcessTransport:
+    """
+    Memanggil Workflow (lewat WorkflowSessions, seperti route) langsung di proses yang sama (tanpa JSON encode, TCP, dan dispatch Flask),
+    berbagi instance Workflow/service dan cache dengan blueprint API. Protokol $state/next tetap sama
+    dengan HttpTransport. Payload tidak di-copy; method Workflow tidak memodifikasi payload yang diterimanya.
+    """
+    def __init__(self, workflow=None, app=None):
+        from ..core.session import WorkflowSessions
+        if app is None:
+            from app import create_app
+            app = create_app()
+        if workflow is None:
+            from ..api import routes
+            self.sessions = routes.get_sessions()
+        else:
+            self.sessions = WorkflowSessions(workflow)
+        # App context dibutuhkan service yang menulis log lewat current_app
+        self.app = app
+        self.workflow = self.sessions.workflow
+
+    def call(self, task_key, payload):
+        if task_key not in self.sessions.tasks:
+            raise TransportError(f"Unknown task: {task_key}", 404, {"error": f"Unknown task: {task_key}"})
+        try:
+            with self.app.app_context():
+                data = self.sessions.handle(task_key, payload)
+        except Exception as e:
+            # Sama seperti error_response di route: status 500 dengan body standar
+            body = {"state": None, "result": None, "next": None, "done": True, "error": f"Task [{task_key}] failed: {e}"}
+            raise TransportError(f"API call to [{task_key}] FAILED: {e}", 500, body) from e
+        if 'done' not in data:
+            data['done'] = data.get('next') is None
+        return data
+
+    def close(self):
+        pass
+
+def create_transport(kind=None, **kwargs):
+    """kind: 'http' (default) atau 'inprocess'; default dari env EXECUTOR_TRANSPORT."""
+    kind = (kind or os.getenv("EXECUTOR_TRANSPORT", "http")).lower()
+    if kind == "inprocess":
+        return InProcessTransport(**kwargs)
+    if kind == "http":
+        return HttpTransport(**kwargs)
+    raise ValueError(f"Unknown executor transport: {kind}")
@@ -1,10 +1,16 @@
+from concurrent.futures import ThreadPoolExecutor
 from ..services.openai_client import OpenAIService
+from ..utils.concurrency import submit_with_context
 from config import Config
 
 class Analyzer:
     def __init__(self):
         self.openai = OpenAIService()
         self.weights = Config.MATCH_WEIGHTS
+        self.executor = ThreadPoolExecutor(max_workers=Config.ANALYZE_BATCH_WORKERS, thread_name_prefix="analyzer")
+
+    def close(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
 
     def _calculate_match(self, details, constraints):
         score = 100.0
@@ -88,14 +94,51 @@ class Analyzer:
 
         return final_score, meets, " ".join(reasoning) or "Meets primary criteria."
 
-    def run(self, details, constraints):
+    def check_hard_constraints(self, candidate, constraints):
+        """
+        Pre-filter ringkasan hasil Text Search (rating, user_ratings_total, price_level, formatted_address)
+        dengan aturan yang sama seperti _calculate_match. Mengembalikan daftar alasan penolakan
+        (kosong = layak di-scrape). Field yang tidak tersedia di ringkasan tidak pernah menolak kandidat.
+        """
+        reasons = []
+        rating = candidate.get("rating")
+        min_rating = constraints.get("min_rating")
+        if min_rating and rating is not None and rating < min_rating:
+            reasons.append("min_rating")
+
+        total = candidate.get("user_ratings_total")
+        min_reviews = constraints.get("min_reviews")
+        if min_reviews and total is not None and total < min_reviews:
+            reasons.append("min_reviews")
+        max_reviews = constraints.get("max_reviews")
+        if max_reviews is not None and total is not None and total > max_reviews:
+            reasons.append("max_reviews")
+
+        # Hanya price range berbentuk simbol ($..$$$$) yang bisa dibandingkan dengan price_level
+        price_range = constraints.get("price_range")
+        price_level = candidate.get("price_level")
+        if price_range and set(price_range) == {"$"} and price_level and "$" * price_level != price_range:
+            reasons.append("price_range")
+
+        location = constraints.get("location")
+        address = candidate.get("formatted_address")
+        if location and address and location.lower() not in address.lower():
+            reasons.append("location")
+        return reasons
+
+    def run(self, details, constraints, mode=None):
+        """mode: 'standard', 'single', atau 'batch' (lihat OpenAIService.generate_insights); default Config.ANALYSIS_MODE."""
+        mode = mode or Config.ANALYSIS_MODE
         match_percentage, _, reason = self._calculate_match(details, constraints)
         
         insights, positive_summary, negative_summary = {}, "", ""
         # Hanya generate insights jika match_percentage > 0
         if match_percentage > 0:
-             insights, positive_summary, negative_summary = self.openai.generate_insights(details, match_percentage)
+             insights, positive_summary, negative_summary = self.openai.generate_insights(details, match_percentage, mode=mode)
 
+        return self._build_result(details, match_percentage, reason, insights, positive_summary, negative_summary)
+
+    def _build_result(self, details, match_percentage, reason, insights, positive_summary, negative_summary):
         # Hapus data mentah yang tidak perlu dari output akhir
         final_details = details.copy()
         final_details.pop("keywordFoundCount", None)
@@ -112,4 +155,39 @@ class Analyzer:
             "summaryNegative": negative_summary,
         }
         
-        return analysis_result
\ No newline at end of file
+        return analysis_result
+
+    def run_many(self, details_list, constraints, mode=None):
+        """Menjalankan run() untuk banyak tempat secara paralel; urutan hasil mengikuti input."""
+        mode = mode or Config.ANALYSIS_MODE
+        if mode == "batch":
+            return list(self.run_batch(details_list, constraints).values())
+        futures = [submit_with_context(self.executor, self.run, details, constraints, mode) for details in details_list]
+        return [future.result() for future in futures]
+
+    def run_batch(self, details_list, constraints):
+        """
+        Analisis banyak tempat dengan beberapa tempat per completion (dibagi berdasarkan token budget).
+        Batch dijalankan paralel; hasil dikembalikan sebagai dict dengan key placeId sesuai urutan input.
+        """
+        matches, items = {}, []
+        for index, details in enumerate(details_list):
+            place_id = details.get("placeId") or str(index)
+            match_percentage, _, reason = self._calculate_match(details, constraints)
+            matches[place_id] = (details, match_percentage, reason)
+            # Hanya generate insights jika match_percentage > 0
+            if match_percentage > 0:
+                items.append((place_id, details, match_percentage))
+
+        batches, oversized = self.openai.split_batches(items)
+        futures = [submit_with_context(self.executor, self.openai.generate_insights_batch, batch) for batch in batches]
+        futures += [submit_with_context(self.executor, self.openai.generate_insights_batch, [item]) for item in oversized]
+        insights_by_id = {}
+        for future in futures:
+            insights_by_id.update(future.result())
+
+        results = {}
+        for place_id, (details, match_percentage, reason) in matches.items():
+            insights, positive_summary, negative_summary = insights_by_id.get(place_id, ({}, "", ""))
+            results[place_id] = self._build_result(details, match_percentage, reason, insights, positive_summary, negative_summary)
+        return results
@@ -1,30 +1,121 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait
 from ..services.gmaps import GmapsService
 from ..services.searchapi import SearchApiService
+from ..services.rate_limiter import BudgetExceeded, RateLimitTimeout
 from ..utils.formatter import Formatter
+from ..utils.concurrency import submit_with_context, call_deadline
+from config import Config
+
+logger = logging.getLogger(__name__)
 
 class Finder:
     def __init__(self):
         self.gmaps = GmapsService()
         self.searchapi = SearchApiService()
         self.formatter = Formatter()
+        # Pool untuk menjalankan details, reviews, dan keyword search secara paralel
+        self.executor = ThreadPoolExecutor(
+            max_workers=Config.SCRAPE_FANOUT_WORKERS, thread_name_prefix="finder"
+        ) if Config.SCRAPE_CONCURRENT else None
+        # Pool terpisah untuk batch agar tidak saling menunggu dengan pool fan-out di atas
+        self.batch_executor = ThreadPoolExecutor(max_workers=Config.SCRAPE_BATCH_WORKERS, thread_name_prefix="finder-batch")
+
+    def close(self):
+        """
+        Menghentikan pool thread (dipanggil saat worker shutdown). Pool batch dihentikan lebih dulu: fan-out yang
+        dibatalkan tidak membangunkan wait() di thread batch, sehingga thread itu akan menunggu sampai deadline.
+        """
+        self.batch_executor.shutdown(wait=True, cancel_futures=True)
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
 
     def find_business_ids(self, state):
+        candidates, next_page_token = self.find_business_candidates(state)
+        return [place['place_id'] for place in candidates], next_page_token
+
+    def find_business_candidates(self, state):
+        """Hasil Text Search beserta ringkasannya (rating, user_ratings_total, price_level, formatted_address)."""
         query = f"{state['business_type']} in {state['location']}"
         results, next_page_token = self.gmaps.text_search(query, page_token=state.get('nextPageToken'))
-        return [place['place_id'] for place in results], next_page_token
+        return [place for place in results if place.get('place_id')], next_page_token
 
-    # Menerima constraints untuk bisa mengambil keywords
-    def get_business_details(self, place_id, constraints):
+    def _fetch_sequential(self, place_id, keywords, keyword_result=None):
         raw_details = self.gmaps.get_place_details(place_id)
         if not raw_details:
-            return None
-            
+            return None, [], (0, {})
         # 1. Ambil daftar teks review
         reviews_data = self.searchapi.get_reviews(place_id)
-        
-        # 2. Ambil hasil pencarian keyword (yang berisi histogram)
+        # 2. Ambil hasil pencarian keyword (yang berisi histogram), kecuali sudah diambil di tahap screening
+        if keyword_result is None:
+            keyword_result = self.searchapi.get_keyword_match_count(place_id, keywords)
+        return raw_details, reviews_data, keyword_result
+
+    def _fetch_concurrent(self, place_id, keywords, keyword_result=None):
+        """
+        Menjalankan ketiga sumber secara paralel dengan deadline per tempat.
+        Sumber yang gagal atau melewati deadline diganti hasil parsial (reviews kosong, keyword -1);
+        BudgetExceeded dan RateLimitTimeout tetap diteruskan agar run berhenti, bukan menghasilkan data parsial.
+        Deadline ikut ke thread lewat call_deadline: timeout HTTP dipotong ke sisa waktu dan tidak ada retry
+        atau antrean rate limit setelahnya, sehingga panggilan yang tertinggal tidak terus memakai slot dan token.
+        """
+        with call_deadline(Config.SCRAPE_DEADLINE):
+            futures = {
+                "details": submit_with_context(self.executor, self.gmaps.get_place_details, place_id),
+                "reviews": submit_with_context(self.executor, self.searchapi.get_reviews, place_id),
+            }
+            if keywords and keyword_result is None:
+                futures["keywords"] = submit_with_context(self.executor, self.searchapi.get_keyword_match_count, place_id, keywords)
+        wait(futures.values(), timeout=Config.SCRAPE_DEADLINE)
+
+        fallbacks = {"details": None, "reviews": [], "keywords": (-1, {})}
+        results = {}
+        for name, future in futures.items():
+            if not future.done():
+                future.cancel()
+                logger.warning(f"Scrape source '{name}' for {place_id} exceeded {Config.SCRAPE_DEADLINE}s deadline.")
+                results[name] = fallbacks[name]
+            elif isinstance(future.exception(), (BudgetExceeded, RateLimitTimeout)):
+                raise future.exception()
+            elif future.exception() is not None:
+                logger.warning(f"Scrape source '{name}' for {place_id} failed: {future.exception()}")
+                results[name] = fallbacks[name]
+            else:
+                results[name] = future.result()
+        return results["details"], results["reviews"], results.get("keywords", keyword_result or (0, {}))
+
+    def screen_candidate(self, place_id, constraints):
+        """
+        Tahap murah sebelum fetch mahal: keyword search. Keyword yang tidak ditemukan sama sekali
+        membuat skor Analyzer menjadi 0, sehingga kandidat bisa langsung didiskualifikasi.
+        Mengembalikan (keyword_result atau None, alasan diskualifikasi atau None).
+        """
         keywords = constraints.get("keywords", "")
-        keyword_match_n, place_result = self.searchapi.get_keyword_match_count(place_id, keywords)
+        if not keywords:
+            return None, None
+        keyword_result = self.searchapi.get_keyword_match_count(place_id, keywords)
+        if keyword_result[0] == 0:
+            return keyword_result, "keywords"
+        return keyword_result, None
+
+    def scrape_candidate(self, place_id, constraints, staged=False):
+        """Mengembalikan (details, alasan skip). Dengan staged=True tahap screening dijalankan lebih dulu."""
+        keyword_result = None
+        if staged:
+            keyword_result, skip_reason = self.screen_candidate(place_id, constraints)
+            if skip_reason:
+                return None, skip_reason
+        return self.get_business_details(place_id, constraints, keyword_result=keyword_result), None
+
+    # Menerima constraints untuk bisa mengambil keywords
+    def get_business_details(self, place_id, constraints, keyword_result=None):
+        keywords = constraints.get("keywords", "")
+        if self.executor is None:
+            raw_details, reviews_data, (keyword_match_n, place_result) = self._fetch_sequential(place_id, keywords, keyword_result)
+        else:
+            raw_details, reviews_data, (keyword_match_n, place_result) = self._fetch_concurrent(place_id, keywords, keyword_result)
+        if not raw_details:
+            return None
 
         # 3. Teruskan semua data yang relevan ke Formatter
         return self.formatter.format_place_details(
@@ -32,4 +123,30 @@ class Finder:
             all_reviews=reviews_data,
             keyword_n=keyword_match_n,
             place_result=place_result
-        )
\ No newline at end of file
+        )
+
+    def get_business_details_batch(self, place_ids, constraints, staged=False):
+        """
+        Scrape banyak placeId secara paralel (dibatasi SCRAPE_BATCH_WORKERS).
+        Mengembalikan (details per placeId sesuai urutan input, error per placeId, alasan skip per placeId).
+        Budget run yang habis atau antrean rate limit yang terlalu panjang menghentikan seluruh batch.
+        """
+        futures = {place_id: submit_with_context(self.batch_executor, self.scrape_candidate, place_id, constraints, staged) for place_id in place_ids}
+        results, errors, skipped = {}, {}, {}
+        for place_id, future in futures.items():
+            try:
+                details, skip_reason = future.result()
+            except (BudgetExceeded, RateLimitTimeout):
+                for pending in futures.values():
+                    pending.cancel()
+                raise
+            except Exception as e:
+                errors[place_id] = str(e)
+                continue
+            if skip_reason:
+                skipped[place_id] = skip_reason
+            elif details:
+                results[place_id] = details
+            else:
+                errors[place_id] = f"Failed to scrape details for placeId: {place_id}"
+        return results, errors, skipped
@@ -1,6 +1,7 @@
 import json
 import re
-from ..services.api_factory import create_client
+from ..services.api_factory import get_client
+from ..services.openai_client import cached_completion, is_valid_json
 from ..utils.response import error_response
 from config import Config
 
@@ -40,7 +41,7 @@ Input: "Cari salon kecantikan yang murah di Surabaya"
 Output: {"business_type":"salon kecantikan","location":"Surabaya","min_rating":0,"min_reviews":0,"max_reviews":null,"price_range":"","business_hours":"anytime","keywords":"murah","numberOfLeads":""}
 """
 
-    def parse_with_ai(self, prompt, client, headers, provider="openai"):
+    def parse_with_ai(self, prompt, client, headers, provider="openai", use_cache=True):
         try:
             chat_params = {
                 "model": "gpt-4o",
@@ -52,8 +53,7 @@ Output: {"business_type":"salon kecantikan","location":"Surabaya","min_rating":0
                 "temperature": 0.1
             }
             
-            completion = client.chat.completions.create(**chat_params)
-            response_text = completion.choices[0].message.content
+            response_text = cached_completion(client, use_cache=use_cache, validate=is_valid_json, **chat_params)
             parsed = json.loads(response_text)
 
             # --- FIX: Penegakan Aturan Conditional Price Range ---
@@ -98,12 +98,12 @@ Output: {"business_type":"salon kecantikan","location":"Surabaya","min_rating":0
             print(f"Error in parsing with AI: {e}")
             return None
 
-    def parse(self, prompt):
+    def parse(self, prompt, use_cache=True):
         """
         Menganalisis prompt menggunakan AI sebagai prioritas utama.
         """
-        client, headers, provider = create_client()
-        parameters = self.parse_with_ai(prompt, client, headers, provider)
+        client, headers, provider = get_client()
+        parameters = self.parse_with_ai(prompt, client, headers, provider, use_cache=use_cache)
 
         if parameters is None:
             return {"error": "Unable to extract parameters from prompt.", "done": True}
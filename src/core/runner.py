@@ -0,0 +1,74 @@
+def resolve_refs(payload, state):
+    """Mengganti referensi '$state' / '$state.a.b' dalam payload dengan nilai dari state."""
+    if isinstance(payload, dict):
+        return {key: resolve_refs(value, state) for key, value in payload.items()}
+    if isinstance(payload, str):
+        if payload == "$state":
+            return state
+        if payload.startswith("$state."):
+            value = state
+            for key in payload.split("$state.", 1)[1].split("."):
+                if not isinstance(value, dict):
+                    return None
+                value = value.get(key)
+            return value
+    return payload
+
+def unwrap_state_payload(payload):
+    """Payload {'state': {...}} dikirim sebagai state itu sendiri (sama seperti WorkflowExecutor)."""
+    if isinstance(payload, dict) and 'state' in payload and len(payload) == 1:
+        return payload['state']
+    return payload
+
+def workflow_tasks(workflow):
+    """Pemetaan key task (seperti di 'next.key' dan URL /task/<key>) ke method Workflow."""
+    return {
+        "input": workflow.start, "search": workflow.search, "scrape": workflow.scrape,
+        "scrape_batch": workflow.scrape_batch, "analyze": workflow.analyze,
+        "analyze_batch": workflow.analyze_batch, "control": workflow.control,
+    }
+
+class WorkflowRunner:
+    """
+    Menjalankan state machine Workflow di dalam proses (tanpa HTTP) dengan protokol $state/next yang sama
+    seperti WorkflowExecutor, dan menghasilkan event setiap kali ada lead yang selesai dianalisis.
+    """
+    def __init__(self, workflow, max_steps=10000):
+        self.workflow = workflow
+        self.max_steps = max_steps
+        self.tasks = workflow_tasks(workflow)
+
+    def run(self, params):
+        """Generator event: {'type': 'lead', ...} per lead, lalu satu {'type': 'done', ...} di akhir."""
+        state, lead_index, error = {}, 0, None
+        next_task = {"key": "input", "payload": params}
+        for _ in range(self.max_steps):
+            handler = self.tasks.get(next_task["key"])
+            if handler is None:
+                error = f"Unknown task: {next_task['key']}"
+                break
+            try:
+                data = handler(unwrap_state_payload(resolve_refs(next_task["payload"], state)))
+            except Exception as e:
+                error = f"Task '{next_task['key']}' failed: {e}"
+                break
+
+            if data.get("state"):
+                state.update(data["state"])
+            results = data.get("result")
+            for lead in results if isinstance(results, list) else [results] if results else []:
+                lead_index += 1
+                yield {"type": "lead", "index": lead_index, "lead": lead}
+
+            next_task = data.get("next")
+            if data.get("done") or not next_task or not next_task.get("key"):
+                error = error or (data.get("error") if data.get("done") else None)
+                break
+        else:
+            error = f"Workflow exceeded {self.max_steps} steps."
+
+        yield {
+            "type": "done", "leadCount": state.get("leadCount", 0), "skippedCount": state.get("skippedCount", 0),
+            "skippedReasons": state.get("skippedReasons", {}), "callsSaved": state.get("callsSaved", 0),
+            "error": error
+        }
@@ -0,0 +1,70 @@
+import threading
+from .runner import resolve_refs, unwrap_state_payload, workflow_tasks
+from ..services.session_store import get_session_store
+from config import Config
+
+# Payload 'next' yang dikirim ke klien dalam mode sesi
+SESSION_PAYLOAD = {"sessionId": "$state.sessionId"}
+
+class WorkflowSessions:
+    """
+    Mode sesi (opt-in lewat useSession di /task/input): state workflow disimpan di server dan klien
+    hanya mengirim {"sessionId": ...}. Server me-resolve referensi $state pada payload 'next' yang
+    tertunda dan merge state delta sendiri. Payload tanpa sessionId diteruskan apa adanya ke Workflow.
+    Satu sesi dijalankan berurutan (satu task 'next' yang tertunda), seperti WorkflowExecutor.
+    """
+    def __init__(self, workflow, store=None):
+        self.workflow = workflow
+        self.tasks = workflow_tasks(workflow)
+        self._store = store
+        self._locks = [threading.Lock() for _ in range(64)]
+
+    @property
+    def store(self):
+        # Dibuat saat sesi pertama dipakai, agar mode non-sesi tidak membuka file SQLite
+        if self._store is None:
+            self._store = get_session_store()
+        return self._store
+
+    @staticmethod
+    def is_session_payload(params):
+        return isinstance(params, dict) and set(params) == {"sessionId"}
+
+    def handle(self, task_key, params):
+        """Menjalankan task; dipakai route /task/<key> dan InProcessTransport."""
+        if task_key == "input":
+            use_session = params.get("useSession", Config.SESSION_DEFAULT) if isinstance(params, dict) else False
+            data = self.tasks["input"](params)
+            if not use_session:
+                return data
+            state = data.get("state") or {}
+            session_id = self.store.create(state, data.get("next"))
+            return self._client_response(session_id, data)
+        if not self.is_session_payload(params):
+            return self.tasks[task_key](params)
+        return self._handle_step(task_key, params["sessionId"])
+
+    def _handle_step(self, task_key, session_id):
+        with self._locks[hash(session_id) % len(self._locks)]:
+            session = self.store.load(session_id)
+            if session is None:
+                raise ValueError(f"Unknown or expired session: {session_id}")
+            pending = session["next"]
+            if not pending or pending.get("key") != task_key:
+                raise ValueError(f"Session {session_id} expects task '{pending.get('key') if pending else None}', got '{task_key}'")
+
+            state = session["state"]
+            data = self.tasks[task_key](unwrap_state_payload(resolve_refs(pending["payload"], state)))
+            if data.get("state"):
+                state.update(data["state"])
+            self.store.save(session_id, state, None if data.get("done") else data.get("next"))
+        return self._client_response(session_id, data)
+
+    def _client_response(self, session_id, data):
+        """Respons untuk klien: state hanya sessionId, payload 'next' hanya referensi ke sessionId."""
+        response = dict(data)
+        response["state"] = {"sessionId": session_id}
+        next_task = data.get("next")
+        if next_task and next_task.get("key") and not data.get("done"):
+            response["next"] = {"key": next_task["key"], "payload": dict(SESSION_PAYLOAD)}
+        return response
@@ -1,12 +1,53 @@
+import hashlib
+import json
+import logging
+import uuid
 from .finder import Finder
 from .analyzer import Analyzer
+from ..services.cache import get_cache
+from ..services.rate_limiter import get_rate_limiter, run_scope
 from ..utils.validators import validate_payload
+from ..utils.metrics import track_step
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Payload standar untuk langkah search (dipakai oleh start dan control)
+SEARCH_PAYLOAD = {
+    "business_type": "$state.business_type", "location": "$state.location",
+    "searchOffset": "$state.searchOffset", "constraints": "$state.constraints",
+    "nextPageToken": "$state.nextPageToken", "batchSize": "$state.batchSize",
+    "leadCount": "$state.leadCount", "numberOfLeads": "$state.numberOfLeads",
+    "prefilter": "$state.prefilter", "skippedCount": "$state.skippedCount",
+    "skippedReasons": "$state.skippedReasons", "runId": "$state.runId"
+}
+
+# Referensi state yang ikut dikirim ke langkah scrape/scrape_batch
+SCRAPE_STATE_REFS = {
+    "constraints": "$state.constraints", "stagedScrape": "$state.stagedScrape",
+    "analysisMode": "$state.analysisMode", "skippedCount": "$state.skippedCount",
+    "skippedReasons": "$state.skippedReasons", "callsSaved": "$state.callsSaved",
+    "runId": "$state.runId"
+}
+# Panggilan eksternal yang dihemat saat kandidat didiskualifikasi di tahap screening: place details + halaman review.
+# Tanpa screening pun kandidat ini tidak memanggil LLM (keyword 0 membuat skor 0, insights hanya untuk skor > 0)
+SKIPPED_SCRAPE_CALLS = 2
 
 class Workflow:
     def __init__(self):
         self.finder = Finder()
         self.analyzer = Analyzer()
+        self.limiter = get_rate_limiter()
+        # Blob store hasil scrape, key = SHA-256 isi details (lihat _store_details)
+        self.details_store = get_cache(
+            "scrape_details", ttl=Config.DETAILS_REF_TTL, max_entries=Config.DETAILS_REF_MAX_ENTRIES
+        ) if Config.DETAILS_REF_ENABLED else None
+
+    def close(self):
+        self.finder.close()
+        self.analyzer.close()
 
+    @track_step("input")
     def start(self, params):
         """Menginisialisasi state dari parameter plain JSON."""
         validation_error = validate_payload(params, ["business_type", "location", "numberOfLeads"])
@@ -22,55 +63,185 @@ class Workflow:
             "business_type": params["business_type"], "location": params["location"],
             "numberOfLeads": params["numberOfLeads"], "leadCount": 0, "searchOffset": 0,
             "remainingPlaceIds": [], "constraints": constraints,
-            "nextPageToken": None  # Inisialisasi nextPageToken
+            "nextPageToken": None,  # Inisialisasi nextPageToken
+            "batchSize": params.get("batchSize", Config.SCRAPE_BATCH_SIZE),
+            "analysisMode": params.get("analysisMode", Config.ANALYSIS_MODE),
+            "prefilter": params.get("prefilter", Config.PREFILTER_ENABLED),
+            "skippedCount": 0, "skippedReasons": {},
+            "stagedScrape": params.get("stagedScrape", Config.STAGED_SCRAPE), "callsSaved": 0,
+            "runId": params.get("runId") or uuid.uuid4().hex
         }
+        self.limiter.start_run(initial_state["runId"], self._run_budget(params))
         return {
             "state": initial_state,
             "next": {
                 "key": "search",
-                "payload": { # Payload untuk search pertama kali
-                    "business_type": "$state.business_type", "location": "$state.location",
-                    "searchOffset": "$state.searchOffset", "constraints": "$state.constraints",
-                    "nextPageToken": "$state.nextPageToken"
-                }
+                "payload": dict(SEARCH_PAYLOAD) # Payload untuk search pertama kali
             },
             "result": None, "done": False, "error": None
         }
 
+    @staticmethod
+    def _run_budget(params):
+        """Budget run: 'budget' dari params, jika tidak default per lead (Config.RUN_BUDGET_*) dikali numberOfLeads."""
+        if isinstance(params.get("budget"), dict):
+            return params["budget"]
+        try:
+            leads = int(params["numberOfLeads"])
+        except (TypeError, ValueError):
+            leads = 0
+        return {
+            "openai_tokens": Config.RUN_BUDGET_OPENAI_TOKENS_PER_LEAD * leads,
+            "searchapi": Config.RUN_BUDGET_SEARCHAPI_CALLS_PER_LEAD * leads,
+            "gmaps": Config.RUN_BUDGET_GMAPS_CALLS_PER_LEAD * leads,
+        }
+
+    @track_step("search")
+    @run_scope
     def search(self, params):
         """Menerima parameter pencarian, mengelola paginasi dan offset dengan benar."""
         # Finder akan menggunakan 'nextPageToken' dari params untuk paginasi
-        place_ids, new_next_page_token = self.finder.find_business_ids(params)
+        candidates, new_next_page_token = self.finder.find_business_candidates(params)
 
-        if not place_ids:
+        if not candidates:
             return {"done": True, "error": "No new businesses found.", "state": None, "result": None, "next": None}
         
         # --- PERBAIKAN LOGIKA ---
         # 1. Update searchOffset dengan benar
         current_offset = params.get('searchOffset', 0)
-        new_offset = current_offset + len(place_ids)
+        new_offset = current_offset + len(candidates)
+
+        # 2. Pre-filter: hanya kandidat yang lolos hard constraint yang masuk antrean scrape
+        place_ids, skipped_reasons = self._prefilter(candidates, params)
+        skipped_count = (params.get('skippedCount') or 0) + (len(candidates) - len(place_ids))
+        state = {
+            "searchOffset": new_offset,      # Akumulasi total ID yang ditemukan
+            "nextPageToken": new_next_page_token, # Simpan token baru untuk pencarian berikutnya
+            "skippedCount": skipped_count, "skippedReasons": skipped_reasons
+        }
 
-        # 2. Ambil satu ID untuk di-scrape, sisanya simpan di state
-        next_place_to_scrape = place_ids.pop(0)
+        if not place_ids:
+            if new_next_page_token:
+                # Semua kandidat di halaman ini dilewati, lanjut ke halaman berikutnya
+                return {
+                    "state": {**state, "remainingPlaceIds": []},
+                    "next": {"key": "search", "payload": dict(SEARCH_PAYLOAD)},
+                    "result": None, "done": False, "error": None
+                }
+            return {"done": True, "error": "No new businesses matching the constraints found.", "state": state, "result": None, "next": None}
+
+        # 3. Ambil satu ID (atau satu batch) untuk di-scrape, sisanya simpan di state
+        remaining_ids, next_step = self._next_scrape_step(place_ids, params)
+        state["remainingPlaceIds"] = remaining_ids # Hanya berisi sisa ID dari pencarian ini
         
         return {
-            "state": {
-                "remainingPlaceIds": place_ids, # Hanya berisi sisa ID dari pencarian ini
-                "searchOffset": new_offset,      # Akumulasi total ID yang ditemukan
-                "nextPageToken": new_next_page_token # Simpan token baru untuk pencarian berikutnya
-            },
-            "next": {
-                "key": "scrape",
-                "payload": {"placeId": next_place_to_scrape, "constraints": "$state.constraints"}
-            },
+            "state": state,
+            "next": next_step,
             "result": None, "done": False, "error": None
         }
 
+    def _prefilter(self, candidates, params):
+        """Mengembalikan (placeId yang layak, akumulasi jumlah kandidat yang dilewati per alasan)."""
+        skipped_reasons = dict(params.get('skippedReasons') or {})
+        prefilter = params.get('prefilter')
+        if prefilter is None:
+            prefilter = Config.PREFILTER_ENABLED
+        if not prefilter:
+            return [c['place_id'] for c in candidates], skipped_reasons
+
+        # location tidak ada di constraints (hanya di state), sehingga diteruskan terpisah ke filter alamat
+        constraints = {**(params.get('constraints') or {}), "location": params.get('location')}
+        place_ids = []
+        for candidate in candidates:
+            reasons = self.analyzer.check_hard_constraints(candidate, constraints)
+            if not reasons:
+                place_ids.append(candidate['place_id'])
+            for reason in reasons:
+                skipped_reasons[reason] = skipped_reasons.get(reason, 0) + 1
+        return place_ids, skipped_reasons
+
+    def _next_scrape_step(self, place_ids, params):
+        """
+        Mengambil placeId berikutnya dari antrean. Dengan batchSize > 1 langsung mengambil satu batch
+        (dibatasi sisa lead yang dibutuhkan) untuk langkah scrape_batch.
+        """
+        batch_size = int(params.get('batchSize') or 1)
+        if batch_size <= 1:
+            return place_ids[1:], {
+                "key": "scrape",
+                "payload": {"placeId": place_ids[0], **SCRAPE_STATE_REFS}
+            }
+        try:
+            leads_needed = int(params['numberOfLeads']) - int(params.get('leadCount') or 0)
+        except (KeyError, TypeError, ValueError):
+            leads_needed = batch_size
+        count = max(1, min(batch_size, leads_needed))
+        return place_ids[count:], {
+            "key": "scrape_batch",
+            "payload": {"placeIds": place_ids[:count], **SCRAPE_STATE_REFS}
+        }
+
+    def _skip_state(self, params, skip_reasons):
+        """State delta untuk kandidat yang didiskualifikasi di tahap screening (termasuk estimasi panggilan yang dihemat)."""
+        skipped_reasons = dict(params.get('skippedReasons') or {})
+        for reason in skip_reasons:
+            skipped_reasons[reason] = skipped_reasons.get(reason, 0) + 1
+        return {
+            "skippedCount": (params.get('skippedCount') or 0) + len(skip_reasons),
+            "skippedReasons": skipped_reasons,
+            "callsSaved": (params.get('callsSaved') or 0) + SKIPPED_SCRAPE_CALLS * len(skip_reasons)
+        }
+
+    def _staged(self, params):
+        staged = params.get('stagedScrape')
+        return Config.STAGED_SCRAPE if staged is None else staged
+
+    def _store_details(self, details):
+        """Menyimpan details di blob store dan mengembalikan referensinya (hash isi), atau None bila nonaktif."""
+        if self.details_store is None:
+            return None
+        ref = hashlib.sha256(json.dumps(details, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+        self.details_store.set(ref, details)
+        return ref
+
+    def _load_details(self, inline, ref, place_id, constraints):
+        """
+        Details untuk analyze: payload inline bila dikirim, jika tidak dari blob store lewat ref.
+        Bila ref sudah kedaluwarsa, placeId di-scrape ulang (details & review umumnya masih ada di cache).
+        """
+        if inline:
+            return inline
+        if ref and self.details_store is not None:
+            details = self.details_store.get(ref)
+            if details:
+                return details
+        if not place_id:
+            return None
+        logger.info(f"detailsRef {ref} for {place_id} expired, scraping again.")
+        return self.finder.get_business_details(place_id, constraints)
+
+    def _analyze_payload(self, details):
+        """Payload langkah analyze: detailsRef + placeId (fallback) bila blob store aktif, jika tidak details penuh."""
+        ref = self._store_details(details)
+        if ref:
+            return {"detailsRef": ref, "placeId": details.get("placeId")}
+        return {"placeDetails": details}
+
+    @track_step("scrape")
+    @run_scope
     def scrape(self, params):
         """Menerima placeId dan constraints dalam plain JSON."""
         place_id = params['placeId']
         constraints = params.get('constraints', {})
-        details = self.finder.get_business_details(place_id, constraints)
+        details, skip_reason = self.finder.scrape_candidate(place_id, constraints, staged=self._staged(params))
+
+        if skip_reason:
+            # Didiskualifikasi oleh tahap murah; details dan reviews tidak diambil
+            return {
+                "state": self._skip_state(params, [skip_reason]),
+                "next": {"key": "control", "payload": {"state": "$state"}},
+                "result": None, "done": False, "error": None
+            }
 
         if not details:
             return {
@@ -86,17 +257,55 @@ class Workflow:
             "next": {
                 "key": "analyze",
                 "payload": {
-                    "placeDetails": details, "leadCount": "$state.leadCount", "constraints": "$state.constraints"
+                    **self._analyze_payload(details), "leadCount": "$state.leadCount",
+                    "constraints": "$state.constraints", "analysisMode": "$state.analysisMode",
+                    "runId": "$state.runId"
                 }
             },
             "result": None, "done": False, "error": None
         }
 
+    @track_step("scrape_batch")
+    @run_scope
+    def scrape_batch(self, params):
+        """Menerima daftar placeIds dan constraints, scrape secara paralel dalam satu langkah."""
+        place_ids = params['placeIds']
+        constraints = params.get('constraints', {})
+        details_by_id, errors, skipped = self.finder.get_business_details_batch(place_ids, constraints, staged=self._staged(params))
+        state = self._skip_state(params, list(skipped.values())) if skipped else None
+
+        if not details_by_id:
+            return {
+                "state": state,
+                "next": {"key": "control", "payload": {"state": "$state"}},
+                "result": None, "done": False, "errors": errors,
+                "error": f"Failed to scrape details for placeIds: {', '.join(errors)}" if errors else None
+            }
+
+        refs = {place_id: self._store_details(details) for place_id, details in details_by_id.items()}
+        places = {"placesDetailsRefs": refs} if all(refs.values()) else {"placesDetails": details_by_id}
+        return {
+            "state": state,
+            "next": {
+                "key": "analyze_batch",
+                "payload": {
+                    **places, "leadCount": "$state.leadCount",
+                    "numberOfLeads": "$state.numberOfLeads", "constraints": "$state.constraints",
+                    "analysisMode": "$state.analysisMode", "runId": "$state.runId"
+                }
+            },
+            "result": None, "done": False, "errors": errors, "error": None
+        }
+
+    @track_step("analyze")
+    @run_scope
     def analyze(self, params):
-        """Menerima detail tempat dalam plain JSON."""
-        details = params['placeDetails']
+        """Menerima detail tempat dalam plain JSON (placeDetails) atau referensinya (detailsRef + placeId)."""
         constraints = params.get('constraints', {})
-        analysis_result = self.analyzer.run(details, constraints)
+        details = self._load_details(params.get('placeDetails'), params.get('detailsRef'), params.get('placeId'), constraints)
+        if not details:
+            raise ValueError(f"Place details not available for detailsRef {params.get('detailsRef')}")
+        analysis_result = self.analyzer.run(details, constraints, mode=params.get('analysisMode'))
         
         return {
             "state": {"leadCount": params.get('leadCount', 0) + 1},
@@ -105,21 +314,50 @@ class Workflow:
             "done": False, "error": None
         }
 
+    @track_step("analyze_batch")
+    @run_scope
+    def analyze_batch(self, params):
+        """
+        Menganalisis hasil scrape_batch (placesDetails inline atau placesDetailsRefs per placeId);
+        jumlah yang dianalisis dibatasi sisa lead yang dibutuhkan.
+        """
+        constraints = params.get('constraints', {})
+        lead_count = params.get('leadCount') or 0
+        number_of_leads = params.get('numberOfLeads')
+        inline = params.get('placesDetails') or {}
+        refs = params.get('placesDetailsRefs') or {}
+        place_ids = list(inline or refs)
+        if number_of_leads:
+            place_ids = place_ids[:max(0, int(number_of_leads) - lead_count)]
+        loaded = [self._load_details(inline.get(place_id), refs.get(place_id), place_id, constraints) for place_id in place_ids]
+        details_list = [details for details in loaded if details]
+        results = self.analyzer.run_many(details_list, constraints, mode=params.get('analysisMode'))
+
+        return {
+            "state": {"leadCount": lead_count + len(results)},
+            "result": results,
+            "next": {"key": "control", "payload": {"state": "$state"}},
+            "done": False, "error": None
+        }
+
+    @track_step("control")
+    @run_scope
     def control(self, params):
         """Menerima parameter kontrol (bagian dari state) dalam plain JSON."""
         # --- PERBAIKAN: Menggunakan `params` secara langsung ---
         if params['leadCount'] >= params['numberOfLeads']:
             return {"state": None, "next": None, "result": None, "done": True, "error": None}
 
+        exhausted = self.limiter.exhausted(params.get('runId'))
+        if exhausted:
+            # Budget run habis: hentikan workflow dengan lead yang sudah didapat
+            return {"state": None, "next": None, "result": None, "done": True, "error": f"Run budget exhausted: {', '.join(exhausted)}"}
+
         if params.get('remainingPlaceIds'):
-            remaining_ids = params['remainingPlaceIds']
-            next_place_id = remaining_ids.pop(0)
+            remaining_ids, next_step = self._next_scrape_step(params['remainingPlaceIds'], params)
             return {
                 "state": {"remainingPlaceIds": remaining_ids},
-                "next": {
-                    "key": "scrape",
-                    "payload": {"placeId": next_place_id, "constraints": "$state.constraints"}
-                },
+                "next": next_step,
                 "result": None, "done": False, "error": None
             }
         else:
@@ -127,11 +365,7 @@ class Workflow:
                 "state": None,
                 "next": {
                     "key": "search",
-                    "payload": {
-                        "business_type": "$state.business_type", "location": "$state.location",
-                        "searchOffset": "$state.searchOffset", "constraints": "$state.constraints",
-                        "nextPageToken": "$state.nextPageToken"
-                    }
+                    "payload": dict(SEARCH_PAYLOAD)
                 },
                 "result": None, "done": False, "error": None
             }
\ No newline at end of file
@@ -1,6 +1,7 @@
 analyze_param = {
     "tags": ["Workflow"],
     "summary": "Analyze place details with user-defined constraints",
+    "description": "placeDetails bisa diganti detailsRef (+ placeId untuk scrape ulang bila referensinya kedaluwarsa) dari respons /scrape.",
     "parameters": [
         {
             "name": "body",
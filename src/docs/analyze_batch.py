@@ -0,0 +1,49 @@
+analyze_batch_param = {
+    "tags": ["Workflow"],
+    "summary": "Analyze the details produced by scrape_batch",
+    'parameters': [
+        {
+            'name': 'body',
+            'in': 'body',
+            'required': True,
+            'schema': {
+                'type': 'object',
+                'properties': {
+                    'placesDetails': {
+                        'type': 'object',
+                        'description': 'Formatted place details keyed by placeId (same shape as placeDetails in /analyze)'
+                    },
+                    'placesDetailsRefs': {
+                        'type': 'object',
+                        'description': 'detailsRef keyed by placeId, used when placesDetails is not sent'
+                    },
+                    'leadCount': {'type': 'integer', 'example': 0},
+                    'numberOfLeads': {'type': 'integer', 'example': 10},
+                    'constraints': {'type': 'object'}
+                }
+            }
+        }
+    ],
+    'responses': {
+        200: {
+            'description': 'List of analysis results, one per analyzed place',
+            'schema': {
+                'type': 'object',
+                'properties': {
+                    'state': {'type': 'object', 'example': {'leadCount': 2}},
+                    'result': {'type': 'array', 'items': {'type': 'object'}},
+                    'next': {
+                        'type': 'object',
+                        'properties': {
+                            'key': {'type': 'string', 'example': 'control'},
+                            'payload': {'type': 'object', 'example': {'state': '$state'}}
+                        }
+                    },
+                    'done': {'type': 'boolean', 'example': False},
+                    'error': {'type': 'string', 'nullable': True, 'example': None}
+                }
+            }
+        },
+        500: {'description': 'Internal server error'}
+    }
+}
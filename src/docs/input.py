@@ -50,6 +50,20 @@ input_param = {
                     'numberOfLeads': {
                         'type': 'integer',
                         'example': 23
+                    },
+                    'useSession': {
+                        'type': 'boolean',
+                        'description': 'Simpan state di server; langkah berikutnya hanya mengirim sessionId',
+                        'example': False
+                    },
+                    'budget': {
+                        'type': 'object',
+                        'description': 'Budget run ini (0 = tanpa batas); default RUN_BUDGET_* per lead dikali numberOfLeads. Bila habis, workflow selesai dengan error "Run budget exhausted"',
+                        'properties': {
+                            'openai_tokens': {'type': 'integer', 'example': 60000},
+                            'searchapi': {'type': 'integer', 'example': 50},
+                            'gmaps': {'type': 'integer', 'example': 40}
+                        }
                     }
                 }
             }
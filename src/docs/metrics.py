@@ -0,0 +1,11 @@
+metrics_param = {
+    "tags": ["Monitoring"],
+    "summary": "Prometheus metrics for this worker process",
+    "description": "Latency histograms and error counts for Google Places, SearchApi and OpenAI calls and for each Workflow step, HTTP status/timeout counts per upstream host, cache/store counters and LLM token usage. Values are per process; scrape every worker.",
+    "produces": ["text/plain"],
+    'responses': {
+        200: {
+            'description': 'Metrics in the Prometheus text exposition format'
+        }
+    }
+}
@@ -0,0 +1,47 @@
+run_param = {
+    "tags": ["Workflow"],
+    "summary": "Run the whole lead generation workflow server-side and stream leads",
+    "description": "Executes input -> search -> scrape -> analyze -> control in-process. Each analyzed lead is streamed as soon as it is ready: NDJSON by default, server-sent events with ?format=sse or 'Accept: text/event-stream'. The last event has type 'done' with skippedCount, skippedReasons and callsSaved (place details + review page calls avoided by keyword screening, 2 per skipped candidate).",
+    "produces": ["application/x-ndjson", "text/event-stream"],
+    'parameters': [
+        {
+            'name': 'format',
+            'in': 'query',
+            'type': 'string',
+            'enum': ['ndjson', 'sse'],
+            'required': False
+        },
+        {
+            'name': 'body',
+            'in': 'body',
+            'required': True,
+            'schema': {
+                'type': 'object',
+                'description': 'Same payload as /task/input, or a raw prompt parsed by PromptParser.',
+                'properties': {
+                    'prompt': {'type': 'string', 'example': 'Cari 5 cafe di Surabaya yang cocok buat nugas'},
+                    'business_type': {'type': 'string', 'example': 'cafe'},
+                    'location': {'type': 'string', 'example': 'Surabaya'},
+                    'numberOfLeads': {'type': 'integer', 'example': 5},
+                    'min_rating': {'type': 'number', 'example': 4.0},
+                    'min_reviews': {'type': 'integer', 'example': 50},
+                    'max_reviews': {'type': 'integer', 'example': 1000},
+                    'price_range': {'type': 'string', 'example': '$$'},
+                    'keywords': {'type': 'string', 'example': 'cocok buat nugas'},
+                    'business_hours': {'type': 'string', 'example': 'anytime'},
+                    'analysisMode': {'type': 'string', 'example': 'single'},
+                    'batchSize': {'type': 'integer', 'example': 5}
+                }
+            }
+        }
+    ],
+    'responses': {
+        200: {
+            'description': 'Stream of events, one JSON object per line (NDJSON) or per SSE message',
+            'examples': {
+                'application/x-ndjson': '{"type": "lead", "index": 1, "lead": {"placeName": "Demandailing Cafe", "matchPercentage": 100.0}}\n{"type": "done", "leadCount": 1, "skippedCount": 0, "skippedReasons": {}, "callsSaved": 0, "error": null}\n'
+            }
+        },
+        400: {'description': 'Invalid payload or prompt could not be parsed'}
+    }
+}
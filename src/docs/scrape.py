@@ -62,6 +62,11 @@ scrape_param = {
                             'payload': {
                                 'type': 'object',
                                 'properties': {
+                                    'detailsRef': {
+                                        'type': 'string',
+                                        'description': 'SHA-256 hasil scrape di blob store server (DETAILS_REF_ENABLED); placeDetails hanya dikirim bila nonaktif'
+                                    },
+                                    'placeId': {'type': 'string', 'example': 'ChIJhS6qhGT51y0RUCoksi_dipo'},
                                     'placeDetails': {
                                         'type': 'object',
                                         'properties': {
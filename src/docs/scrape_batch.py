@@ -0,0 +1,69 @@
+scrape_batch_param = {
+    "tags": ["Workflow"],
+    "summary": "Scrape details for many place IDs in parallel",
+    'parameters': [
+        {
+            'name': 'body',
+            'in': 'body',
+            'required': True,
+            'schema': {
+                'type': 'object',
+                'required': ['placeIds'],
+                'properties': {
+                    'placeIds': {
+                        'type': 'array',
+                        'items': {'type': 'string'},
+                        'example': ['ChIJU80L2nbxaS4R_m_3MgI5JiM', 'ChIJE1GvDtn1aS4RLfcz-MionU8']
+                    },
+                    'constraints': {
+                        'type': 'object',
+                        'properties': {
+                            'business_hours': {'type': 'string', 'example': 'anytime'},
+                            'keywords': {'type': 'string', 'example': 'terjangkau'},
+                            'min_rating': {'type': 'number', 'example': 4.5},
+                            'min_reviews': {'type': 'integer', 'example': 30},
+                            'max_reviews': {'type': 'integer', 'example': 50},
+                            'price_range': {'type': 'string', 'example': '$'}
+                        }
+                    }
+                }
+            }
+        }
+    ],
+    'responses': {
+        200: {
+            'description': 'Batch scrape finished; details per placeId are forwarded to analyze_batch',
+            'schema': {
+                'type': 'object',
+                'properties': {
+                    'state': {'type': 'object', 'nullable': True},
+                    'result': {'type': 'object', 'nullable': True},
+                    'next': {
+                        'type': 'object',
+                        'properties': {
+                            'key': {'type': 'string', 'example': 'analyze_batch'},
+                            'payload': {
+                                'type': 'object',
+                                'properties': {
+                                    'placesDetailsRefs': {'type': 'object', 'description': 'detailsRef keyed by placeId (DETAILS_REF_ENABLED)'},
+                                    'placesDetails': {'type': 'object', 'description': 'Formatted details keyed by placeId (when details refs are disabled)'},
+                                    'leadCount': {'type': 'string', 'example': '$state.leadCount'},
+                                    'numberOfLeads': {'type': 'string', 'example': '$state.numberOfLeads'},
+                                    'constraints': {'type': 'string', 'example': '$state.constraints'}
+                                }
+                            }
+                        }
+                    },
+                    'errors': {
+                        'type': 'object',
+                        'description': 'Error message per placeId that failed to scrape',
+                        'example': {'ChIJE1GvDtn1aS4RLfcz-MionU8': 'Failed to scrape details for placeId: ChIJE1GvDtn1aS4RLfcz-MionU8'}
+                    },
+                    'done': {'type': 'boolean', 'example': False},
+                    'error': {'type': 'string', 'nullable': True, 'example': None}
+                }
+            }
+        },
+        500: {'description': 'Internal server error'}
+    }
+}
@@ -0,0 +1,118 @@
+import threading
+import time
+from contextlib import contextmanager
+import requests
+from config import Config
+from ..utils.metrics import metrics, error_kind
+from ..utils.concurrency import remaining_time
+
+# Host upstream -> nama limiter (lihat Config.ADAPTIVE_LIMITS)
+UPSTREAM_HOSTS = {"maps.googleapis.com": "gmaps", "www.searchapi.io": "searchapi"}
+# Status HTTP yang berarti upstream kelebihan beban (setelah retry habis)
+OVERLOAD_STATUS_CODES = (429, 503)
+
+class Slot:
+    """Satu panggilan yang sedang berjalan; set overloaded = True bila respons menandakan upstream kelebihan beban."""
+    def __init__(self):
+        self.overloaded = False
+
+class AdaptiveLimiter:
+    """
+    Batas concurrency adaptif (AIMD) untuk satu upstream, per proses. Selama panggilan sukses dan latensinya
+    wajar, limit naik ~1 per 'limit' panggilan (additive increase, hanya saat limit benar-benar terpakai).
+    Saat 429/503, timeout, atau latensi melebihi tolerance x baseline (EWMA latensi), limit dikali backoff
+    (multiplicative decrease, paling banyak sekali per baseline agar satu lonjakan tidak memotong berkali-kali).
+    Pemanggil di atas limit menunggu giliran, paling lama sampai deadline call_deadline aktif (lalu requests.Timeout,
+    tanpa menurunkan limit karena upstream tidak pernah dipanggil).
+    """
+    def __init__(self, name, initial, min_limit, max_limit, backoff=None, tolerance=None):
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = float(max(min_limit, min(initial, max_limit)))
+        self.backoff = Config.ADAPTIVE_BACKOFF if backoff is None else backoff
+        self.tolerance = Config.ADAPTIVE_LATENCY_TOLERANCE if tolerance is None else tolerance
+        self.inflight = 0
+        self.baseline = None
+        self.samples = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+        self._publish()
+
+    def _publish(self):
+        metrics.set_gauge("adaptive_concurrency_limit", int(self.limit), upstream=self.name)
+        metrics.set_gauge("adaptive_concurrency_inflight", self.inflight, upstream=self.name)
+
+    @contextmanager
+    def slot(self):
+        start = time.perf_counter()
+        with self._cond:
+            while self.inflight >= int(self.limit):
+                remaining = remaining_time()
+                if remaining is not None and remaining <= 0:
+                    metrics.inc("adaptive_concurrency_deadline_exceeded_total", upstream=self.name)
+                    raise requests.Timeout(f"Call deadline exceeded while waiting for a {self.name} concurrency slot")
+                self._cond.wait(remaining)
+            self.inflight += 1
+            self._publish()
+        waited = time.perf_counter() - start
+        if waited > 0.001:
+            metrics.observe("adaptive_concurrency_wait_seconds", waited, upstream=self.name)
+
+        slot = Slot()
+        start = time.perf_counter()
+        try:
+            yield slot
+        except Exception as e:
+            kind = error_kind(e)
+            self._release(time.perf_counter() - start, kind if kind in ("timeout", "rate_limited") else "error")
+            raise
+        self._release(time.perf_counter() - start, "rate_limited" if slot.overloaded else None)
+
+    def _release(self, latency, failure):
+        with self._cond:
+            saturated = self.inflight >= int(self.limit)
+            self.inflight -= 1
+            spike = False
+            if failure is None:
+                spike = self.samples >= 10 and latency > self.tolerance * self.baseline
+                self.baseline = latency if self.baseline is None else 0.95 * self.baseline + 0.05 * latency
+                self.samples += 1
+            reason = failure if failure in ("timeout", "rate_limited") else "latency" if spike else None
+            now = time.monotonic()
+            if reason:
+                if now - self._last_decrease >= (self.baseline or latency):
+                    self.limit = max(self.min_limit, self.limit * self.backoff)
+                    self._last_decrease = now
+                    metrics.inc("adaptive_concurrency_decreases_total", upstream=self.name, reason=reason)
+            elif failure is None and saturated:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self._publish()
+            self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            return {"limit": int(self.limit), "inflight": self.inflight, "baseline_ms": (self.baseline or 0) * 1000}
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+def get_adaptive_limiter(upstream):
+    """Limiter upstream ini (satu per proses), atau None bila dimatikan / upstream tidak dikonfigurasi."""
+    if not Config.ADAPTIVE_CONCURRENCY_ENABLED or upstream not in Config.ADAPTIVE_LIMITS:
+        return None
+    with _limiters_lock:
+        if upstream not in _limiters:
+            initial, min_limit, max_limit = Config.ADAPTIVE_LIMITS[upstream]
+            _limiters[upstream] = AdaptiveLimiter(upstream, initial, min_limit, max_limit)
+        return _limiters[upstream]
+
+@contextmanager
+def concurrency_slot(upstream):
+    """Slot limiter adaptif untuk satu panggilan ke upstream (tanpa batas bila limiter tidak aktif)."""
+    limiter = get_adaptive_limiter(upstream)
+    if limiter is None:
+        yield Slot()
+        return
+    with limiter.slot() as slot:
+        yield slot
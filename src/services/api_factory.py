@@ -1,8 +1,12 @@
-from .openai_client import create_openai_client
+from .openai_client import create_openai_client, get_openai_client
 
 def create_client(**kwargs):
     """
     Factory untuk membuat klien API. Saat ini hanya mendukung OpenAI.
     """
     client, headers = create_openai_client(**kwargs)
-    return client, headers, "openai"
\ No newline at end of file
+    return client, headers, "openai"
+
+def get_client():
+    """Seperti create_client, tetapi memakai klien bersama milik proses ini (tidak membuat klien baru per panggilan)."""
+    return get_openai_client(), {}, "openai"
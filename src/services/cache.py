@@ -0,0 +1,200 @@
+import contextvars
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import weakref
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+_stores = weakref.WeakSet()
+_stores_lock = threading.Lock()
+
+def all_stores():
+    """Semua SqliteStore (cache, review store, session store) yang hidup di proses ini, untuk metrik."""
+    with _stores_lock:
+        return list(_stores)
+
+class SqliteStore:
+    """Dasar untuk penyimpanan berbasis file SQLite (mode WAL) yang aman dipakai lintas thread & proses."""
+    name = "store"
+
+    def __init__(self, path, counters=()):
+        self.path = path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.counters = {name: 0 for name in counters}
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with _stores_lock:
+            _stores.add(self)
+
+    def _conn(self):
+        """Satu koneksi per thread (dan per proses); sqlite3.Connection tidak aman dibagi antar thread/fork."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _count(self, counter, n=1):
+        with self._lock:
+            self.counters[counter] += n
+
+class SqliteCache(SqliteStore):
+    """
+    Cache key-value (JSON) di atas SQLite dengan TTL, batas ukuran LRU, dan stale-while-revalidate.
+    Berada di disk sehingga bertahan setelah restart dan bisa dipakai bersama oleh beberapa worker
+    (mode WAL). Counter hit/miss dihitung per proses.
+    """
+    def __init__(self, name, path=None, ttl=None, max_entries=None, stale_ttl=0):
+        if not re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", name):
+            raise ValueError(f"Invalid cache name: {name}")
+        super().__init__(
+            path or os.path.join(Config.CACHE_DIR, "cache.sqlite3"),
+            counters=("hits", "misses", "stale_hits", "refreshes", "evictions")
+        )
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.stale_ttl = stale_ttl
+        self._refreshing = set()
+        self._writes_since_evict = 0
+        conn = self._conn()
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {name} (key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)")
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {name}_accessed ON {name} (accessed_at)")
+
+    def _age_state(self, created_at, now):
+        age = now - created_at
+        if self.ttl is None or age <= self.ttl:
+            return "fresh"
+        if age <= self.ttl + self.stale_ttl:
+            return "stale"
+        return "expired"
+
+    def lookup(self, key):
+        """Mengembalikan (value, state) dengan state 'fresh', 'stale', atau None bila tidak ada."""
+        conn = self._conn()
+        row = conn.execute(f"SELECT value, created_at FROM {self.name} WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None, None
+        now = time.time()
+        state = self._age_state(row[1], now)
+        if state == "expired":
+            conn.execute(f"DELETE FROM {self.name} WHERE key = ?", (key,))
+            return None, None
+        conn.execute(f"UPDATE {self.name} SET accessed_at = ? WHERE key = ?", (now, key))
+        return json.loads(row[0]), state
+
+    def get(self, key):
+        """Hanya mengembalikan entri yang masih fresh."""
+        value, state = self.lookup(key)
+        if state == "fresh":
+            self._count("hits")
+            return value
+        self._count("misses")
+        return None
+
+    def set(self, key, value):
+        now = time.time()
+        self._conn().execute(
+            f"INSERT OR REPLACE INTO {self.name} (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+            (key, json.dumps(value), now, now)
+        )
+        with self._lock:
+            self._writes_since_evict += 1
+            should_evict = self._writes_since_evict >= 100
+            if should_evict:
+                self._writes_since_evict = 0
+        if should_evict:
+            self.evict()
+
+    def delete(self, key):
+        self._conn().execute(f"DELETE FROM {self.name} WHERE key = ?", (key,))
+
+    def evict(self):
+        """Membuang entri kedaluwarsa, lalu entri yang paling lama tidak diakses di atas max_entries."""
+        conn = self._conn()
+        removed = 0
+        if self.ttl is not None:
+            cutoff = time.time() - self.ttl - self.stale_ttl
+            removed += conn.execute(f"DELETE FROM {self.name} WHERE created_at < ?", (cutoff,)).rowcount
+        if self.max_entries:
+            overflow = self.size() - self.max_entries
+            if overflow > 0:
+                removed += conn.execute(
+                    f"DELETE FROM {self.name} WHERE key IN (SELECT key FROM {self.name} ORDER BY accessed_at ASC LIMIT ?)",
+                    (overflow,)
+                ).rowcount
+        self._count("evictions", removed)
+        return removed
+
+    def size(self):
+        return self._conn().execute(f"SELECT COUNT(*) FROM {self.name}").fetchone()[0]
+
+    def get_or_fetch(self, key, fetch):
+        """
+        Fresh -> langsung dari cache. Stale -> kembalikan nilai lama dan refresh di background.
+        Miss -> panggil fetch() lalu simpan hasilnya (hasil kosong tidak disimpan).
+        """
+        value, state = self.lookup(key)
+        if state == "fresh":
+            self._count("hits")
+            return value
+        if state == "stale":
+            self._count("stale_hits")
+            self._refresh_in_background(key, fetch)
+            return value
+        self._count("misses")
+        value = fetch()
+        if value:
+            self.set(key, value)
+        return value
+
+    def _refresh_in_background(self, key, fetch):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                value = fetch()
+                if value:
+                    self.set(key, value)
+                    self._count("refreshes")
+            except Exception as e:
+                logger.warning(f"Background refresh for {self.name}:{key} failed: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        ctx = contextvars.copy_context()
+        threading.Thread(target=ctx.run, args=(refresh,), daemon=True).start()
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self.counters)
+        counters["size"] = self.size()
+        return counters
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+def get_cache(name, **kwargs):
+    """Registry cache per proses agar semua instance service berbagi counter & koneksi yang sama."""
+    with _caches_lock:
+        if name not in _caches:
+            _caches[name] = SqliteCache(name, **kwargs)
+        return _caches[name]
+
+def all_caches():
+    with _caches_lock:
+        return dict(_caches)
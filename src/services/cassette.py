@@ -0,0 +1,163 @@
+import atexit
+import glob
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from types import SimpleNamespace
+from urllib.parse import urlsplit, parse_qsl, urlencode
+import requests
+from requests.adapters import BaseAdapter
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Parameter query yang berisi secret; tidak ikut disimpan dan tidak menjadi bagian key
+SECRET_PARAMS = {"key", "api_key"}
+
+def http_key(method, url):
+    """Key request HTTP: method + URL tanpa secret, dengan parameter query terurut."""
+    parts = urlsplit(url)
+    params = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in SECRET_PARAMS)
+    return f"{method} {parts.scheme}://{parts.netloc}{parts.path}?{urlencode(params)}"
+
+def openai_key(chat_params):
+    return "openai " + json.dumps(chat_params, sort_keys=True, ensure_ascii=False)
+
+class Cassette:
+    """
+    Rekaman panggilan API eksternal (Google Places, searchapi.io, OpenAI) dalam file JSONL ter-gzip.
+    mode 'record': panggilan asli dijalankan dan setiap respons (beserta latensinya) ditambahkan ke file.
+    mode 'replay': respons dilayani dari file secara deterministik, tanpa jaringan; latensi asli dikali
+    latency_scale (0 = tanpa jeda). Request yang sama direplay berurutan sesuai urutan rekaman.
+    """
+    def __init__(self, path, mode, latency_scale=1.0):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self._lock = threading.Lock()
+        self.counters = {"recorded": 0, "replayed": 0, "misses": 0}
+        self._entries = {}
+        self._file = None
+        if mode == "replay":
+            self._load()
+        else:
+            if os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._file = gzip.open(path, "at", encoding="utf-8")
+            atexit.register(self.close)
+
+    def _load(self):
+        # path boleh berupa pola glob (mis. rekaman per worker 'run-*.jsonl.gz')
+        paths = sorted(glob.glob(self.path)) or [self.path]
+        for path in paths:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._entries.setdefault(entry["key"], deque()).append(entry)
+
+    def record(self, entry):
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            self.counters["recorded"] += 1
+
+    def lookup(self, key):
+        """Entri berikutnya untuk key (entri terakhir dipakai ulang bila rekaman habis), atau None."""
+        with self._lock:
+            queue = self._entries.get(key)
+            if not queue:
+                self.counters["misses"] += 1
+                return None
+            entry = queue.popleft() if len(queue) > 1 else queue[0]
+            self.counters["replayed"] += 1
+        if entry.get("latency") and self.latency_scale:
+            time.sleep(entry["latency"] * self.latency_scale)
+        return entry
+
+    def chat_completion(self, client, chat_params):
+        """Pengganti client.chat.completions.create yang merekam / me-replay respons OpenAI."""
+        key = openai_key(chat_params)
+        if self.mode == "replay":
+            entry = self.lookup(key)
+            if entry is None:
+                raise RuntimeError("No cassette entry for OpenAI chat completion")
+            usage = entry.get("usage") or {}
+            return SimpleNamespace(
+                choices=[SimpleNamespace(message=SimpleNamespace(content=entry["content"]))],
+                usage=SimpleNamespace(**usage) if usage else None
+            )
+        start = time.perf_counter()
+        completion = client.chat.completions.create(**chat_params)
+        usage = getattr(completion, "usage", None)
+        self.record({
+            "key": key, "kind": "openai", "latency": round(time.perf_counter() - start, 4),
+            "content": completion.choices[0].message.content,
+            "usage": {"prompt_tokens": usage.prompt_tokens, "completion_tokens": usage.completion_tokens, "total_tokens": usage.total_tokens} if usage else None
+        })
+        return completion
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+class CassetteAdapter(BaseAdapter):
+    """Adapter requests di depan HTTPAdapter asli: merekam respons (record) atau melayaninya dari cassette (replay)."""
+    def __init__(self, cassette, adapter):
+        super().__init__()
+        self.cassette = cassette
+        self.adapter = adapter
+
+    def send(self, request, **kwargs):
+        key = http_key(request.method, request.url)
+        if self.cassette.mode == "replay":
+            entry = self.cassette.lookup(key)
+            if entry is None:
+                raise requests.exceptions.ConnectionError(f"No cassette entry for {key}", request=request)
+            response = requests.Response()
+            response.status_code = entry["status"]
+            response._content = entry["body"].encode("utf-8")
+            response.headers["Content-Type"] = entry.get("contentType") or "application/json"
+            response.encoding = "utf-8"
+            response.url = request.url
+            response.request = request
+            return response
+
+        start = time.perf_counter()
+        response = self.adapter.send(request, **kwargs)
+        self.cassette.record({
+            "key": key, "kind": "http", "latency": round(time.perf_counter() - start, 4),
+            "status": response.status_code, "contentType": response.headers.get("Content-Type"), "body": response.text
+        })
+        return response
+
+    def close(self):
+        self.adapter.close()
+
+_cassette = None
+_cassette_lock = threading.Lock()
+
+def get_cassette():
+    """
+    Cassette proses ini sesuai CASSETTE_MODE (off/record/replay); None bila mode off.
+    Saat record, '{pid}' di CASSETTE_PATH diganti PID agar setiap worker menulis file sendiri.
+    """
+    global _cassette
+    if Config.CASSETTE_MODE == "off":
+        return None
+    if _cassette is None:
+        with _cassette_lock:
+            if _cassette is None:
+                path = Config.CASSETTE_PATH.replace("{pid}", str(os.getpid())) if Config.CASSETTE_MODE == "record" else Config.CASSETTE_PATH.replace("{pid}", "*")
+                _cassette = Cassette(path, Config.CASSETTE_MODE, Config.CASSETTE_LATENCY_SCALE)
+                logger.info(f"Cassette {Config.CASSETTE_MODE} mode: {path}")
+    return _cassette
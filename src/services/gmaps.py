@@ -1,38 +1,72 @@
+import time
 import requests
 from config import Config
+from .http_client import get_http_client
+from .cache import get_cache
+from .rate_limiter import get_rate_limiter
+from ..utils.metrics import track_call
+
+PLACE_DETAILS_FIELDS = "place_id,name,formatted_address,formatted_phone_number,website,rating,user_ratings_total,price_level,opening_hours,types"
 
 class GmapsService:
     def __init__(self):
         self.gmaps_key = Config.GOOGLE_MAPS_API_KEY
         self.searchapi_key = Config.SEARCHAPI_API_KEY
-        if not self.gmaps_key: raise ValueError("GOOGLE_MAPS_API_KEY is not set. Please check your .env file.")
-        if not self.searchapi_key: raise ValueError("SEARCHAPI_API_KEY is not set. Please check your .env file.")
+        replay = Config.CASSETTE_MODE == "replay"  # Replay dari cassette tidak membutuhkan key asli
+        if not self.gmaps_key and not replay: raise ValueError("GOOGLE_MAPS_API_KEY is not set. Please check your .env file.")
+        if not self.searchapi_key and not replay: raise ValueError("SEARCHAPI_API_KEY is not set. Please check your .env file.")
         self.gmaps_search_url = "https://maps.googleapis.com/maps/api/place/textsearch/json"
         self.gmaps_details_url = "https://maps.googleapis.com/maps/api/place/details/json"
         self.searchapi_url = "https://www.searchapi.io/api/v1/search"
+        self.http = get_http_client()
+        self.limiter = get_rate_limiter()
+        self.details_cache = get_cache(
+            "place_details", ttl=Config.PLACE_DETAILS_CACHE_TTL,
+            stale_ttl=Config.PLACE_DETAILS_CACHE_STALE_TTL, max_entries=Config.PLACE_DETAILS_CACHE_MAX_ENTRIES
+        ) if Config.PLACE_DETAILS_CACHE_ENABLED else None
 
     def text_search(self, query, page_token=None):
+        """
+        Satu halaman Text Search. Google menjawab INVALID_REQUEST untuk next_page_token yang baru diterbitkan
+        (~2 detik pertama), jadi request dengan pagetoken dicoba ulang beberapa kali dengan jeda.
+        """
         params = {'key': self.gmaps_key, 'language': 'id'}
         if page_token: params['pagetoken'] = page_token
         else: params['query'] = query
-        response = requests.get(self.gmaps_search_url, params=params)
-        response.raise_for_status()
-        data = response.json()
-        if data['status'] not in ('OK', 'ZERO_RESULTS'): raise Exception(f"Google API Error: {data.get('error_message', data['status'])}")
-        return data.get('results', []), data.get('next_page_token')
+        attempts = max(1, Config.GMAPS_PAGE_TOKEN_ATTEMPTS) if page_token else 1
+        for attempt in range(1, attempts + 1):
+            self.limiter.acquire("gmaps")
+            with track_call("gmaps", "text_search"):
+                response = self.http.get(self.gmaps_search_url, params=params)
+                response.raise_for_status()
+                data = response.json()
+                token_pending = data['status'] == 'INVALID_REQUEST' and page_token and attempt < attempts
+                if not token_pending and data['status'] not in ('OK', 'ZERO_RESULTS'): raise Exception(f"Google API Error: {data.get('error_message', data['status'])}")
+            if not token_pending:
+                return data.get('results', []), data.get('next_page_token')
+            time.sleep(Config.GMAPS_PAGE_TOKEN_RETRY_DELAY)
+
+    def get_place_details(self, place_id, fields=PLACE_DETAILS_FIELDS):
+        """Place Details dengan cache on-disk (key: place_id + fields) di depan Google API."""
+        if self.details_cache is None:
+            return self._fetch_place_details(place_id, fields)
+        return self.details_cache.get_or_fetch(f"{place_id}|{fields}|id", lambda: self._fetch_place_details(place_id, fields))
 
-    def get_place_details(self, place_id):
-        params = {"place_id": place_id, "key": self.gmaps_key, "fields": "place_id,name,formatted_address,formatted_phone_number,website,rating,user_ratings_total,price_level,opening_hours,types", "language": "id"}
-        response = requests.get(self.gmaps_details_url, params=params)
-        response.raise_for_status()
-        data = response.json()
-        if data['status'] != "OK": raise Exception(f"Google Details Error: {data.get('error_message', data['status'])}")
+    def _fetch_place_details(self, place_id, fields):
+        params = {"place_id": place_id, "key": self.gmaps_key, "fields": fields, "language": "id"}
+        self.limiter.acquire("gmaps")
+        with track_call("gmaps", "place_details"):
+            response = self.http.get(self.gmaps_details_url, params=params)
+            response.raise_for_status()
+            data = response.json()
+            if data['status'] != "OK": raise Exception(f"Google Details Error: {data.get('error_message', data['status'])}")
         return data.get("result", {})
 
     def get_reviews_from_searchapi(self, place_id):
         params = {"engine": "Maps_reviews", "place_id": place_id, "api_key": self.searchapi_key, "hl": "id"}
+        self.limiter.acquire("searchapi")
         try:
-            response = requests.get(self.searchapi_url, params=params)
+            response = self.http.get(self.searchapi_url, params=params, timeout=Config.SEARCHAPI_READ_TIMEOUT)
             response.raise_for_status()
             data = response.json()
             return data.get('reviews', [])
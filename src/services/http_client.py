@@ -0,0 +1,192 @@
+import logging
+import os
+import threading
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from config import Config
+from ..utils.metrics import metrics
+from ..utils.concurrency import remaining_time
+from .cassette import get_cassette, CassetteAdapter
+from .adaptive_limiter import concurrency_slot, UPSTREAM_HOSTS, OVERLOAD_STATUS_CODES
+from .rate_limiter import get_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+DEFAULT_PORTS = {"http": 80, "https": 443}
+# Host dengan read timeout panjang (SEARCHAPI_READ_TIMEOUT); read timeout tidak di-retry agar satu panggilan
+# tidak memakan beberapa kali lipat timeout-nya
+NO_READ_RETRY_HOSTS = ("https://www.searchapi.io",)
+
+def _tracked_pool(pool_cls, pools, lock):
+    """Subclass connection pool urllib3 yang mendaftarkan dirinya ke `pools` (untuk HttpClient.stats)."""
+    class TrackedPool(pool_cls):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            with lock:
+                pools.append(self)
+    return TrackedPool
+
+class ClientRetry(Retry):
+    """
+    Retry urllib3 yang berhenti bila deadline panggilan (utils.concurrency.call_deadline) akan terlewati.
+    Setiap percobaan ulang ke upstream yang dikenal (UPSTREAM_HOSTS) juga mengambil token rate limit dan
+    dibebankan ke budget run, sama seperti request pertama yang di-acquire oleh service.
+    """
+    def is_exhausted(self):
+        remaining = remaining_time()
+        return super().is_exhausted() or (remaining is not None and remaining <= self.get_backoff_time())
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        new_retry = super().increment(method, url, response=response, error=error, _pool=_pool, _stacktrace=_stacktrace)
+        provider = UPSTREAM_HOSTS.get(getattr(_pool, "host", None))
+        if provider:
+            try:
+                get_rate_limiter().acquire(provider)
+            except Exception:
+                # RateLimitTimeout / BudgetExceeded: tidak ada retry, kembalikan koneksi respons sebelumnya ke pool
+                if response is not None:
+                    response.drain_conn()
+                raise
+        return new_retry
+
+class CountingAdapter(HTTPAdapter):
+    """HTTPAdapter yang mencatat semua connection pool yang dibuatnya, tanpa membaca internal PoolManager."""
+    def __init__(self, *args, **kwargs):
+        self.pools = []
+        self._pools_lock = threading.Lock()
+        super().__init__(*args, **kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            scheme: _tracked_pool(pool_cls, self.pools, self._pools_lock)
+            for scheme, pool_cls in self.poolmanager.pool_classes_by_scheme.items()
+        }
+
+    def pool_list(self):
+        """Semua pool yang pernah dibuat (termasuk yang sudah dibuang PoolManager), agar counter tetap kumulatif."""
+        with self._pools_lock:
+            return list(self.pools)
+
+class HttpClient:
+    """
+    Transport HTTP bersama untuk semua service eksternal.
+    Satu Session keep-alive dengan connection pool per host, timeout connect/read,
+    dan retry-with-backoff untuk 429/5xx (read timeout searchapi.io tidak di-retry).
+    """
+    def __init__(self, connect_timeout=None, read_timeout=None, max_retries=None,
+                 backoff_factor=None, pool_connections=None, pool_maxsize=None):
+        self.connect_timeout = connect_timeout or Config.HTTP_CONNECT_TIMEOUT
+        self.read_timeout = read_timeout or Config.HTTP_READ_TIMEOUT
+        retries = Config.HTTP_MAX_RETRIES if max_retries is None else max_retries
+        retry = ClientRetry(
+            total=retries, connect=retries, read=retries, status=retries,
+            backoff_factor=Config.HTTP_BACKOFF_FACTOR if backoff_factor is None else backoff_factor,
+            status_forcelist=RETRY_STATUS_CODES, allowed_methods=frozenset(["GET"]),
+            respect_retry_after_header=True, raise_on_status=False
+        )
+        pool_connections = pool_connections or Config.HTTP_POOL_CONNECTIONS
+        pool_maxsize = pool_maxsize or Config.HTTP_POOL_MAXSIZE
+        self.adapter = CountingAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+        self.no_read_retry_adapter = CountingAdapter(
+            pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry.new(read=0)
+        )
+        self.session = requests.Session()
+        cassette = get_cassette()
+        # Mode cassette: adapter perekam/replay di depan adapter asli
+        mounted = CassetteAdapter(cassette, self.adapter) if cassette is not None else self.adapter
+        self.session.mount("https://", mounted)
+        self.session.mount("http://", mounted)
+        for prefix in NO_READ_RETRY_HOSTS:
+            adapter = self.no_read_retry_adapter
+            self.session.mount(prefix, CassetteAdapter(cassette, adapter) if cassette is not None else adapter)
+
+    def _timeout(self, timeout):
+        """
+        Timeout tunggal dianggap sebagai read timeout; tuple diteruskan apa adanya.
+        Di dalam call_deadline, connect/read timeout dipotong ke sisa waktu deadline.
+        """
+        if timeout is None:
+            timeout = (self.connect_timeout, self.read_timeout)
+        elif isinstance(timeout, (int, float)):
+            timeout = (self.connect_timeout, timeout)
+        remaining = remaining_time()
+        if remaining is None:
+            return timeout
+        if remaining <= 0:
+            raise requests.Timeout("Call deadline exceeded before the request was sent")
+        return tuple(min(value, remaining) if value is not None else remaining for value in timeout)
+
+    def get(self, url, params=None, timeout=None, **kwargs):
+        parts = urlsplit(url)
+        host = f"{parts.scheme}://{parts.hostname}"
+        # Deadline yang sudah lewat ditolak di sini, sebelum mengambil slot limiter adaptif
+        timeout = self._timeout(timeout)
+        try:
+            # Batas concurrency adaptif per upstream (Google / searchapi.io); waktu retry ikut dihitung sebagai latensi
+            with concurrency_slot(UPSTREAM_HOSTS.get(parts.hostname)) as slot:
+                response = self.session.get(url, params=params, timeout=timeout, **kwargs)
+                slot.overloaded = response.status_code in OVERLOAD_STATUS_CODES
+        except requests.RequestException as e:
+            kind = "timeout" if isinstance(e, requests.Timeout) else "connection" if isinstance(e, requests.ConnectionError) else "error"
+            metrics.inc("http_request_errors_total", host=host, kind=kind)
+            raise
+        metrics.inc("http_responses_total", host=host, status=response.status_code)
+        return response
+
+    def preconnect(self, urls):
+        """
+        Membuka koneksi keep-alive (TCP+TLS) ke host-host ini lebih dulu dengan request HEAD lewat adapter asli
+        (tanpa cassette dan metrik), agar request pertama worker tidak membayar handshake.
+        """
+        for url in urls:
+            request = requests.Request("HEAD", url).prepare()
+            adapter = self.no_read_retry_adapter if url.startswith(NO_READ_RETRY_HOSTS) else self.adapter
+            try:
+                adapter.send(request, timeout=(self.connect_timeout, self.connect_timeout)).close()
+            except requests.RequestException as e:
+                logger.warning(f"Preconnect to {url} failed: {e}")
+
+    def stats(self):
+        """
+        Statistik pool per host. 'hits' = request yang memakai ulang koneksi keep-alive,
+        'misses' = request yang harus membuka koneksi (TCP+TLS handshake) baru.
+        """
+        per_host = {}
+        for adapter in (self.adapter, self.no_read_retry_adapter):
+            for pool in adapter.pool_list():
+                host = f"{pool.scheme}://{pool.host}"
+                if pool.port and pool.port != DEFAULT_PORTS.get(pool.scheme):
+                    host += f":{pool.port}"
+                entry = per_host.setdefault(host, {"requests": 0, "hits": 0, "misses": 0})
+                entry["requests"] += pool.num_requests
+                entry["misses"] += pool.num_connections
+                entry["hits"] += max(0, pool.num_requests - pool.num_connections)
+        return {
+            "hits": sum(e["hits"] for e in per_host.values()),
+            "misses": sum(e["misses"] for e in per_host.values()),
+            "hosts": per_host
+        }
+
+    def close(self):
+        self.session.close()
+
+_shared_client = None
+_shared_pid = None
+_shared_lock = threading.Lock()
+
+def get_http_client():
+    """
+    Mengembalikan HttpClient bersama (satu per proses) yang dipakai semua service.
+    Setelah fork (mis. worker gunicorn dengan preload) dibuat client baru; pool koneksi tidak boleh dipakai lintas proses.
+    """
+    global _shared_client, _shared_pid
+    if _shared_client is None or _shared_pid != os.getpid():
+        with _shared_lock:
+            if _shared_client is None or _shared_pid != os.getpid():
+                _shared_client = HttpClient()
+                _shared_pid = os.getpid()
+    return _shared_client
@@ -1,10 +1,21 @@
+import hashlib
 import json
+import os
+import threading
 from config import Config
-from openai import OpenAI
+from .cache import get_cache
+from .cassette import get_cassette
+from .rate_limiter import get_rate_limiter, BudgetExceeded, RateLimitTimeout
+from .adaptive_limiter import concurrency_slot
+from ..utils.metrics import metrics, track_call
 
 # Fungsi ini dibutuhkan oleh prompt_parser
 def create_openai_client(api_key=None, organization=None):
+    # Paket openai diimpor di sini (bukan saat import modul) karena memakan sebagian besar waktu startup app
+    from openai import OpenAI
     final_api_key = api_key or Config.OPENAI_API_KEY
+    if not final_api_key and Config.CASSETTE_MODE == "replay":
+        final_api_key = "cassette-replay"  # Replay tidak memanggil API, key asli tidak dibutuhkan
     if not final_api_key:
         raise ValueError("OPENAI_API_KEY is not set. Please check your .env file.")
     client_kwargs = {"api_key": final_api_key}
@@ -13,18 +24,92 @@ def create_openai_client(api_key=None, organization=None):
     client = OpenAI(**client_kwargs)
     return client, {}
 
+_shared_client = None
+_shared_pid = None
+_shared_lock = threading.Lock()
+
+def get_openai_client():
+    """Klien OpenAI bersama (satu per proses, dibuat saat pertama dipakai) untuk OpenAIService dan PromptParser."""
+    global _shared_client, _shared_pid
+    if _shared_client is None or _shared_pid != os.getpid():
+        with _shared_lock:
+            if _shared_client is None or _shared_pid != os.getpid():
+                _shared_client, _ = create_openai_client()
+                _shared_pid = os.getpid()
+    return _shared_client
+
+def get_llm_cache():
+    """Cache respons LLM bersama (on-disk); None bila dimatikan lewat LLM_CACHE_ENABLED."""
+    if not Config.LLM_CACHE_ENABLED:
+        return None
+    return get_cache("llm_responses", ttl=Config.LLM_CACHE_TTL, max_entries=Config.LLM_CACHE_MAX_ENTRIES)
+
+def llm_cache_key(chat_params):
+    """Hash SHA-256 dari parameter completion (model, messages, response_format, ...)."""
+    raw = json.dumps(chat_params, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+def is_valid_json(text):
+    try:
+        json.loads(text)
+        return True
+    except (TypeError, ValueError):
+        return False
+
+def cached_completion(client, use_cache=True, validate=None, **chat_params):
+    """
+    Menjalankan chat completion lewat cache content-addressed dan mengembalikan teks respons.
+    Respons kosong atau yang gagal `validate` tidak disimpan.
+    """
+    cache = get_llm_cache() if use_cache else None
+    key = llm_cache_key(chat_params) if cache is not None else None
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+    cassette = get_cassette()
+    limiter = get_rate_limiter()
+    # Token prompt diperkirakan (~4 karakter per token) untuk bucket TPM, lalu dikoreksi dengan usage asli
+    estimated_tokens = len(json.dumps(chat_params.get("messages"), ensure_ascii=False)) // 4 + 1
+    limiter.acquire("openai")
+    limiter.acquire("openai_tokens", estimated_tokens)
+    with track_call("openai", "chat_completion"), concurrency_slot("openai"):
+        if cassette is not None:
+            completion = cassette.chat_completion(client, chat_params)
+        else:
+            completion = client.chat.completions.create(**chat_params)
+    usage = getattr(completion, "usage", None)
+    if usage is not None:
+        model = chat_params.get("model", "")
+        metrics.inc("llm_tokens_total", usage.prompt_tokens or 0, model=model, kind="prompt")
+        metrics.inc("llm_tokens_total", usage.completion_tokens or 0, model=model, kind="completion")
+        limiter.charge("openai_tokens", (usage.total_tokens or 0) - estimated_tokens)
+    content = completion.choices[0].message.content
+    if cache is not None and content and (validate is None or validate(content)):
+        cache.set(key, content)
+    return content
+
 class OpenAIService:
-    def __init__(self):
-        self.client, _ = create_openai_client()
+    def __init__(self, use_cache=True):
         self.model = Config.DEFAULT_OPENAI_MODEL
+        self.use_cache = use_cache
+
+    @property
+    def client(self):
+        return get_openai_client()
 
-    def _call_api(self, messages, json_mode=False):
+    def _call_api(self, messages, json_mode=False, use_cache=None, validate=None):
+        """use_cache=False mem-bypass cache untuk satu panggilan; validate menentukan respons yang boleh di-cache."""
         try:
             response_format = {"type": "json_object"} if json_mode else None
-            completion = self.client.chat.completions.create(
+            return cached_completion(
+                self.client, use_cache=self.use_cache if use_cache is None else use_cache,
+                validate=validate or (is_valid_json if json_mode else None),
                 model=self.model, messages=messages, response_format=response_format
             )
-            return completion.choices[0].message.content
+        except (BudgetExceeded, RateLimitTimeout):
+            # Budget habis / antrean rate limit penuh: langkah harus gagal, bukan menghasilkan insight kosong
+            raise
         except Exception as e:
             print(f"OpenAI API call failed: {e}")
             return "{}" if json_mode else ""
@@ -36,7 +121,147 @@ class OpenAIService:
 Reviews:\n- {reviews_for_prompt}\n\nConcise Summary:"""
         return self._call_api([{"role": "user", "content": prompt}])
 
-    def generate_insights(self, details, match_percentage):
+    def generate_insights(self, details, match_percentage, mode="standard"):
+        """
+        mode 'standard': tiga completion (ringkasan positif, negatif, lalu strengths/weaknesses).
+        mode 'single' (dan 'batch' untuk satu tempat): satu completion JSON untuk keempat output,
+        fallback ke 'standard' bila tidak valid.
+        """
+        if mode in ("single", "batch"):
+            result = self.generate_insights_single(details, match_percentage)
+            if result is not None:
+                return result
+        return self._generate_insights_standard(details, match_percentage)
+
+    @classmethod
+    def is_valid_analysis(cls, text):
+        try:
+            return cls.validate_analysis(json.loads(text)) is not None
+        except (TypeError, ValueError):
+            return False
+
+    @staticmethod
+    def validate_analysis(data):
+        """Memeriksa skema ketat output analisis; mengembalikan dict ter-normalisasi atau None."""
+        if not isinstance(data, dict):
+            return None
+        summaries = [data.get("positiveSummary"), data.get("negativeSummary")]
+        lists = [data.get("strengths"), data.get("weaknesses")]
+        if not all(isinstance(v, str) for v in summaries):
+            return None
+        if not all(isinstance(v, list) and all(isinstance(item, str) for item in v) for v in lists):
+            return None
+        return {
+            "positiveSummary": data["positiveSummary"], "negativeSummary": data["negativeSummary"],
+            "strengths": data["strengths"], "weaknesses": data["weaknesses"]
+        }
+
+    @staticmethod
+    def _place_block(details, match_percentage):
+        positive = "\n".join(f"  - {r}" for r in details.get('positiveReviews', [])) or "  (none)"
+        negative = "\n".join(f"  - {r}" for r in details.get('negativeReviews', [])) or "  (none)"
+        return f"""- Name: {details.get('placeName')}
+- Rating: {details.get('rating')} from {details.get('totalRatings')} reviews.
+- Match Score: {match_percentage}%
+- Positive reviews:
+{positive}
+- Negative reviews:
+{negative}"""
+
+    def generate_insights_single(self, details, match_percentage):
+        """Satu completion JSON mode; None bila respons tidak lolos validasi skema."""
+        prompt = f"""As a business analyst, analyze the following business and its reviews. Respond ONLY with a valid JSON object with exactly these keys:
+- "positiveSummary": one fluent paragraph summarizing the main themes of the positive reviews ("" if there are none),
+- "negativeSummary": one fluent paragraph summarizing the main themes of the negative reviews ("" if there are none),
+- "strengths": array of 2-3 short strings,
+- "weaknesses": array of 2-3 short strings.
+Data:
+{self._place_block(details, match_percentage)}"""
+        response_str = self._call_api([{"role": "user", "content": prompt}], json_mode=True, validate=self.is_valid_analysis)
+        try:
+            analysis = self.validate_analysis(json.loads(response_str))
+        except json.JSONDecodeError:
+            analysis = None
+        if analysis is None:
+            return None
+        if not details.get('positiveReviews'): analysis["positiveSummary"] = ""
+        if not details.get('negativeReviews'): analysis["negativeSummary"] = ""
+        insights = {"strengths": analysis["strengths"], "weaknesses": analysis["weaknesses"]}
+        return insights, analysis["positiveSummary"], analysis["negativeSummary"]
+
+    @staticmethod
+    def estimate_tokens(text):
+        """Perkiraan kasar jumlah token (~4 karakter per token)."""
+        return len(text) // 4 + 1
+
+    def split_batches(self, items):
+        """
+        Membagi items [(place_id, details, match_percentage), ...] menjadi batch sesuai
+        LLM_BATCH_TOKEN_BUDGET dan LLM_BATCH_MAX_PLACES. Tempat yang sendirian sudah melebihi
+        budget dikembalikan terpisah sebagai oversized (dianalisis satu per satu).
+        """
+        batches, oversized = [], []
+        current, current_tokens = [], 0
+        for item in items:
+            tokens = self.estimate_tokens(self._place_block(item[1], item[2]))
+            if tokens > Config.LLM_BATCH_TOKEN_BUDGET:
+                oversized.append(item)
+                continue
+            if current and (current_tokens + tokens > Config.LLM_BATCH_TOKEN_BUDGET or len(current) >= Config.LLM_BATCH_MAX_PLACES):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(item)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches, oversized
+
+    def generate_insights_batch(self, items):
+        """
+        Satu completion JSON untuk beberapa tempat. Mengembalikan {place_id: (insights, pos, neg)}.
+        Tempat yang hilang atau tidak valid di respons (atau seluruh batch bila gagal) diulang satu per satu.
+        """
+        if len(items) == 1:
+            place_id, details, match_percentage = items[0]
+            return {place_id: self.generate_insights(details, match_percentage, mode="single")}
+
+        blocks = "\n\n".join(f'Place "placeId": "{place_id}"\n{self._place_block(details, match_percentage)}' for place_id, details, match_percentage in items)
+        prompt = f"""As a business analyst, analyze each of the following businesses and their reviews. Respond ONLY with a valid JSON object of the form {{"results": {{"<placeId>": {{...}}}}}} containing one entry per placeId, where each entry has exactly these keys:
+- "positiveSummary": one fluent paragraph summarizing the main themes of the positive reviews ("" if there are none),
+- "negativeSummary": one fluent paragraph summarizing the main themes of the negative reviews ("" if there are none),
+- "strengths": array of 2-3 short strings,
+- "weaknesses": array of 2-3 short strings.
+
+{blocks}"""
+        response_str = self._call_api([{"role": "user", "content": prompt}], json_mode=True, validate=lambda text: self._batch_is_complete(text, items))
+        try:
+            raw_results = json.loads(response_str).get("results", {})
+        except (json.JSONDecodeError, AttributeError):
+            raw_results = {}
+        if not isinstance(raw_results, dict):
+            raw_results = {}
+
+        results = {}
+        for place_id, details, match_percentage in items:
+            analysis = self.validate_analysis(raw_results.get(place_id))
+            if analysis is None:
+                results[place_id] = self.generate_insights(details, match_percentage, mode="single")
+                continue
+            if not details.get('positiveReviews'): analysis["positiveSummary"] = ""
+            if not details.get('negativeReviews'): analysis["negativeSummary"] = ""
+            insights = {"strengths": analysis["strengths"], "weaknesses": analysis["weaknesses"]}
+            results[place_id] = (insights, analysis["positiveSummary"], analysis["negativeSummary"])
+        return results
+
+    def _batch_is_complete(self, text, items):
+        """Respons batch hanya di-cache bila semua placeId ada dan valid."""
+        try:
+            raw_results = json.loads(text).get("results", {})
+            return all(self.validate_analysis(raw_results.get(place_id)) is not None for place_id, _, _ in items)
+        except (TypeError, ValueError, AttributeError):
+            return False
+
+    def _generate_insights_standard(self, details, match_percentage):
         positive_summary = self.summarize_reviews(details.get('positiveReviews', []), 'positive')
         negative_summary = self.summarize_reviews(details.get('negativeReviews', []), 'negative')
         prompt = f"""As a business analyst, provide insights for the following business. Respond ONLY with a valid JSON object with "strengths" and "weaknesses" keys.
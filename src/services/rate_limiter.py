@@ -0,0 +1,205 @@
+import contextvars
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from config import Config
+from .cache import SqliteStore
+from ..utils.metrics import metrics
+from ..utils.concurrency import remaining_time
+
+logger = logging.getLogger(__name__)
+
+# runId workflow yang sedang berjalan (di-set per langkah, ikut tersalin ke thread lewat submit_with_context)
+current_run = contextvars.ContextVar("current_run", default=None)
+
+class RateLimitTimeout(Exception):
+    """Antrean rate limit lebih panjang dari RATE_LIMIT_MAX_WAIT."""
+
+class BudgetExceeded(Exception):
+    """Budget run (panggilan atau token) untuk provider ini sudah habis."""
+
+class RateLimiter(SqliteStore):
+    """
+    Token bucket per provider (gmaps, searchapi, openai, openai_tokens) yang state-nya disimpan di SQLite,
+    sehingga semua worker di host ini berbagi laju yang sama. Setiap pemanggil memesan token lebih dulu
+    (bucket boleh negatif) lalu tidur sampai gilirannya, jadi pemanggil dilayani berurutan seperti antrean,
+    bukan ditolak. Juga mencatat pemakaian per run untuk budget per run (lihat start_run).
+    """
+    name = "rate_limits"
+
+    def __init__(self, path=None, limits=None, max_wait=None):
+        super().__init__(
+            path or os.path.join(Config.CACHE_DIR, "rate_limits.sqlite3"),
+            counters=("acquired", "waited", "budget_exceeded")
+        )
+        # {provider: (token per detik, kapasitas burst)}; rate 0 = tanpa batas
+        if limits is None:
+            limits = Config.RATE_LIMITS if Config.RATE_LIMIT_ENABLED else {}
+        self.limits = limits
+        self.max_wait = Config.RATE_LIMIT_MAX_WAIT if max_wait is None else max_wait
+        self._run_limits = {}
+        self._runs_since_evict = 0
+        conn = self._conn()
+        conn.execute("CREATE TABLE IF NOT EXISTS buckets (provider TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)")
+        conn.execute("CREATE TABLE IF NOT EXISTS runs (run_id TEXT PRIMARY KEY, limits TEXT NOT NULL, created_at REAL NOT NULL)")
+        conn.execute("""CREATE TABLE IF NOT EXISTS run_usage (
+            run_id TEXT NOT NULL, provider TEXT NOT NULL, used REAL NOT NULL, PRIMARY KEY (run_id, provider))""")
+
+    def _reserve(self, provider, cost, rate, burst, max_wait):
+        """Mengambil cost token dari bucket (boleh menjadi negatif) dan mengembalikan lama menunggu."""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            row = conn.execute("SELECT tokens, updated_at FROM buckets WHERE provider = ?", (provider,)).fetchone()
+            tokens = burst if row is None else min(burst, row[0] + (now - row[1]) * rate)
+            wait = max(0.0, (cost - tokens) / rate)
+            if wait > max_wait:
+                conn.execute("ROLLBACK")
+                raise RateLimitTimeout(f"Rate limit queue for {provider} is {wait:.1f}s long (max {max_wait:.1f}s)")
+            conn.execute("INSERT OR REPLACE INTO buckets (provider, tokens, updated_at) VALUES (?, ?, ?)", (provider, tokens - cost, now))
+            conn.execute("COMMIT")
+        except RateLimitTimeout:
+            raise
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return wait
+
+    def acquire(self, provider, cost=1):
+        """
+        Dipanggil tepat sebelum request ke provider: menolak bila budget run sudah habis (BudgetExceeded),
+        menunggu giliran di token bucket, lalu membebankan cost ke budget run.
+        Di dalam call_deadline antrean tidak boleh melewati sisa waktu deadline.
+        """
+        self.check_budget(provider)
+        rate, burst = self.limits.get(provider, (0, 0))
+        if rate > 0:
+            remaining = remaining_time()
+            max_wait = self.max_wait if remaining is None else max(0.0, min(self.max_wait, remaining))
+            wait = self._reserve(provider, cost, rate, max(burst, 1), max_wait)
+            if wait > 0:
+                self._count("waited")
+                metrics.observe("rate_limit_wait_seconds", wait, provider=provider)
+                time.sleep(wait)
+        self._count("acquired")
+        self.charge(provider, cost)
+
+    # --- Budget per run ---
+
+    def start_run(self, run_id, limits):
+        """Mendaftarkan budget run, mis. {"openai_tokens": 50000, "searchapi": 40}; nilai 0/None = tanpa batas."""
+        limits = {provider: value for provider, value in (limits or {}).items() if value}
+        if not limits:
+            return
+        self._conn().execute(
+            "INSERT OR REPLACE INTO runs (run_id, limits, created_at) VALUES (?, ?, ?)", (run_id, json.dumps(limits), time.time())
+        )
+        with self._lock:
+            self._run_limits[run_id] = limits
+            self._runs_since_evict += 1
+            should_evict = self._runs_since_evict >= 100
+            if should_evict:
+                self._runs_since_evict = 0
+        if should_evict:
+            self.evict()
+
+    def run_limits(self, run_id):
+        if not run_id:
+            return {}
+        with self._lock:
+            limits = self._run_limits.get(run_id)
+        if limits is None:
+            row = self._conn().execute("SELECT limits FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+            limits = json.loads(row[0]) if row else {}
+            with self._lock:
+                if len(self._run_limits) >= 10000:
+                    self._run_limits.clear()
+                self._run_limits[run_id] = limits
+        return limits
+
+    def usage(self, run_id):
+        rows = self._conn().execute("SELECT provider, used FROM run_usage WHERE run_id = ?", (run_id,)).fetchall()
+        return dict(rows)
+
+    def check_budget(self, provider, run_id=None):
+        run_id = run_id or current_run.get()
+        limit = self.run_limits(run_id).get(provider)
+        if not limit:
+            return
+        if self.usage(run_id).get(provider, 0) >= limit:
+            self._count("budget_exceeded")
+            raise BudgetExceeded(f"Run budget for {provider} exhausted ({limit})")
+
+    def exhausted(self, run_id):
+        """Provider yang budget-nya sudah habis untuk run ini."""
+        limits = self.run_limits(run_id)
+        if not limits:
+            return []
+        used = self.usage(run_id)
+        return [provider for provider, limit in limits.items() if used.get(provider, 0) >= limit]
+
+    def charge(self, provider, amount):
+        """Menambah pemakaian run aktif (hanya untuk provider yang punya budget); amount boleh negatif untuk koreksi."""
+        run_id = current_run.get()
+        if not amount or provider not in self.run_limits(run_id):
+            return
+        self._conn().execute(
+            "INSERT INTO run_usage (run_id, provider, used) VALUES (?, ?, ?) "
+            "ON CONFLICT (run_id, provider) DO UPDATE SET used = used + excluded.used", (run_id, provider, amount)
+        )
+
+    def evict(self):
+        """Membuang data budget run yang lebih tua dari RUN_BUDGET_TTL."""
+        conn = self._conn()
+        cutoff = time.time() - Config.RUN_BUDGET_TTL
+        conn.execute("DELETE FROM run_usage WHERE run_id IN (SELECT run_id FROM runs WHERE created_at < ?)", (cutoff,))
+        removed = conn.execute("DELETE FROM runs WHERE created_at < ?", (cutoff,)).rowcount
+        if removed:
+            logger.info(f"Evicted {removed} expired run budgets")
+        return removed
+
+    def bucket_levels(self):
+        """Isi bucket saat ini per provider (negatif = ada antrean), untuk metrik."""
+        rows = self._conn().execute("SELECT provider, tokens, updated_at FROM buckets").fetchall()
+        now = time.time()
+        levels = {}
+        for provider, tokens, updated_at in rows:
+            rate, burst = self.limits.get(provider, (0, 0))
+            if rate > 0:
+                levels[provider] = min(max(burst, 1), tokens + (now - updated_at) * rate)
+        return levels
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters)
+
+def run_scope(step):
+    """
+    Decorator langkah Workflow: runId dari params menjadi run aktif (current_run) selama langkah berjalan.
+    Bila budget run habis di tengah langkah, workflow diakhiri (done) dengan error, bukan gagal 500.
+    """
+    @functools.wraps(step)
+    def wrapper(self, params, *args, **kwargs):
+        token = current_run.set(params.get("runId") if isinstance(params, dict) else None)
+        try:
+            return step(self, params, *args, **kwargs)
+        except BudgetExceeded as e:
+            return {"state": None, "next": None, "result": None, "done": True, "error": str(e)}
+        finally:
+            current_run.reset(token)
+    return wrapper
+
+_shared_limiter = None
+_shared_lock = threading.Lock()
+
+def get_rate_limiter():
+    global _shared_limiter
+    if _shared_limiter is None:
+        with _shared_lock:
+            if _shared_limiter is None:
+                _shared_limiter = RateLimiter()
+    return _shared_limiter
@@ -0,0 +1,103 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from config import Config
+from .cache import SqliteStore
+
+class ReviewStore(SqliteStore):
+    """
+    Penyimpanan review per tempat (SQLite) dengan key review_id. Menyimpan unix_timestamp dan posisi review
+    di hasil SearchApi, sehingga bisa dibaca urut terbaru maupun urut relevansi (lihat Config.REVIEW_SORT_BY).
+    """
+    name = "reviews"
+
+    def __init__(self, path=None):
+        super().__init__(
+            path or os.path.join(Config.CACHE_DIR, "reviews.sqlite3"),
+            counters=("full_fetches", "incremental_fetches", "skipped_fetches", "pages_fetched")
+        )
+        conn = self._conn()
+        conn.execute("""CREATE TABLE IF NOT EXISTS reviews (
+            place_id TEXT NOT NULL, review_id TEXT NOT NULL, unix_timestamp INTEGER NOT NULL,
+            payload TEXT NOT NULL, position INTEGER, PRIMARY KEY (place_id, review_id))""")
+        if "position" not in [row[1] for row in conn.execute("PRAGMA table_info(reviews)")]:
+            conn.execute("ALTER TABLE reviews ADD COLUMN position INTEGER")
+        conn.execute("CREATE INDEX IF NOT EXISTS reviews_place_ts ON reviews (place_id, unix_timestamp DESC)")
+        conn.execute("CREATE TABLE IF NOT EXISTS review_places (place_id TEXT PRIMARY KEY, refreshed_at REAL NOT NULL)")
+
+    @staticmethod
+    def review_key(review):
+        """review_id dari SearchApi bila ada, jika tidak hash dari timestamp + penulis + teks."""
+        if review.get("review_id"):
+            return str(review["review_id"])
+        user = review.get("user") or {}
+        raw = f"{review.get('unix_timestamp', review.get('iso_date', ''))}|{user.get('name', '') if isinstance(user, dict) else user}|{review.get('text', '')}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def newest_timestamp(self, place_id):
+        row = self._conn().execute("SELECT MAX(unix_timestamp) FROM reviews WHERE place_id = ?", (place_id,)).fetchone()
+        return row[0]
+
+    def last_refreshed(self, place_id):
+        row = self._conn().execute("SELECT refreshed_at FROM review_places WHERE place_id = ?", (place_id,)).fetchone()
+        return row[0] if row else None
+
+    def merge(self, place_id, reviews):
+        """Menyimpan review baru (duplikat berdasarkan review_id ditimpa) dan menandai waktu refresh."""
+        rows = [(place_id, self.review_key(r), int(r.get("unix_timestamp") or 0), json.dumps(r)) for r in reviews]
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany("INSERT OR REPLACE INTO reviews (place_id, review_id, unix_timestamp, payload) VALUES (?, ?, ?, ?)", rows)
+            conn.execute("INSERT OR REPLACE INTO review_places (place_id, refreshed_at) VALUES (?, ?)", (place_id, time.time()))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def replace(self, place_id, reviews):
+        """Mengganti semua review tempat ini dengan hasil fetch penuh (urutannya disimpan di kolom position)."""
+        rows = [(place_id, self.review_key(r), int(r.get("unix_timestamp") or 0), json.dumps(r), i) for i, r in enumerate(reviews)]
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM reviews WHERE place_id = ?", (place_id,))
+            conn.executemany("INSERT OR REPLACE INTO reviews (place_id, review_id, unix_timestamp, payload, position) VALUES (?, ?, ?, ?, ?)", rows)
+            conn.execute("INSERT OR REPLACE INTO review_places (place_id, refreshed_at) VALUES (?, ?)", (place_id, time.time()))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def get_reviews(self, place_id, limit=None, order="newest"):
+        """Review tersimpan, terbaru lebih dulu (order="newest") atau sesuai urutan fetch terakhir (order="relevance")."""
+        order_by = "unix_timestamp DESC" if order == "newest" else "position IS NULL, position, unix_timestamp DESC"
+        query = f"SELECT payload FROM reviews WHERE place_id = ? ORDER BY {order_by}"
+        params = (place_id,)
+        if limit is not None:
+            query += " LIMIT ?"
+            params = (place_id, limit)
+        return [json.loads(row[0]) for row in self._conn().execute(query, params)]
+
+    def record_fetch(self, kind, pages=0):
+        """kind: 'full_fetches', 'incremental_fetches', atau 'skipped_fetches'."""
+        with self._lock:
+            self.counters[kind] += 1
+            self.counters["pages_fetched"] += pages
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters)
+
+_shared_store = None
+_shared_lock = threading.Lock()
+
+def get_review_store():
+    global _shared_store
+    if _shared_store is None:
+        with _shared_lock:
+            if _shared_store is None:
+                _shared_store = ReviewStore()
+    return _shared_store
@@ -1,37 +1,93 @@
+import time
 import requests
 from flask import current_app
 from config import Config
+from .http_client import get_http_client
+from .review_store import get_review_store
+from .rate_limiter import get_rate_limiter
+from ..utils.metrics import track_call
 
 class SearchApiService:
     def __init__(self):
         self.api_key = Config.SEARCHAPI_API_KEY
-        if not self.api_key:
+        if not self.api_key and Config.CASSETTE_MODE != "replay":
             raise ValueError("SEARCHAPI_API_KEY is not set or not loaded correctly from .env file.")
         self.base_url = "https://www.searchapi.io/api/v1/search"
+        self.http = get_http_client()
+        self.limiter = get_rate_limiter()
+        self.review_store = get_review_store() if Config.REVIEW_STORE_ENABLED else None
 
     def get_reviews(self, place_id, max_reviews=None):
+        """
+        Mengembalikan review untuk place_id, urut relevansi (default SearchApi) atau terbaru sesuai
+        Config.REVIEW_SORT_BY. Dengan ReviewStore aktif, review disimpan lokal dan dipakai ulang selama
+        REVIEW_STORE_REFRESH_INTERVAL; dalam mode "newest" refresh hanya mengambil halaman yang lebih baru
+        dari review terbaru yang tersimpan, dalam mode "relevance" refresh mengambil ulang sampelnya.
+        """
         if max_reviews is None:
             max_reviews = Config.DEFAULT_MAX_REVIEWS
+        newest_first = Config.REVIEW_SORT_BY == "newest"
+        if self.review_store is None:
+            reviews, _ = self._fetch_review_pages(place_id, max_reviews, newest_first=newest_first)
+            return reviews[:max_reviews]
+
+        order = "newest" if newest_first else "relevance"
+        last_refreshed = self.review_store.last_refreshed(place_id)
+        if last_refreshed is not None and time.time() - last_refreshed < Config.REVIEW_STORE_REFRESH_INTERVAL:
+            self.review_store.record_fetch("skipped_fetches")
+            return self.review_store.get_reviews(place_id, limit=max_reviews, order=order)
+
+        if not newest_first:
+            reviews, pages = self._fetch_review_pages(place_id, max_reviews)
+            if pages:
+                self.review_store.replace(place_id, reviews)
+            self.review_store.record_fetch("full_fetches", pages)
+            return self.review_store.get_reviews(place_id, limit=max_reviews, order=order)
+
+        newest = self.review_store.newest_timestamp(place_id) if last_refreshed is not None else None
+        reviews, pages = self._fetch_review_pages(place_id, max_reviews, newer_than=newest, newest_first=True)
+        if pages:
+            self.review_store.merge(place_id, reviews)
+        self.review_store.record_fetch("full_fetches" if newest is None else "incremental_fetches", pages)
+        return self.review_store.get_reviews(place_id, limit=max_reviews, order=order)
+
+    def _fetch_review_pages(self, place_id, max_reviews, newer_than=None, newest_first=False):
+        """
+        Paginasi google_maps_reviews (urut relevansi, atau terbaru bila newest_first). Berhenti saat sudah cukup,
+        halaman habis, atau (bila newer_than diberikan, hanya untuk newest_first) bertemu review yang sudah tersimpan.
+        Mengembalikan (reviews, jumlah halaman yang berhasil diambil).
+        """
         all_reviews = []
+        pages = 0
         params = {
             "api_key": self.api_key, "engine": "google_maps_reviews",
             "place_id": place_id, "hl": "en",
         }
+        if newest_first:
+            params["sort_by"] = "newest"
         while len(all_reviews) < max_reviews:
+            self.limiter.acquire("searchapi")
             try:
-                response = requests.get(self.base_url, params=params, timeout=45)
+                with track_call("searchapi", "reviews_page"):
+                    response = self.http.get(self.base_url, params=params, timeout=Config.SEARCHAPI_READ_TIMEOUT)
                 if response.status_code != 200: break
                 data = response.json()
+                pages += 1
                 reviews_on_page = data.get("reviews", [])
                 if not reviews_on_page: break
-                all_reviews.extend(reviews_on_page)
+                if newer_than is not None:
+                    new_reviews = [r for r in reviews_on_page if (r.get("unix_timestamp") or 0) > newer_than]
+                    all_reviews.extend(new_reviews)
+                    if len(new_reviews) < len(reviews_on_page): break
+                else:
+                    all_reviews.extend(reviews_on_page)
                 if "next_page_token" in data.get("pagination", {}):
                     params["next_page_token"] = data["pagination"]["next_page_token"]
                 else: break
             except requests.exceptions.RequestException as e:
                 current_app.logger.error(f"SearchApi.io (get_reviews) failed: {e}")
                 break
-        return all_reviews[:max_reviews]
+        return all_reviews, pages
 
     def get_keyword_match_count(self, place_id, keywords):
         if not keywords or not place_id:
@@ -42,10 +98,12 @@ class SearchApiService:
             "place_id": place_id, "search_query": search_query,
             "hl": "en", "num": Config.SEARCHAPI_NUM_REVIEWS
         }
+        self.limiter.acquire("searchapi")
         try:
-            response = requests.get(self.base_url, params=params, timeout=45)
-            if response.status_code != 200:
-                response.raise_for_status()
+            with track_call("searchapi", "keyword_search"):
+                response = self.http.get(self.base_url, params=params, timeout=Config.SEARCHAPI_READ_TIMEOUT)
+                if response.status_code != 200:
+                    response.raise_for_status()
             data = response.json()
             matching_review_count = len(data.get("reviews", []))
             # --- PERBAIKAN: Kembalikan seluruh objek 'place_result' ---
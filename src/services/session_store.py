@@ -0,0 +1,117 @@
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from config import Config
+from .cache import SqliteStore
+
+class SessionStore(SqliteStore):
+    """
+    Penyimpanan sesi workflow: LRU di memori di depan tabel SQLite (write-through, divalidasi terhadap updated_at).
+    Setiap sesi berisi state workflow dan task 'next' yang masih menunggu (payload dengan referensi $state).
+    SQLite membuat sesi bertahan setelah restart dan bisa dibaca worker lain (mode WAL).
+    """
+    name = "sessions"
+
+    def __init__(self, path=None, ttl=None, memory_entries=None):
+        super().__init__(
+            path or os.path.join(Config.CACHE_DIR, "sessions.sqlite3"),
+            counters=("memory_hits", "store_hits", "misses", "created", "evictions")
+        )
+        self.ttl = Config.SESSION_TTL if ttl is None else ttl
+        self.memory_entries = Config.SESSION_MEMORY_ENTRIES if memory_entries is None else memory_entries
+        self._memory = OrderedDict()
+        self._writes = 0
+        self._conn().execute("""CREATE TABLE IF NOT EXISTS sessions (
+            session_id TEXT PRIMARY KEY, state TEXT NOT NULL, next TEXT, updated_at REAL NOT NULL)""")
+
+    def _remember(self, session_id, session):
+        if self.memory_entries <= 0:
+            return
+        with self._lock:
+            self._memory[session_id] = session
+            self._memory.move_to_end(session_id)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def create(self, state, next_task):
+        """Membuat sesi baru dan mengembalikan sessionId-nya."""
+        session_id = uuid.uuid4().hex
+        self.save(session_id, state, next_task)
+        self._count("created")
+        return session_id
+
+    def load(self, session_id):
+        """
+        {'state': ..., 'next': ...} atau None bila sesi tidak ada / sudah kedaluwarsa.
+        Entri memori hanya dipakai bila updated_at-nya masih sama dengan baris SQLite (dibaca lewat primary key,
+        tanpa decode JSON), karena worker lain bisa sudah memperbarui atau menghapus sesi yang sama.
+        """
+        now = time.time()
+        conn = self._conn()
+        with self._lock:
+            session = self._memory.get(session_id)
+        if session is not None:
+            row = conn.execute("SELECT updated_at FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+            if row is not None and row[0] == session["updated_at"] and now - row[0] <= self.ttl:
+                with self._lock:
+                    if session_id in self._memory:
+                        self._memory.move_to_end(session_id)
+                    self.counters["memory_hits"] += 1
+                return session
+
+        row = conn.execute(
+            "SELECT state, next, updated_at FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        if row is None or now - row[2] > self.ttl:
+            with self._lock:
+                self._memory.pop(session_id, None)
+            self._count("misses")
+            return None
+        session = {"state": json.loads(row[0]), "next": json.loads(row[1]) if row[1] else None, "updated_at": row[2]}
+        self._remember(session_id, session)
+        self._count("store_hits")
+        return session
+
+    def save(self, session_id, state, next_task):
+        session = {"state": state, "next": next_task, "updated_at": time.time()}
+        self._conn().execute(
+            "INSERT OR REPLACE INTO sessions (session_id, state, next, updated_at) VALUES (?, ?, ?, ?)",
+            (session_id, json.dumps(state), json.dumps(next_task) if next_task else None, session["updated_at"])
+        )
+        self._remember(session_id, session)
+        with self._lock:
+            self._writes += 1
+            evict = self._writes % 100 == 0
+        if evict:
+            self.evict()
+
+    def delete(self, session_id):
+        with self._lock:
+            self._memory.pop(session_id, None)
+        self._conn().execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def evict(self):
+        """Menghapus sesi yang sudah melewati TTL."""
+        cursor = self._conn().execute("DELETE FROM sessions WHERE updated_at < ?", (time.time() - self.ttl,))
+        if cursor.rowcount:
+            self._count("evictions", cursor.rowcount)
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self.counters)
+            counters["memory_size"] = len(self._memory)
+        return counters
+
+_shared_store = None
+_shared_lock = threading.Lock()
+
+def get_session_store():
+    global _shared_store
+    if _shared_store is None:
+        with _shared_lock:
+            if _shared_store is None:
+                _shared_store = SessionStore()
+    return _shared_store
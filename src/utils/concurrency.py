@@ -0,0 +1,32 @@
+import contextvars
+import time
+from contextlib import contextmanager
+
+# Batas waktu absolut (time.monotonic) untuk panggilan eksternal di konteks ini, lihat call_deadline
+_deadline = contextvars.ContextVar("call_deadline", default=None)
+
+def submit_with_context(executor, fn, *args, **kwargs):
+    """
+    Submit ke ThreadPoolExecutor dengan menyalin contextvars pemanggil, sehingga
+    `current_app` Flask (dan context lain) tetap tersedia di thread worker.
+    """
+    ctx = contextvars.copy_context()
+    return executor.submit(ctx.run, fn, *args, **kwargs)
+
+@contextmanager
+def call_deadline(seconds):
+    """
+    Panggilan eksternal di dalam blok ini (termasuk thread yang disubmit lewat submit_with_context) harus
+    selesai dalam `seconds` detik: timeout HTTP dipotong ke sisa waktu, retry dan antrean rate limit
+    berhenti setelah deadline (lihat HttpClient dan RateLimiter.acquire).
+    """
+    token = _deadline.set(time.monotonic() + seconds)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+def remaining_time():
+    """Sisa detik sampai deadline aktif, atau None bila tidak ada deadline."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
@@ -4,6 +4,7 @@ class Formatter:
     def _sample_reviews(self, reviews, total_num_for_category):
         """
         Mengambil sampel review berdasarkan JUMLAH TOTAL review di kategori tsb.
+        Review berasal dari ReviewStore lokal (lihat SearchApiService.get_reviews).
         """
         num_to_sample = 0
         rules = Config.REVIEW_SAMPLING_RULES
@@ -0,0 +1,153 @@
+import threading
+import time
+from contextlib import contextmanager
+
+# Batas bucket histogram latensi (detik); SearchApi bisa mencapai timeout 45 detik
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 45, 90)
+
+METRIC_HELP = {
+    "external_call_duration_seconds": "Latency of calls to external APIs per service and operation.",
+    "external_call_errors_total": "Failed external API calls by kind (timeout, rate_limited, error).",
+    "http_responses_total": "HTTP responses from upstream hosts by status code (after retries).",
+    "http_request_errors_total": "HTTP requests to upstream hosts that raised (timeout, connection, error).",
+    "workflow_step_duration_seconds": "Duration of Workflow steps.",
+    "workflow_step_errors_total": "Workflow steps that raised an exception.",
+    "llm_tokens_total": "OpenAI token usage by model and kind (prompt, completion).",
+    "rate_limit_wait_seconds": "Time callers waited in the shared rate limit queue per provider.",
+    "adaptive_concurrency_limit": "Current adaptive (AIMD) concurrency limit per upstream in this worker.",
+    "adaptive_concurrency_inflight": "Calls currently in flight per upstream in this worker.",
+    "adaptive_concurrency_wait_seconds": "Time callers waited for an adaptive concurrency slot per upstream.",
+    "adaptive_concurrency_decreases_total": "Adaptive concurrency limit decreases by upstream and reason (rate_limited, timeout, latency).",
+    "adaptive_concurrency_deadline_exceeded_total": "Callers whose call deadline expired while waiting for an adaptive concurrency slot.",
+    "rate_limit_tokens": "Tokens currently available in the shared rate limit bucket (negative = queued callers).",
+}
+
+def _labels_key(labels):
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (key + '="' + value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"' for key, value in pairs)
+    return "{" + ",".join(escaped) + "}"
+
+class Metrics:
+    """
+    Registry metrik per proses (counter, gauge, histogram) dengan output format teks Prometheus.
+    Collector dipanggil saat render untuk metrik yang dibaca dari sumber lain (stats cache, pool HTTP).
+    """
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._gauges = {}
+        self._histograms = {}
+        self._collectors = []
+
+    def inc(self, name, value=1, **labels):
+        key = (name, _labels_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set_gauge(self, name, value, **labels):
+        with self._lock:
+            self._gauges[(name, _labels_key(labels))] = value
+
+    def observe(self, name, value, **labels):
+        key = (name, _labels_key(labels))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    hist["buckets"][i] += 1
+                    break
+            hist["sum"] += value
+            hist["count"] += 1
+
+    def add_collector(self, collector):
+        """collector() -> iterable (name, type, labels dict, value); dipanggil setiap render."""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self):
+        with self._lock:
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+            histograms = {key: {"buckets": list(h["buckets"]), "sum": h["sum"], "count": h["count"]} for key, h in self._histograms.items()}
+            collectors = list(self._collectors)
+
+        samples = {}  # name -> (type, [(labels, value)])
+        for (name, labels), value in counters.items():
+            samples.setdefault(name, ("counter", []))[1].append((labels, value))
+        for (name, labels), value in gauges.items():
+            samples.setdefault(name, ("gauge", []))[1].append((labels, value))
+        for collector in collectors:
+            for name, metric_type, labels, value in collector():
+                samples.setdefault(name, (metric_type, []))[1].append((_labels_key(labels), value))
+
+        lines = []
+        for name in sorted(samples):
+            metric_type, values = samples[name]
+            self._header(lines, name, metric_type)
+            for labels, value in values:
+                lines.append(f"{name}{_format_labels(labels)} {value}")
+
+        for name in sorted({name for name, _ in histograms}):
+            self._header(lines, name, "histogram")
+            for (hist_name, labels), hist in histograms.items():
+                if hist_name != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip(self.buckets, hist["buckets"]):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_format_labels(labels, [('le', str(bound))])} {cumulative}")
+                lines.append(f"{name}_bucket{_format_labels(labels, [('le', '+Inf')])} {hist['count']}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {hist['sum']}")
+                lines.append(f"{name}_count{_format_labels(labels)} {hist['count']}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _header(lines, name, metric_type):
+        help_text = METRIC_HELP.get(name)
+        if help_text:
+            lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {metric_type}")
+
+metrics = Metrics()
+
+def error_kind(exc):
+    """Klasifikasi error untuk label 'kind': timeout, rate_limited, atau error."""
+    name = type(exc).__name__
+    status = getattr(getattr(exc, "response", None), "status_code", None) or getattr(exc, "status_code", None)
+    if "Timeout" in name:
+        return "timeout"
+    if status == 429 or name == "RateLimitError":
+        return "rate_limited"
+    return "error"
+
+@contextmanager
+def track_call(service, operation):
+    """Mencatat latensi dan error satu panggilan API eksternal (bisa juga dipakai sebagai decorator)."""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        metrics.inc("external_call_errors_total", service=service, operation=operation, kind=error_kind(e))
+        raise
+    finally:
+        metrics.observe("external_call_duration_seconds", time.perf_counter() - start, service=service, operation=operation)
+
+@contextmanager
+def track_step(step):
+    """Mencatat durasi dan error satu langkah Workflow."""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        metrics.inc("workflow_step_errors_total", step=step)
+        raise
+    finally:
+        metrics.observe("workflow_step_duration_seconds", time.perf_counter() - start, step=step)
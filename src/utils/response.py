@@ -1,4 +1,5 @@
-from flask import jsonify
+import json
+from flask import jsonify, Response, stream_with_context
 
 def api_response(data, status_code=200):
     """Membuat respons JSON standar."""
@@ -11,4 +12,14 @@ def error_response(message, status_code=400):
     return jsonify({
         "state": None, "result": None, "next": None,
         "done": True, "error": message
-    }), status_code
\ No newline at end of file
+    }), status_code
+
+def stream_response(events, fmt="ndjson"):
+    """Streaming event sebagai NDJSON (satu JSON per baris) atau server-sent events (fmt='sse')."""
+    if fmt == "sse":
+        body = (f"event: {event['type']}\ndata: {json.dumps(event)}\n\n" for event in events)
+        mimetype = "text/event-stream"
+    else:
+        body = (json.dumps(event) + "\n" for event in events)
+        mimetype = "application/x-ndjson"
+    return Response(stream_with_context(body), mimetype=mimetype, headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
@@ -0,0 +1,29 @@
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# Semua store SQLite (cache, review store, rate limiter) ditulis ke direktori sementara; rate limit global
+# dimatikan agar tes tidak menunggu token, budget per run tetap berlaku
+os.environ["CACHE_DIR"] = tempfile.mkdtemp(prefix="tests-cache-")
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+
+import pytest
+from benchmarks.stubs import StubBackend
+
+@pytest.fixture
+def stub_backend():
+    """Backend stub tanpa latensi (Google Places, searchapi.io, OpenAI) yang terpasang selama satu tes."""
+    backend = StubBackend(latency="zero", page_token_delay=0).install()
+    yield backend
+    backend.uninstall()
+
+@pytest.fixture
+def workflow(stub_backend):
+    from src.core.workflow import Workflow
+    instance = Workflow()
+    yield instance
+    instance.close()
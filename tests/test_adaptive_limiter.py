@@ -0,0 +1,117 @@
+from contextlib import ExitStack
+import threading
+import time
+import pytest
+import requests
+from src.services.adaptive_limiter import AdaptiveLimiter
+from src.utils.concurrency import call_deadline
+
+class ReadTimeout(Exception):
+    """Dinamai seperti requests.ReadTimeout (klasifikasi error lewat nama kelas)."""
+
+def limiter(initial=4, min_limit=1, max_limit=8, tolerance=1e6):
+    # Latensi slot kosong di tes hanya jitter mikrodetik; tolerance besar agar tidak terbaca sebagai lonjakan
+    return AdaptiveLimiter("test", initial, min_limit, max_limit, backoff=0.5, tolerance=tolerance)
+
+def saturate(adaptive):
+    """Mengisi semua slot lalu melepasnya (semua panggilan sukses)."""
+    with ExitStack() as stack:
+        for _ in range(int(adaptive.limit)):
+            stack.enter_context(adaptive.slot())
+
+def test_limit_grows_additively_while_saturated():
+    adaptive = limiter()
+    saturate(adaptive)
+    assert adaptive.limit == pytest.approx(4.25)
+    for _ in range(8):
+        saturate(adaptive)
+    assert 5 <= adaptive.limit < 6
+
+def test_limit_does_not_grow_when_not_saturated():
+    adaptive = limiter()
+    for _ in range(20):
+        with adaptive.slot():
+            pass
+    assert adaptive.limit == 4
+
+def test_limit_is_capped_at_max():
+    adaptive = limiter(initial=8, max_limit=8)
+    for _ in range(5):
+        saturate(adaptive)
+    assert adaptive.limit == 8
+
+def test_overload_response_halves_the_limit():
+    adaptive = limiter()
+    with adaptive.slot() as slot:
+        slot.overloaded = True
+    assert adaptive.limit == 2
+    assert adaptive.inflight == 0
+
+def test_timeout_decreases_the_limit_and_is_reraised():
+    adaptive = limiter()
+    with pytest.raises(ReadTimeout):
+        with adaptive.slot():
+            raise ReadTimeout()
+    assert adaptive.limit == 2
+
+def test_other_errors_do_not_decrease_the_limit():
+    adaptive = limiter()
+    with pytest.raises(ValueError):
+        with adaptive.slot():
+            raise ValueError()
+    assert adaptive.limit == 4
+
+def test_limit_never_drops_below_min():
+    adaptive = limiter(initial=2, min_limit=1)
+    adaptive.baseline, adaptive.samples = 0.0, 10
+    for _ in range(5):
+        adaptive._last_decrease = 0.0
+        with adaptive.slot() as slot:
+            slot.overloaded = True
+    assert adaptive.limit == 1
+
+def test_latency_spike_decreases_once_per_baseline_window():
+    adaptive = limiter(tolerance=2.0)
+    adaptive.inflight = 1
+    for _ in range(10):
+        adaptive.inflight += 1
+        adaptive._release(0.01, None)
+    adaptive.baseline = 10.0  # jendela cooldown panjang: lonjakan kedua dalam jendela yang sama diabaikan
+    adaptive._last_decrease = 0.0
+    adaptive._release(25.0, None)
+    assert adaptive.limit == 2
+    adaptive.inflight += 1
+    adaptive._release(25.0 * 2, None)
+    assert adaptive.limit == 2
+
+def test_callers_wait_for_a_free_slot():
+    adaptive = limiter(initial=1, max_limit=1)
+    entered = threading.Event()
+    release = threading.Event()
+
+    def hold():
+        with adaptive.slot():
+            entered.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=hold)
+    thread.start()
+    entered.wait(5)
+    started = time.monotonic()
+    threading.Timer(0.2, release.set).start()
+    with adaptive.slot():
+        waited = time.monotonic() - started
+    thread.join()
+    assert waited >= 0.15
+    assert adaptive.inflight == 0
+
+def test_waiting_for_a_slot_is_bounded_by_the_call_deadline():
+    adaptive = limiter(initial=1, max_limit=1)
+    with adaptive.slot():
+        started = time.monotonic()
+        with call_deadline(0.2), pytest.raises(requests.Timeout):
+            with adaptive.slot():
+                pass
+        assert 0.15 <= time.monotonic() - started < 2
+    # Upstream tidak pernah dipanggil: limit tidak turun dan slot tidak bocor
+    assert adaptive.limit == 1 and adaptive.inflight == 0
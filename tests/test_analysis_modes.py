@@ -0,0 +1,76 @@
+import json
+from src.services.openai_client import OpenAIService
+
+DETAILS = {"placeName": "Kopi Tunjungan", "rating": 4.6, "totalRatings": 320,
+           "positiveReviews": ["Kopinya enak"], "negativeReviews": ["Antrean panjang"]}
+ANALYSIS = {"positiveSummary": "Kopi enak.", "negativeSummary": "Antrean panjang.",
+            "strengths": ["kopi"], "weaknesses": ["antrean"]}
+
+class FakeCompletions:
+    """Pengganti _call_api: respons JSON mode diambil berurutan dari json_responses."""
+    def __init__(self, json_responses):
+        self.json_responses = list(json_responses)
+        self.prompts = []
+
+    def __call__(self, messages, json_mode=False, use_cache=None, validate=None):
+        self.prompts.append(messages[0]["content"])
+        if not json_mode:
+            return "Ringkasan."
+        return self.json_responses.pop(0)
+
+def service_with(monkeypatch, *json_responses):
+    service = OpenAIService(use_cache=False)
+    fake = FakeCompletions(json_responses)
+    monkeypatch.setattr(service, "_call_api", fake)
+    return service, fake
+
+def test_single_mode_uses_one_completion(monkeypatch):
+    service, fake = service_with(monkeypatch, json.dumps(ANALYSIS))
+    insights, positive, negative = service.generate_insights(DETAILS, 80, mode="single")
+    assert len(fake.prompts) == 1
+    assert insights == {"strengths": ["kopi"], "weaknesses": ["antrean"]}
+    assert (positive, negative) == ("Kopi enak.", "Antrean panjang.")
+
+def test_single_mode_clears_summary_without_reviews(monkeypatch):
+    service, _ = service_with(monkeypatch, json.dumps(ANALYSIS))
+    _, _, negative = service.generate_insights({**DETAILS, "negativeReviews": []}, 80, mode="single")
+    assert negative == ""
+
+def test_single_mode_falls_back_to_standard_on_invalid_schema(monkeypatch):
+    invalid = json.dumps({**ANALYSIS, "strengths": "kopi"})
+    service, fake = service_with(monkeypatch, invalid, json.dumps({"strengths": ["a"], "weaknesses": ["b"]}))
+    insights, positive, negative = service.generate_insights(DETAILS, 80, mode="single")
+    # 1 completion single yang gagal + 3 completion mode standard
+    assert len(fake.prompts) == 4
+    assert insights == {"strengths": ["a"], "weaknesses": ["b"]}
+    assert (positive, negative) == ("Ringkasan.", "Ringkasan.")
+
+def items(count, reviews=1):
+    details = {**DETAILS, "positiveReviews": ["Kopinya enak sekali"] * reviews}
+    return [(f"place-{n}", details, 80) for n in range(count)]
+
+def test_split_batches_respects_place_and_token_limits(monkeypatch):
+    from config import Config
+    service = OpenAIService(use_cache=False)
+    monkeypatch.setattr(Config, "LLM_BATCH_MAX_PLACES", 2)
+    monkeypatch.setattr(Config, "LLM_BATCH_TOKEN_BUDGET", 10_000)
+    batches, oversized = service.split_batches(items(5))
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert oversized == []
+
+    monkeypatch.setattr(Config, "LLM_BATCH_MAX_PLACES", 10)
+    _, details, match_percentage = items(1)[0]
+    monkeypatch.setattr(Config, "LLM_BATCH_TOKEN_BUDGET", service.estimate_tokens(service._place_block(details, match_percentage)) * 2)
+    big = items(1, reviews=50)
+    batches, oversized = service.split_batches(items(3) + big)
+    assert [len(batch) for batch in batches] == [2, 1]
+    assert oversized == big
+
+def test_batch_retries_missing_places_one_by_one(monkeypatch):
+    response = json.dumps({"results": {"place-0": ANALYSIS}})
+    service, fake = service_with(monkeypatch, response, json.dumps(ANALYSIS))
+    results = service.generate_insights_batch(items(2))
+    assert set(results) == {"place-0", "place-1"}
+    assert results["place-1"][0] == {"strengths": ["kopi"], "weaknesses": ["antrean"]}
+    # 1 completion batch + 1 completion single untuk place-1
+    assert len(fake.prompts) == 2
@@ -0,0 +1,36 @@
+import json
+import os
+import pytest
+from app import create_app
+from src.api import routes
+from src.core.session import WorkflowSessions
+
+@pytest.fixture
+def client(workflow, monkeypatch):
+    # Dispatcher route memakai Workflow dari fixture (backend stub) alih-alih singleton per proses
+    monkeypatch.setattr(routes, "_sessions", WorkflowSessions(workflow))
+    monkeypatch.setattr(routes, "_sessions_pid", os.getpid())
+    return create_app().test_client()
+
+RUN_PARAMS = {"business_type": "restoran", "location": "Surabaya", "numberOfLeads": 2, "batchSize": 1}
+
+def test_run_streams_leads_as_ndjson(client):
+    response = client.post("/task/run", json=RUN_PARAMS)
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    events = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [event["type"] for event in events] == ["lead", "lead", "done"]
+    assert [event["index"] for event in events[:2]] == [1, 2]
+    assert events[-1]["leadCount"] == 2 and events[-1]["error"] is None
+
+def test_run_streams_server_sent_events(client):
+    response = client.post("/task/run?format=sse", json={**RUN_PARAMS, "numberOfLeads": 1})
+    assert response.mimetype == "text/event-stream"
+    body = response.get_data(as_text=True)
+    assert body.startswith("event: lead\ndata: ")
+    assert "event: done\n" in body
+
+def test_run_rejects_invalid_payload_before_streaming(client):
+    response = client.post("/task/run", json={"business_type": "restoran"})
+    assert response.status_code == 400
+    assert "location" in response.get_json()["error"]
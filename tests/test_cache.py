@@ -0,0 +1,75 @@
+import time
+import pytest
+from src.services import cache as cache_module
+from src.services.cache import SqliteCache
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module.time, "time", clock)
+    return clock
+
+@pytest.fixture
+def store(tmp_path):
+    return SqliteCache("place_details", path=str(tmp_path / "cache.sqlite3"), ttl=100, stale_ttl=50)
+
+def test_fresh_entry_is_a_hit(store, clock):
+    store.set("a", {"name": "A"})
+    clock.now += 99
+    assert store.get("a") == {"name": "A"}
+    assert store.stats()["hits"] == 1
+
+def test_stale_entry_is_not_served_by_get(store, clock):
+    store.set("a", {"name": "A"})
+    clock.now += 120
+    assert store.lookup("a") == ({"name": "A"}, "stale")
+    assert store.get("a") is None
+
+def test_expired_entry_is_deleted(store, clock):
+    store.set("a", {"name": "A"})
+    clock.now += 151
+    assert store.lookup("a") == (None, None)
+    assert store.size() == 0
+
+def test_get_or_fetch_serves_stale_value_and_refreshes_in_background(store, clock):
+    store.set("a", {"version": 1})
+    clock.now += 120
+    assert store.get_or_fetch("a", lambda: {"version": 2}) == {"version": 1}
+    deadline = time.monotonic() + 5
+    while store.stats()["refreshes"] == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert store.lookup("a") == ({"version": 2}, "fresh")
+    assert store.stats()["stale_hits"] == 1
+
+def test_get_or_fetch_does_not_store_empty_results(store, clock):
+    assert store.get_or_fetch("missing", lambda: None) is None
+    assert store.size() == 0
+
+def test_evict_drops_expired_then_least_recently_used(tmp_path, clock):
+    store = SqliteCache("llm_responses", path=str(tmp_path / "cache.sqlite3"), ttl=100, max_entries=2)
+    store.set("old", 1)
+    clock.now += 101
+    for key in ("a", "b", "c"):
+        store.set(key, key)
+        clock.now += 1
+    store.get("a")
+    assert store.evict() == 2
+    assert store.get("old") is None and store.get("b") is None
+    assert store.get("a") == "a" and store.get("c") == "c"
+
+def test_place_details_are_served_from_cache(stub_backend):
+    from src.services.gmaps import GmapsService
+    place_id = stub_backend.places[0]["place_id"]
+    gmaps = GmapsService()
+    first = gmaps.get_place_details(place_id)
+    # Cache dipakai bersama seluruh sesi tes, jadi tempat ini bisa saja sudah di-cache tes lain
+    calls = stub_backend.calls.get("gmaps.place_details", 0)
+    assert first and gmaps.get_place_details(place_id) == first
+    assert stub_backend.calls.get("gmaps.place_details", 0) == calls
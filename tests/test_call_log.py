@@ -0,0 +1,46 @@
+import json
+import time
+import pytest
+from src.client.call_log import CallLogger
+
+@pytest.fixture
+def read_log(tmp_path):
+    """Membuat CallLogger di file sementara; read() menunggu antrean listener kosong lalu mengembalikan baris JSON-nya."""
+    path = str(tmp_path / "calls.jsonl")
+    def make(**kwargs):
+        logger = CallLogger(path=path, **kwargs)
+        def read():
+            listener = CallLogger._listeners[path]
+            listener.stop()  # stop() memproses semua record yang masih di antrean
+            listener.start()
+            with open(path, encoding="utf-8") as f:
+                return [json.loads(line) for line in f]
+        return logger, read
+    return make
+
+def test_records_metadata_only_with_capture_none(read_log):
+    logger, read = read_log(capture="none")
+    request = {"state": {"leadCount": 0, "remainingPlaceIds": ["a", "b"]}}
+    logger.record("run", "control", time.perf_counter(), request, {"done": False})
+    # Executor mengubah state setelah pencatatan; log tetap berisi snapshot saat panggilan
+    request["state"]["remainingPlaceIds"].pop(0)
+    request["state"]["leadCount"] = 1
+    [entry] = read()
+    assert entry["reqBytes"] == len('{"state":{"leadCount":0,"remainingPlaceIds":["a","b"]}}')
+    assert entry["respBytes"] == len('{"done":false}')
+    assert entry["ok"] is True and "request" not in entry and "response" not in entry
+
+def test_errors_always_include_truncated_bodies(read_log):
+    logger, read = read_log(capture="none", truncate=5)
+    logger.record("run", "scrape", time.perf_counter(), {"placeId": "abcdef"}, {"error": "boom"},
+                  error=RuntimeError("API call failed"), status_code=500)
+    [entry] = read()
+    assert (entry["ok"], entry["error"], entry["status"]) == (False, "API call failed", 500)
+    assert entry["request"] == '{"pla' and entry["response"] == '{"err'
+
+def test_full_capture_embeds_bodies_as_json(read_log):
+    logger, read = read_log(capture="full")
+    logger.record("run", "analyze", time.perf_counter(), {"placeId": "a"}, {"result": {"matchPercentage": 80}})
+    [entry] = read()
+    assert entry["request"] == {"placeId": "a"}
+    assert entry["response"] == {"result": {"matchPercentage": 80}}
@@ -0,0 +1,66 @@
+from types import SimpleNamespace
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+from src.services.cassette import Cassette, CassetteAdapter, http_key
+
+class CountingAdapter(BaseAdapter):
+    """Upstream palsu: body berisi nomor panggilan."""
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def send(self, request, **kwargs):
+        self.calls += 1
+        response = requests.Response()
+        response.status_code = 200
+        response._content = f'{{"call": {self.calls}}}'.encode()
+        response.headers["Content-Type"] = "application/json"
+        response.url, response.request = request.url, request
+        return response
+
+    def close(self):
+        pass
+
+def session_for(cassette, upstream=None):
+    session = requests.Session()
+    session.mount("https://", CassetteAdapter(cassette, upstream or CountingAdapter()))
+    return session
+
+URL = "https://maps.googleapis.com/maps/api/place/details/json"
+
+def test_http_key_drops_secrets_and_sorts_params():
+    assert http_key("GET", f"{URL}?place_id=p&key=secret&fields=a") == f"GET {URL}?fields=a&place_id=p"
+
+def test_recorded_responses_replay_in_order(tmp_path):
+    path = str(tmp_path / "run.jsonl.gz")
+    recorder = Cassette(path, "record")
+    session = session_for(recorder)
+    for _ in range(2):
+        session.get(URL, params={"place_id": "p", "key": "secret"})
+    recorder.close()
+
+    upstream = CountingAdapter()
+    session = session_for(Cassette(path, "replay", latency_scale=0), upstream)
+    # Key tidak bergantung pada secret: replay dengan key lain tetap cocok
+    bodies = [session.get(URL, params={"place_id": "p", "key": "other"}).json() for _ in range(3)]
+    assert bodies == [{"call": 1}, {"call": 2}, {"call": 2}]
+    assert upstream.calls == 0
+    with pytest.raises(requests.exceptions.ConnectionError, match="No cassette entry"):
+        session.get(URL, params={"place_id": "unknown"})
+
+def test_openai_completions_replay_content_and_usage(tmp_path):
+    path = str(tmp_path / "run.jsonl.gz")
+    completion = SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content="Ringkasan."))],
+        usage=SimpleNamespace(prompt_tokens=10, completion_tokens=3, total_tokens=13)
+    )
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=lambda **params: completion)))
+    chat_params = {"model": "m", "messages": [{"role": "user", "content": "hai"}]}
+    recorder = Cassette(path, "record")
+    recorder.chat_completion(client, chat_params)
+    recorder.close()
+
+    replayed = Cassette(path, "replay", latency_scale=0).chat_completion(None, dict(reversed(list(chat_params.items()))))
+    assert replayed.choices[0].message.content == "Ringkasan."
+    assert replayed.usage.total_tokens == 13
@@ -0,0 +1,85 @@
+import asyncio
+import json
+import threading
+import pytest
+import WorkflowExecutor as workflow_executor
+from AsyncWorkflowExecutor import AsyncWorkflowExecutor
+from WorkflowExecutor import WorkflowExecutor
+from src.client.transport import TransportError
+
+class ScriptedTransport:
+    """Transport palsu: search selalu mengembalikan placeId baru, scrape menjawab lewat fungsi `scrape`."""
+    def __init__(self, scrape, max_searches=50):
+        self.scrape = scrape
+        self.max_searches = max_searches
+        self.calls = {}
+        self.lock = threading.Lock()
+
+    def call(self, task_key, payload):
+        with self.lock:
+            count = self.calls[task_key] = self.calls.get(task_key, 0) + 1
+        if task_key == "input":
+            return {"state": {"numberOfLeads": 5, "leadCount": 0, "remainingPlaceIds": []},
+                    "next": {"key": "search", "payload": {}}, "done": False}
+        if task_key == "search":
+            if count > self.max_searches:
+                return {"state": None, "next": None, "done": True, "error": "No new businesses matching the constraints found."}
+            return {"state": {}, "next": {"key": "scrape", "payload": {"placeId": f"place-{count}"}}, "done": False}
+        return self.scrape(payload)
+
+@pytest.fixture(autouse=True)
+def executor_env(tmp_path, monkeypatch):
+    monkeypatch.setenv("EXECUTOR_LOG_FILE", str(tmp_path / "calls.jsonl"))
+    monkeypatch.setenv("CHECKPOINT_DIR", str(tmp_path / "checkpoints"))
+
+def test_async_executor_stops_when_a_step_ends_the_run():
+    exhausted = {"state": None, "next": None, "result": None, "done": True, "error": "Run budget exhausted: searchapi"}
+    transport = ScriptedTransport(lambda payload: exhausted)
+    executor = AsyncWorkflowExecutor(concurrency=3, transport=transport)
+    asyncio.run(executor.run({"business_type": "restoran", "location": "Surabaya", "numberOfLeads": 5}))
+    # Hanya pipeline yang sudah berjalan saat budget habis yang sempat memanggil scrape
+    assert transport.calls["scrape"] <= 3
+    assert transport.calls["search"] <= 3
+    assert executor.storage["$results"] == []
+
+def test_concurrent_state_is_merged_as_deltas():
+    executor = AsyncWorkflowExecutor(concurrency=2, transport=ScriptedTransport(lambda payload: {}))
+    executor.storage["$state"] = {"leadCount": 1, "skippedCount": 4, "skippedReasons": {"keywords": 2}, "nextPageToken": "a"}
+    # Pipeline lain sudah menambah counter setelah payload ini dikirim
+    sent = {"leadCount": 0, "skippedCount": 3, "skippedReasons": {"keywords": 1}}
+    executor._merge_concurrent({"leadCount": 1, "skippedCount": 4, "skippedReasons": {"keywords": 2, "min_rating": 1}, "nextPageToken": "b"}, sent)
+    assert executor.storage["$state"] == {"leadCount": 2, "skippedCount": 5, "skippedReasons": {"keywords": 3, "min_rating": 1}, "nextPageToken": "b"}
+
+class LeadTransport:
+    """analyze -> control sampai 3 lead; analyze untuk lead ke-`fail_at` gagal seperti worker yang mati."""
+    def __init__(self, fail_at=None):
+        self.fail_at = fail_at
+
+    def call(self, task_key, payload):
+        lead_count = payload["leadCount"]
+        if task_key == "control":
+            if lead_count >= 3:
+                return {"state": None, "next": None, "result": None, "done": True}
+            return {"state": None, "next": {"key": "analyze", "payload": {"leadCount": "$state.leadCount"}}, "result": None, "done": False}
+        if lead_count == self.fail_at:
+            raise TransportError("API call to [analyze] FAILED", 500, {"error": "boom"})
+        return {"state": {"leadCount": lead_count + 1}, "result": {"placeId": f"place-{lead_count}"},
+                "next": {"key": "control", "payload": {"leadCount": "$state.leadCount"}}, "done": False}
+
+def test_resume_continues_from_checkpoint_without_repeating_leads(monkeypatch):
+    executor = WorkflowExecutor(transport=LeadTransport(fail_at=2))
+    executor.storage["$state"] = {"leadCount": 0}
+    executor.execute_task("analyze", {"leadCount": "$state.leadCount"})
+    run_id = executor.storage["$id"]
+    with open(executor._checkpoint_path(run_id), encoding="utf-8") as f:
+        checkpoint = json.load(f)
+    # Checkpoint hanya berisi state; hasil ada di log results
+    assert "$results" not in checkpoint["storage"] and checkpoint["resultsCount"] == 2
+    # Baris yang tertulis setelah checkpoint terakhir diabaikan saat resume
+    with open(executor._results_path(run_id), "a", encoding="utf-8") as f:
+        f.write(json.dumps({"placeId": "uncheckpointed"}) + "\n")
+
+    monkeypatch.setattr(workflow_executor, "create_transport", lambda: LeadTransport())
+    resumed = WorkflowExecutor.resume(run_id)
+    assert [r["placeId"] for r in resumed.storage["$results"]] == ["place-0", "place-1", "place-2"]
+    assert resumed._load_results(run_id, 10) == resumed.storage["$results"]
@@ -0,0 +1,24 @@
+import pytest
+from src.services.rate_limiter import BudgetExceeded, RateLimitTimeout
+
+@pytest.fixture
+def finder(workflow):
+    return workflow.finder
+
+def fail_with(error):
+    def fetch(*args, **kwargs):
+        raise error
+    return fetch
+
+def test_failed_source_falls_back_to_partial_result(finder, stub_backend, monkeypatch):
+    monkeypatch.setattr(finder.searchapi, "get_reviews", fail_with(RuntimeError("upstream 500")))
+    place_id = stub_backend.places[0]["place_id"]
+    details, reviews, keywords = finder._fetch_concurrent(place_id, "")
+    assert details["place_id"] == place_id
+    assert reviews == []
+
+@pytest.mark.parametrize("error", [BudgetExceeded("Run budget for searchapi exhausted (2)"), RateLimitTimeout("searchapi")])
+def test_budget_and_rate_limit_errors_are_not_swallowed(finder, stub_backend, monkeypatch, error):
+    monkeypatch.setattr(finder.searchapi, "get_reviews", fail_with(error))
+    with pytest.raises(type(error)):
+        finder._fetch_concurrent(stub_backend.places[0]["place_id"], "")
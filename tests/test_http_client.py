@@ -0,0 +1,45 @@
+import http.server
+import threading
+import pytest
+from src.services.http_client import HttpClient
+
+class OkHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def servers():
+    started = [http.server.ThreadingHTTPServer(("127.0.0.1", 0), OkHandler) for _ in range(2)]
+    for server in started:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield [server.server_address[1] for server in started]
+    for server in started:
+        server.shutdown()
+        server.server_close()
+
+def test_stats_count_reused_connections_per_host_and_port(servers):
+    client = HttpClient()
+    for _ in range(3):
+        client.get(f"http://127.0.0.1:{servers[0]}/")
+    client.get(f"http://127.0.0.1:{servers[1]}/")
+    stats = client.stats()
+    assert stats["hosts"][f"http://127.0.0.1:{servers[0]}"] == {"requests": 3, "hits": 2, "misses": 1}
+    assert stats["hosts"][f"http://127.0.0.1:{servers[1]}"] == {"requests": 1, "hits": 0, "misses": 1}
+    assert (stats["hits"], stats["misses"]) == (2, 2)
+    client.close()
+
+def test_searchapi_requests_do_not_retry_read_timeouts():
+    client = HttpClient()
+    adapter = client.session.get_adapter("https://www.searchapi.io/api/v1/search")
+    assert adapter is client.no_read_retry_adapter
+    assert adapter.max_retries.read == 0
+    assert client.session.get_adapter("https://maps.googleapis.com/maps/api/place/details/json").max_retries.read > 0
+    client.close()
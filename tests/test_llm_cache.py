@@ -0,0 +1,24 @@
+from src.services.openai_client import OpenAIService, llm_cache_key
+
+def test_cache_key_ignores_parameter_order():
+    messages = [{"role": "user", "content": "hai"}]
+    assert llm_cache_key({"model": "m", "messages": messages}) == llm_cache_key({"messages": messages, "model": "m"})
+    assert llm_cache_key({"model": "m", "messages": messages}) != llm_cache_key({"model": "other", "messages": messages})
+
+def test_llm_completions_are_cached_by_content(stub_backend):
+    service = OpenAIService()
+    messages = [{"role": "user", "content": "Summarize: tempatnya nyaman"}]
+    first = service._call_api(messages)
+    calls = stub_backend.calls.get("openai.chat_completion", 0)
+    assert service._call_api(messages) == first
+    assert stub_backend.calls["openai.chat_completion"] == calls
+    service._call_api(messages, use_cache=False)
+    assert stub_backend.calls["openai.chat_completion"] == calls + 1
+
+def test_invalid_json_responses_are_not_cached(stub_backend):
+    service = OpenAIService()
+    messages = [{"role": "user", "content": "Plain text please (json mode)"}]
+    service._call_api(messages, validate=lambda content: False)
+    calls = stub_backend.calls["openai.chat_completion"]
+    service._call_api(messages, validate=lambda content: False)
+    assert stub_backend.calls["openai.chat_completion"] == calls + 1
@@ -0,0 +1,79 @@
+import pytest
+from src.services.rate_limiter import RateLimiter, BudgetExceeded, RateLimitTimeout, current_run, run_scope
+
+@pytest.fixture
+def limiter(tmp_path):
+    return RateLimiter(path=str(tmp_path / "rate_limits.sqlite3"), limits={}, max_wait=1)
+
+@pytest.fixture
+def run(limiter):
+    limiter.start_run("run-1", {"searchapi": 2, "openai_tokens": 100, "gmaps": 0})
+    token = current_run.set("run-1")
+    yield "run-1"
+    current_run.reset(token)
+
+def test_budget_is_exhausted_after_limit_is_used(limiter, run):
+    limiter.acquire("searchapi")
+    limiter.acquire("searchapi")
+    assert limiter.exhausted(run) == ["searchapi"]
+    with pytest.raises(BudgetExceeded):
+        limiter.acquire("searchapi")
+    assert limiter.usage(run) == {"searchapi": 2}
+    assert limiter.stats()["budget_exceeded"] == 1
+
+def test_providers_without_budget_are_unlimited(limiter, run):
+    for _ in range(5):
+        limiter.acquire("gmaps")
+    assert limiter.exhausted(run) == []
+    assert "gmaps" not in limiter.usage(run)
+
+def test_token_budget_uses_corrected_usage(limiter, run):
+    limiter.acquire("openai_tokens", 80)
+    limiter.charge("openai_tokens", -30)
+    assert limiter.exhausted(run) == []
+    limiter.acquire("openai_tokens", 50)
+    assert limiter.exhausted(run) == ["openai_tokens"]
+
+def test_budget_applies_only_to_its_run(limiter, run):
+    limiter.acquire("searchapi")
+    limiter.acquire("searchapi")
+    limiter.start_run("other-run", {"searchapi": 5})
+    token = current_run.set("other-run")
+    try:
+        limiter.acquire("searchapi")
+    finally:
+        current_run.reset(token)
+    # Pemakaian run lain tidak menambah counter run-1 (dan sebaliknya)
+    assert limiter.usage(run) == {"searchapi": 2}
+    assert limiter.usage("other-run") == {"searchapi": 1}
+    assert limiter.exhausted("other-run") == []
+
+def test_queue_longer_than_max_wait_is_rejected(tmp_path):
+    limiter = RateLimiter(path=str(tmp_path / "rate_limits.sqlite3"), limits={"gmaps": (0.5, 1)}, max_wait=1)
+    limiter.acquire("gmaps")
+    with pytest.raises(RateLimitTimeout):
+        limiter.acquire("gmaps")
+
+def test_run_scope_ends_the_workflow_when_budget_is_exhausted(limiter):
+    limiter.start_run("run-2", {"searchapi": 1})
+
+    class Step:
+        @run_scope
+        def scrape(self, params):
+            limiter.acquire("searchapi")
+            limiter.acquire("searchapi")
+
+    response = Step().scrape({"runId": "run-2"})
+    assert response["done"] is True and "searchapi" in response["error"]
+    assert current_run.get() is None
+
+def test_control_stops_exhausted_run(workflow):
+    workflow.limiter.start_run("run-3", {"searchapi": 1})
+    token = current_run.set("run-3")
+    try:
+        workflow.limiter.acquire("searchapi")
+    finally:
+        current_run.reset(token)
+    response = workflow.control({"leadCount": 0, "numberOfLeads": 5, "runId": "run-3", "remainingPlaceIds": ["a"]})
+    assert response["done"] is True
+    assert response["error"] == "Run budget exhausted: searchapi"
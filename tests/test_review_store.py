@@ -0,0 +1,48 @@
+import pytest
+from flask import Flask
+from config import Config
+from src.services.review_store import ReviewStore
+from src.services.searchapi import SearchApiService
+
+@pytest.fixture
+def store(tmp_path):
+    return ReviewStore(path=str(tmp_path / "reviews.sqlite3"))
+
+@pytest.fixture
+def service(stub_backend, store):
+    with Flask(__name__).app_context():
+        service = SearchApiService()
+        service.review_store = store
+        yield service
+
+def review(review_id, timestamp):
+    return {"review_id": review_id, "unix_timestamp": timestamp, "text": review_id}
+
+def test_store_reads_relevance_and_newest_order(store):
+    store.replace("p", [review("b", 100), review("a", 300), review("c", 200)])
+    assert [r["review_id"] for r in store.get_reviews("p", order="relevance")] == ["b", "a", "c"]
+    assert [r["review_id"] for r in store.get_reviews("p", limit=2)] == ["a", "c"]
+
+def test_replace_drops_reviews_from_the_previous_fetch(store):
+    store.replace("p", [review("old", 100)])
+    store.replace("p", [review("new", 200)])
+    assert [r["review_id"] for r in store.get_reviews("p", order="relevance")] == ["new"]
+
+def test_relevance_mode_returns_the_same_sample_as_searchapi(service, stub_backend, monkeypatch):
+    monkeypatch.setattr(Config, "REVIEW_SORT_BY", "relevance")
+    place = stub_backend.places[0]
+    reviews = service.get_reviews(place["place_id"], max_reviews=3)
+    assert reviews == place["_reviews"][:3]
+    pages = stub_backend.calls["searchapi.reviews_page"]
+    assert service.get_reviews(place["place_id"], max_reviews=3) == reviews
+    assert stub_backend.calls["searchapi.reviews_page"] == pages
+    assert service.review_store.stats()["skipped_fetches"] == 1
+
+def test_newest_mode_refreshes_incrementally(service, stub_backend, monkeypatch):
+    monkeypatch.setattr(Config, "REVIEW_SORT_BY", "newest")
+    monkeypatch.setattr(Config, "REVIEW_STORE_REFRESH_INTERVAL", 0)
+    place_id = stub_backend.places[0]["place_id"]
+    service.get_reviews(place_id, max_reviews=3)
+    service.get_reviews(place_id, max_reviews=3)
+    stats = service.review_store.stats()
+    assert (stats["full_fetches"], stats["incremental_fetches"]) == (1, 1)
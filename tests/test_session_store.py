@@ -0,0 +1,43 @@
+import pytest
+from src.core.session import WorkflowSessions
+from src.services.session_store import SessionStore
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "sessions.sqlite3")
+
+def test_memory_entry_is_revalidated_against_sqlite(path):
+    # Dua worker dengan LRU memori masing-masing di atas satu database
+    first, second = SessionStore(path=path), SessionStore(path=path)
+    session_id = first.create({"leadCount": 0}, {"key": "search", "payload": {}})
+    assert second.load(session_id)["state"] == {"leadCount": 0}
+    assert second.load(session_id)["state"] == {"leadCount": 0}
+    assert second.stats()["memory_hits"] == 1
+
+    first.save(session_id, {"leadCount": 1}, {"key": "control", "payload": {}})
+    session = second.load(session_id)
+    assert session["state"] == {"leadCount": 1} and session["next"]["key"] == "control"
+
+    first.delete(session_id)
+    assert second.load(session_id) is None
+    assert second.stats()["memory_size"] == 0
+
+def test_expired_session_is_not_loaded(path):
+    store = SessionStore(path=path, ttl=-1)
+    session_id = store.create({}, None)
+    assert store.load(session_id) is None
+
+def test_session_mode_only_accepts_the_pending_task(workflow, path):
+    sessions = WorkflowSessions(workflow, store=SessionStore(path=path))
+    response = sessions.handle("input", {"business_type": "restoran", "location": "Surabaya", "numberOfLeads": 1, "useSession": True})
+    session_id = response["state"]["sessionId"]
+    assert response["next"] == {"key": "search", "payload": {"sessionId": "$state.sessionId"}}
+
+    with pytest.raises(ValueError, match="expects task 'search', got 'scrape'"):
+        sessions.handle("scrape", {"sessionId": session_id})
+    response = sessions.handle("search", {"sessionId": session_id})
+    assert response["state"] == {"sessionId": session_id}
+    assert sessions.store.load(session_id)["next"]["key"] == response["next"]["key"]
+
+    with pytest.raises(ValueError, match="Unknown or expired session"):
+        sessions.handle("search", {"sessionId": "missing"})
@@ -0,0 +1,123 @@
+import pytest
+from src.core.workflow import SKIPPED_SCRAPE_CALLS
+from src.services.rate_limiter import current_run
+
+def test_scrape_batch_hands_every_place_to_analyze_batch(workflow, stub_backend):
+    place_ids = [place["place_id"] for place in stub_backend.places[:3]]
+    response = workflow.scrape_batch({"placeIds": place_ids, "constraints": {}})
+    assert response["next"]["key"] == "analyze_batch"
+    assert response["errors"] == {}
+    payload = response["next"]["payload"]
+    places = payload.get("placesDetailsRefs") or payload["placesDetails"]
+    assert list(places) == place_ids
+
+    analyzed = workflow.analyze_batch({**payload, "leadCount": 1, "numberOfLeads": 3, "constraints": {}})
+    # Hanya sisa lead yang dibutuhkan yang dianalisis
+    assert len(analyzed["result"]) == 2
+    assert analyzed["state"] == {"leadCount": 3}
+
+def test_scrape_batch_ends_the_run_when_budget_is_exhausted(workflow, stub_backend):
+    workflow.limiter.start_run("batch-run", {"searchapi": 1})
+    # Tempat yang belum pernah di-scrape agar review tidak dilayani dari cache
+    place_ids = [place["place_id"] for place in stub_backend.places[50:53]]
+    response = workflow.scrape_batch({"placeIds": place_ids, "constraints": {}, "runId": "batch-run", "stagedScrape": False})
+    assert response["done"] is True
+    assert "searchapi" in response["error"]
+    assert current_run.get() is None
+
+CANDIDATES = [
+    {"place_id": "ok", "rating": 4.6, "user_ratings_total": 300, "price_level": 2, "formatted_address": "Jl. Tunjungan, Surabaya"},
+    {"place_id": "low_rating", "rating": 3.9, "user_ratings_total": 300, "price_level": 2, "formatted_address": "Surabaya"},
+    {"place_id": "few_reviews", "rating": 4.8, "user_ratings_total": 10, "price_level": 2, "formatted_address": "Surabaya"},
+    {"place_id": "pricey", "rating": 4.7, "user_ratings_total": 500, "price_level": 4, "formatted_address": "Surabaya"},
+    {"place_id": "no_summary"},
+    {"place_id": "out_of_area", "rating": 4.6, "user_ratings_total": 300, "price_level": 2, "formatted_address": "Jl. Malioboro, Yogyakarta"},
+]
+CONSTRAINTS = {"min_rating": 4.0, "min_reviews": 50, "max_reviews": 1000, "price_range": "$$"}
+# location berasal dari state run (payload search), bukan dari constraints
+PARAMS = {"location": "Surabaya", "constraints": CONSTRAINTS, "prefilter": True}
+
+def test_prefilter_drops_candidates_violating_hard_constraints(workflow):
+    place_ids, reasons = workflow._prefilter(CANDIDATES, PARAMS)
+    # Field yang tidak ada di ringkasan Text Search tidak pernah menolak kandidat
+    assert place_ids == ["ok", "no_summary"]
+    assert reasons == {"min_rating": 1, "min_reviews": 1, "price_range": 1, "location": 1}
+
+def test_prefilter_accumulates_reasons_across_pages(workflow):
+    params = {**PARAMS, "skippedReasons": {"min_rating": 2, "keywords": 1}}
+    _, reasons = workflow._prefilter(CANDIDATES, params)
+    assert reasons == {"min_rating": 3, "keywords": 1, "min_reviews": 1, "price_range": 1, "location": 1}
+
+def test_prefilter_disabled_keeps_every_candidate(workflow):
+    place_ids, reasons = workflow._prefilter(CANDIDATES, {**PARAMS, "prefilter": False, "skippedReasons": {"keywords": 1}})
+    assert place_ids == [c["place_id"] for c in CANDIDATES]
+    assert reasons == {"keywords": 1}
+
+def test_skip_state_counts_only_avoided_scrape_calls(workflow):
+    params = {"skippedCount": 3, "skippedReasons": {"min_rating": 3}, "callsSaved": 4, "analysisMode": "standard"}
+    state = workflow._skip_state(params, ["keywords", "keywords"])
+    assert state == {
+        "skippedCount": 5,
+        "skippedReasons": {"min_rating": 3, "keywords": 2},
+        "callsSaved": 4 + 2 * SKIPPED_SCRAPE_CALLS,
+    }
+    # Snapshot payload tidak diubah (AsyncWorkflowExecutor menghitung selisih terhadapnya)
+    assert params["skippedReasons"] == {"min_rating": 3}
+
+def test_staged_scrape_skips_place_without_keyword_matches(workflow, stub_backend):
+    constraints = {"keywords": "wifi"}
+    # Tempat yang keyword search-nya tidak menemukan review (stub deterministik per tempat dan keyword)
+    place_id = next(place["place_id"] for place in stub_backend.places[30:]
+                    if workflow.finder.searchapi.get_keyword_match_count(place["place_id"], "wifi")[0] == 0)
+    before = dict(stub_backend.calls)
+    response = workflow.scrape({"placeId": place_id, "constraints": constraints, "stagedScrape": True,
+                                "skippedCount": 0, "skippedReasons": {}, "callsSaved": 0})
+    assert response["state"] == {"skippedCount": 1, "skippedReasons": {"keywords": 1}, "callsSaved": SKIPPED_SCRAPE_CALLS}
+    assert stub_backend.calls.get("gmaps.place_details", 0) == before.get("gmaps.place_details", 0)
+    assert stub_backend.calls.get("searchapi.reviews_page", 0) == before.get("searchapi.reviews_page", 0)
+
+def test_search_continues_to_next_page_when_whole_page_is_filtered(workflow):
+    params = {"business_type": "restoran", "location": "Surabaya", "searchOffset": 0, "constraints": {"min_rating": 5.1},
+              "nextPageToken": None, "batchSize": 1, "leadCount": 0, "numberOfLeads": 1, "prefilter": True}
+    response = workflow.search(params)
+    assert response["next"]["key"] == "search"
+    assert response["state"]["skippedCount"] == 20
+    assert response["state"]["nextPageToken"]
+
+    follow_up = workflow.search({**params, **response["state"]})
+    assert follow_up["state"]["searchOffset"] == 40
+
+def test_search_skips_candidates_outside_the_location(workflow):
+    params = {"business_type": "restoran", "location": "Yogyakarta", "searchOffset": 0, "constraints": {},
+              "nextPageToken": None, "batchSize": 1, "leadCount": 0, "numberOfLeads": 1, "prefilter": True}
+    response = workflow.search(params)
+    assert response["state"]["skippedReasons"] == {"location": 20}
+
+def test_search_retries_page_token_until_it_is_valid(workflow, stub_backend, monkeypatch):
+    from config import Config
+    stub_backend.page_token_delay = 0.2
+    monkeypatch.setattr(Config, "GMAPS_PAGE_TOKEN_RETRY_DELAY", 0.25)
+    params = {"business_type": "restoran", "location": "Surabaya", "searchOffset": 0, "constraints": {"min_rating": 5.1},
+              "nextPageToken": None, "batchSize": 1, "leadCount": 0, "numberOfLeads": 1, "prefilter": True}
+    response = workflow.search(params)
+    calls = stub_backend.calls["gmaps.text_search"]
+    follow_up = workflow.search({**params, **response["state"]})
+    assert follow_up["state"]["searchOffset"] == 40
+    assert stub_backend.calls["gmaps.text_search"] == calls + 2
+
+def test_scrape_hands_details_to_analyze_by_reference(workflow, stub_backend):
+    place_id = stub_backend.places[5]["place_id"]
+    response = workflow.scrape({"placeId": place_id, "constraints": {}, "stagedScrape": False})
+    payload = response["next"]["payload"]
+    assert "placeDetails" not in payload
+    assert payload["placeId"] == place_id and workflow.details_store.get(payload["detailsRef"])
+
+    analyzed = workflow.analyze({**payload, "leadCount": 0, "constraints": {}})
+    assert analyzed["result"] and analyzed["state"] == {"leadCount": 1}
+
+def test_analyze_scrapes_again_when_details_ref_expired(workflow, stub_backend):
+    place_id = stub_backend.places[5]["place_id"]
+    analyzed = workflow.analyze({"detailsRef": "expired", "placeId": place_id, "leadCount": 0, "constraints": {}})
+    assert analyzed["result"]
+    with pytest.raises(ValueError, match="Place details not available"):
+        workflow.analyze({"detailsRef": "expired", "leadCount": 0, "constraints": {}})